@@ -0,0 +1,4 @@
+-- Supports keyset pagination of resume history (newest first) without scanning
+-- or sorting every row a user has generated.
+create index if not exists generated_resumes_user_created_id_idx
+    on generated_resumes (user_id, created_at desc, id desc);
@@ -0,0 +1,98 @@
+"""Move existing generated_resumes rows to compressed, content-addressed storage.
+
+Run from the repository root after applying 002_compressed_resume_storage.sql:
+
+    python migrations/002_backfill_compressed_history.py [--dry-run]
+
+Rows are processed in batches. Each batch uploads the shared JD bodies, sets
+jd_hash/markdown_z and clears the inline job_description/markdown_source. At
+the end it reports the stored bytes and the row payload size before and after,
+plus the on-disk table sizes.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import DatabaseManager, encode_resume_row
+
+BATCH_SIZE = 200
+
+def storage_report(db_manager):
+    try:
+        return db_manager.supabase.rpc('resume_storage_report', {}).execute().data or []
+    except Exception as e:
+        print(f"Could not read table sizes: {e}")
+        return []
+
+def print_storage(title, rows):
+    print(title)
+    for row in rows:
+        print(f"  {row['table_name']:<20} {row['total_bytes'] / 1024:>12,.1f} KiB  {row['row_count']:>8,} rows")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="only report the projected savings")
+    args = parser.parse_args()
+
+    db_manager = DatabaseManager()
+    print_storage("Table sizes before:", storage_report(db_manager))
+
+    inline_bytes = stored_bytes = payload_before = payload_after = 0
+    migrated = 0
+    seen_hashes = set()
+    last_id = None
+    while True:
+        query = (db_manager.supabase.table('generated_resumes')
+                 .select("id, job_description, markdown_source")
+                 .or_("job_description.not.is.null,markdown_source.not.is.null"))
+        if last_id is not None:
+            query = query.gt('id', last_id)
+        rows = query.order('id').limit(BATCH_SIZE).execute().data or []
+        if not rows:
+            break
+        last_id = rows[-1]['id']
+
+        jd_rows = {}
+        updates = []
+        for row in rows:
+            encoded, jd_row = encode_resume_row({k: row[k] for k in ("job_description", "markdown_source")})
+            update = {**encoded, "job_description": None, "markdown_source": None}
+            updates.append((row['id'], update))
+
+            inline_bytes += sum(len((row[k] or "").encode("utf-8")) for k in ("job_description", "markdown_source"))
+            stored_bytes += len(encoded.get('markdown_z', "")) + len(encoded.get('jd_hash', ""))
+            if jd_row and jd_row['hash'] not in seen_hashes:
+                seen_hashes.add(jd_row['hash'])
+                jd_rows[jd_row['hash']] = jd_row
+                stored_bytes += len(jd_row['body_z'])
+            payload_before += len(json.dumps(row))
+            payload_after += len(json.dumps({"id": row['id'], **{k: v for k, v in update.items() if v is not None}}))
+
+        if not args.dry_run:
+            if jd_rows:
+                db_manager.supabase.table('job_descriptions').upsert(
+                    list(jd_rows.values()), on_conflict='hash', ignore_duplicates=True
+                ).execute()
+            for resume_id, update in updates:
+                db_manager.supabase.table('generated_resumes').update(update).eq('id', resume_id).execute()
+        migrated += len(rows)
+        print(f"{'Checked' if args.dry_run else 'Migrated'} {migrated} rows...")
+
+    if not migrated:
+        print("Nothing to migrate.")
+        return
+
+    print(f"\nRows: {migrated}, distinct job descriptions: {len(seen_hashes)}")
+    print(f"Text stored:  {inline_bytes / 1024:,.1f} KiB inline -> {stored_bytes / 1024:,.1f} KiB "
+          f"({stored_bytes / max(inline_bytes, 1):.0%})")
+    print(f"Row payload:  {payload_before / 1024:,.1f} KiB -> {payload_after / 1024:,.1f} KiB "
+          f"({payload_after / max(payload_before, 1):.0%})")
+    if not args.dry_run:
+        # Postgres only returns the space of the old row versions after VACUUM (FULL)
+        print_storage("Table sizes after (run VACUUM FULL generated_resumes to reclaim space):", storage_report(db_manager))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+-- Content-addressed, compressed storage for resume history.
+--
+-- Job descriptions move to job_descriptions, keyed by the SHA-256 of their text
+-- and shared by every resume (and user) generated from the same JD. JD bodies
+-- and resume markdown are stored compressed ("zlib:"/"zstd:" + base64, see
+-- utils/compression.py). jd_analysis stays JSONB so it remains queryable.
+--
+-- Run this first, then migrations/002_backfill_compressed_history.py to move
+-- existing rows over and report the size change.
+
+create table if not exists job_descriptions (
+    hash text primary key,
+    body_z text not null,
+    size_bytes integer not null,
+    created_at timestamptz not null default now()
+);
+
+alter table generated_resumes add column if not exists jd_hash text references job_descriptions (hash);
+alter table generated_resumes add column if not exists markdown_z text;
+
+-- New rows leave the inline columns empty; the backfill clears them on old rows
+alter table generated_resumes alter column job_description drop not null;
+alter table generated_resumes alter column markdown_source drop not null;
+
+create index if not exists generated_resumes_jd_hash_idx on generated_resumes (jd_hash);
+
+-- On-disk size (including TOAST and indexes) of the tables involved, for before/after reports
+create or replace function resume_storage_report()
+returns table (table_name text, total_bytes bigint, row_count bigint)
+language sql
+stable
+as $$
+    select 'generated_resumes', pg_total_relation_size('generated_resumes'), (select count(*) from generated_resumes)
+    union all
+    select 'job_descriptions', pg_total_relation_size('job_descriptions'), (select count(*) from job_descriptions)
+$$;
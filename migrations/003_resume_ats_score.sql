@@ -0,0 +1,4 @@
+-- ATS keyword coverage of each generated resume (see utils/ats_score.py):
+-- {"coverage", "keywords", "matched", "missing", "sections", "initial_coverage", "retailored"}.
+-- Older rows stay null.
+alter table generated_resumes add column if not exists ats_score jsonb;
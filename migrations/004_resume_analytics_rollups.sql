@@ -0,0 +1,169 @@
+-- Per-user analytics rollups for the History page, maintained by a trigger on
+-- generated_resumes so every save path (sync, async, backfills) keeps them current.
+--
+-- resume_analytics(user_id, limit) reads only these small tables through their
+-- per-user indexes, so the page costs the same whether a user has 10 resumes or
+-- 10,000. Skill gaps are required JD skills with no matching row (case- and
+-- whitespace-insensitive) in the user's skills table.
+
+create table if not exists resume_skill_rollup (
+    user_id uuid not null,
+    skill_key text not null,
+    skill_label text not null,
+    resume_count integer not null default 0,
+    last_seen timestamptz not null default now(),
+    primary key (user_id, skill_key)
+);
+create index if not exists resume_skill_rollup_top_idx on resume_skill_rollup (user_id, resume_count desc);
+
+create table if not exists resume_company_rollup (
+    user_id uuid not null,
+    company_name text not null,
+    resume_count integer not null default 0,
+    last_seen timestamptz not null default now(),
+    primary key (user_id, company_name)
+);
+create index if not exists resume_company_rollup_top_idx on resume_company_rollup (user_id, resume_count desc);
+
+create table if not exists resume_week_rollup (
+    user_id uuid not null,
+    week date not null,
+    resume_count integer not null default 0,
+    primary key (user_id, week)
+);
+
+create index if not exists skills_user_name_idx on skills (user_id, lower(btrim(skill_name)));
+
+-- Add (delta = 1) or remove (delta = -1) one resume's contribution
+create or replace function apply_resume_rollup(r generated_resumes, delta integer)
+returns void
+language plpgsql
+as $$
+declare
+    required jsonb := case
+        when jsonb_typeof(r.jd_analysis -> 'required_skills') = 'array' then r.jd_analysis -> 'required_skills'
+        else '[]'::jsonb
+    end;
+    company text := coalesce(nullif(btrim(r.company_name), ''), 'N/A');
+begin
+    insert into resume_skill_rollup as t (user_id, skill_key, skill_label, resume_count, last_seen)
+    select r.user_id, lower(btrim(skill)), max(btrim(skill)), delta, r.created_at
+    from jsonb_array_elements_text(required) as skill
+    where btrim(skill) <> ''
+    group by lower(btrim(skill))
+    on conflict (user_id, skill_key) do update
+        set resume_count = t.resume_count + excluded.resume_count,
+            skill_label = case when delta > 0 then excluded.skill_label else t.skill_label end,
+            last_seen = greatest(t.last_seen, excluded.last_seen);
+
+    insert into resume_company_rollup as t (user_id, company_name, resume_count, last_seen)
+    values (r.user_id, company, delta, r.created_at)
+    on conflict (user_id, company_name) do update
+        set resume_count = t.resume_count + excluded.resume_count,
+            last_seen = greatest(t.last_seen, excluded.last_seen);
+
+    insert into resume_week_rollup as t (user_id, week, resume_count)
+    values (r.user_id, date_trunc('week', r.created_at)::date, delta)
+    on conflict (user_id, week) do update
+        set resume_count = t.resume_count + excluded.resume_count;
+
+    if delta < 0 then
+        delete from resume_skill_rollup where user_id = r.user_id and resume_count <= 0;
+        delete from resume_company_rollup where user_id = r.user_id and resume_count <= 0;
+        delete from resume_week_rollup where user_id = r.user_id and resume_count <= 0;
+    end if;
+end;
+$$;
+
+create or replace function resume_rollup_trigger()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op = 'INSERT' then
+        perform apply_resume_rollup(new, 1);
+    elsif tg_op = 'DELETE' then
+        perform apply_resume_rollup(old, -1);
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists generated_resumes_rollup on generated_resumes;
+create trigger generated_resumes_rollup
+    after insert or delete on generated_resumes
+    for each row execute function resume_rollup_trigger();
+
+-- One-off backfill from existing history (safe to re-run: rebuilds from scratch)
+truncate resume_skill_rollup, resume_company_rollup, resume_week_rollup;
+
+insert into resume_skill_rollup (user_id, skill_key, skill_label, resume_count, last_seen)
+select user_id, skill_key, max(skill_label), count(distinct id), max(created_at)
+from (
+    select g.id, g.user_id, g.created_at, lower(btrim(skill)) as skill_key, btrim(skill) as skill_label
+    from generated_resumes g,
+         jsonb_array_elements_text(case
+             when jsonb_typeof(g.jd_analysis -> 'required_skills') = 'array' then g.jd_analysis -> 'required_skills'
+             else '[]'::jsonb
+         end) as skill
+    where btrim(skill) <> ''
+) s
+group by user_id, skill_key;
+
+insert into resume_company_rollup (user_id, company_name, resume_count, last_seen)
+select user_id, coalesce(nullif(btrim(company_name), ''), 'N/A'), count(*), max(created_at)
+from generated_resumes
+group by 1, 2;
+
+insert into resume_week_rollup (user_id, week, resume_count)
+select user_id, date_trunc('week', created_at)::date, count(*)
+from generated_resumes
+group by 1, 2;
+
+-- Everything the History page's insights panel shows, as one JSON document
+create or replace function resume_analytics(p_user_id uuid, p_limit integer default 10, p_weeks integer default 12)
+returns jsonb
+language sql
+stable
+as $$
+    with top_skills as (
+        select r.skill_label as skill,
+               r.resume_count,
+               exists (
+                   select 1 from skills s
+                   where s.user_id = p_user_id and lower(btrim(s.skill_name)) = r.skill_key
+               ) as in_profile
+        from resume_skill_rollup r
+        where r.user_id = p_user_id
+        order by r.resume_count desc, r.skill_key
+        limit p_limit * 5
+    ),
+    weeks as (
+        select week, resume_count
+        from resume_week_rollup
+        where user_id = p_user_id
+          and week >= (date_trunc('week', now()) - make_interval(weeks => p_weeks - 1))::date
+    )
+    select jsonb_build_object(
+        'total_resumes', (select coalesce(sum(resume_count), 0) from resume_week_rollup where user_id = p_user_id),
+        'top_skills', (
+            select coalesce(jsonb_agg(t order by t.resume_count desc, t.skill), '[]'::jsonb)
+            from (select * from top_skills order by resume_count desc, skill limit p_limit) t
+        ),
+        'skill_gaps', (
+            select coalesce(jsonb_agg(t order by t.resume_count desc, t.skill), '[]'::jsonb)
+            from (select skill, resume_count from top_skills where not in_profile order by resume_count desc, skill limit p_limit) t
+        ),
+        'companies', (
+            select coalesce(jsonb_agg(t order by t.resume_count desc, t.company_name), '[]'::jsonb)
+            from (
+                select company_name, resume_count
+                from resume_company_rollup
+                where user_id = p_user_id
+                order by resume_count desc, company_name
+                limit p_limit
+            ) t
+        ),
+        'weeks', (select coalesce(jsonb_agg(w order by w.week), '[]'::jsonb) from weeks w)
+    );
+$$;
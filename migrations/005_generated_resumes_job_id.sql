@@ -0,0 +1,5 @@
+-- The generation job that saved each resume (see utils/generation.py). A retried
+-- job finds the row an earlier attempt already saved instead of inserting another.
+-- Rows saved before this column existed stay null.
+alter table generated_resumes add column if not exists job_id text;
+create unique index if not exists generated_resumes_job_id_idx on generated_resumes (job_id) where job_id is not null;
@@ -1,9 +1,14 @@
 import streamlit as st
+from utils.profiler import start_rerun_profile, render_profiler_panel
+start_rerun_profile("Profile Setup")  # before the other imports so their cost is profiled
+from utils.warmup import start_warmup
 from utils.database import DatabaseManager
 from datetime import date
 
 st.set_page_config(layout="wide")
+render_profiler_panel()
 st.title("📋 Profile Setup")
+start_warmup()  # the page header is out; load heavy dependencies in the background
 
 db_manager = DatabaseManager()
 
@@ -1,98 +1,187 @@
 import streamlit as st
-from utils.database import DatabaseManager
-from utils.ai_agents import AIAgents, ResumeState
+from utils.profiler import start_rerun_profile, render_profiler_panel
+start_rerun_profile("Generate Resume")  # before the other imports so their cost is profiled
+from utils.warmup import start_warmup
+from utils.generation import GENERATE_RESUME_JOB, enqueue_generation, enqueue_pdf_render
+from utils.job_queue import get_job_queue, get_job_worker, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED
+from utils.layout import apply_fit_plan
 from utils.resume_generator import ResumeGenerator
+import streamlit.components.v1 as components
+from datetime import datetime
 import time
 
+POLL_SECONDS = 1
+PREVIEW_HEIGHT = 900
+
+def edited_state(state, job_id):
+    """Copy of ``state`` without the bullets unticked in the preview editor"""
+    edited = dict(state)
+    for section in ('tailored_experiences', 'tailored_projects'):
+        edited[section] = [
+            {**item, 'achievements': [
+                a for i, a in enumerate(item.get('achievements') or [])
+                if st.session_state.get(f"keep:{job_id}:{section}:{item.get('id')}:{i}", True)
+            ]}
+            for item in state.get(section) or []
+        ]
+    return edited
+
 st.set_page_config(layout="wide")
+render_profiler_panel()
 st.title("🚀 Generate a Tailored Resume")
+start_warmup()  # the page header is out; load heavy dependencies in the background
 
 if not st.session_state.get('user_id'):
     st.warning("Please log in from the main page to generate a resume.")
     st.stop()
 
-# Initialize managers
-db_manager = DatabaseManager()
-ai_agents = AIAgents()
-resume_gen = ResumeGenerator()
+# Generation runs in the background job queue, so navigating away, reconnecting or
+# clicking the download button never loses (or re-pays for) a run.
+job_queue = get_job_queue()
+get_job_worker()  # make sure this process is working the queue
+
+if 'generation_job_id' not in st.session_state:
+    # Pick up the user's latest generation from an earlier session
+    latest_job = job_queue.latest_for_user(st.session_state.user_id, GENERATE_RESUME_JOB)
+    st.session_state.generation_job_id = latest_job['id'] if latest_job else None
 
 # UI
 jd_text = st.text_area("Paste the Job Description Here", height=300)
+max_pages = st.number_input(
+    "Fit to pages", min_value=0, max_value=5, value=0, step=1,
+    help="Trim roles, projects, bullets and skills (least relevant first) and tighten spacing "
+         "until the resume fits on this many pages. 0 keeps everything."
+)
 
 if st.button("Generate Resume", type="primary"):
     if not jd_text.strip():
         st.error("Please paste a job description.")
     else:
-        with st.spinner("Your personalized resume is being crafted by AI..."):
-            start_time = time.time()
-            
-            # 1. Fetch all user data from DB
-            user_profile = db_manager.get_user_profile(st.session_state.user_id)
-            user_profile['education'] = db_manager.get_education(st.session_state.user_id)
-            
-            all_experiences = db_manager.get_work_experiences(st.session_state.user_id)
-            all_projects = db_manager.get_projects(st.session_state.user_id)
-            all_skills = db_manager.get_skills(st.session_state.user_id)
-            
-            # 2. Compile and run the LangGraph workflow
-            workflow = ai_agents.create_resume_workflow()
-            initial_state: ResumeState = {
-                "user_id": st.session_state.user_id,
-                "job_description": jd_text,
-                "user_profile": user_profile,
-                "all_experiences": all_experiences,
-                "all_projects": all_projects,
-                "all_skills": all_skills,
-                "jd_analysis": {},
-                "selected_experiences": [],
-                "selected_projects": [],
-                "selected_skills": [],
-                "tailored_summary": "",
-                "tailored_experiences": [],
-                "tailored_projects": [],
-                "company_info": {},
-                "resume_content": ""
-            }
-            
-            final_state = workflow.invoke(initial_state)
-            
-            # 3. Generate the PDF from the final state
-            pdf_bytes, markdown_content = resume_gen.create_pdf(final_state)
-            
-            # 4. Save the result to the database
-            db_manager.save_generated_resume({
-                "user_id": st.session_state.user_id,
-                "job_title": final_state['jd_analysis'].get('job_title', 'N/A'),
-                "company_name": final_state['jd_analysis'].get('company_name', 'N/A'),
-                "job_description": jd_text,
-                "jd_analysis": final_state['jd_analysis'],
-                "tailored_summary": final_state['tailored_summary'],
-                "markdown_source": markdown_content
-            })
-            
-            end_time = time.time()
-            st.success(f"Resume generated in {end_time - start_time:.2f} seconds!")
-
-            # 5. Display results
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                st.subheader("✅ Your Resume is Ready!")
-                st.download_button(
-                    label="Download Resume (PDF)",
-                    data=pdf_bytes,
-                    file_name=f"Resume_{final_state['jd_analysis'].get('company_name', 'Company')}.pdf",
-                    mime="application/pdf"
-                )
-                
-                st.subheader("💡 Tailored Summary")
-                st.info(final_state['tailored_summary'])
-                
-            with col2:
-                st.subheader("🔍 Job Analysis")
-                st.json({
-                    "Job Title": final_state['jd_analysis'].get('job_title'),
-                    "Company": final_state['jd_analysis'].get('company_name'),
-                    "Required Skills": final_state['jd_analysis'].get('required_skills'),
-                    "ATS Keywords": final_state['jd_analysis'].get('keywords')
-                })
+        # Repeated clicks, refreshes and other tabs with the same JD attach to the same job
+        st.session_state.generation_requested_at = time.time()
+        st.session_state.generation_job_id = enqueue_generation(st.session_state.user_id, jd_text, max_pages=int(max_pages))
+
+job_id = st.session_state.generation_job_id
+job = job_queue.get(job_id) if job_id else None
+
+if job and job['status'] in (JOB_QUEUED, JOB_RUNNING):
+    elapsed = time.time() - job['created_at']
+    with st.spinner(f"Your personalized resume is being crafted by AI... ({elapsed:.0f}s)"):
+        time.sleep(POLL_SECONDS)
+    st.rerun()
+
+elif job and job['status'] == JOB_FAILED:
+    st.error(f"Resume generation failed: {job['error']}")
+
+elif job:
+    final_state = job['result']['final_state']
+    st.success(
+        f"Resume generated in {job['finished_at'] - job['created_at']:.2f} seconds! "
+        f"({datetime.fromtimestamp(job['created_at']).strftime('%Y-%m-%d %H:%M')})"
+    )
+    if job['result'].get('degraded'):
+        st.warning("The AI service was slow or unavailable, so parts of this resume use generic content. Generating again makes a fresh attempt.")
+    for message in job['result'].get('warnings') or []:
+        st.warning(message)
+    if job['finished_at'] < st.session_state.get('generation_requested_at', 0):
+        st.caption("This job description and profile were already generated, so the stored resume is shown.")
+        if st.button("Regenerate anyway"):
+            st.session_state.generation_requested_at = time.time()
+            st.session_state.generation_job_id = enqueue_generation(
+                st.session_state.user_id, job['payload']['job_description'], force=True,
+                max_pages=job['payload'].get('max_pages')
+            )
+            st.rerun()
+
+    # The preview is built from the same Markdown and stylesheet as the PDF, which
+    # renders in its own job; edits only re-render the preview until a PDF is asked for
+    resume_gen = ResumeGenerator()
+    fit = job['result'].get('fit')
+    base_state = apply_fit_plan(final_state, fit['plan']) if fit else final_state
+    spacing_level = fit['plan']['spacing_level'] if fit else 0
+    preview_state = edited_state(base_state, job_id)
+    if preview_state == base_state:
+        preview_markdown = job['result']['markdown_source']
+    else:
+        preview_markdown = resume_gen.build_markdown(preview_state, spacing_level)
+
+    pdf_jobs = st.session_state.setdefault('pdf_job_ids', {})
+    pdf_job_id = pdf_jobs.get(job_id) or job['result'].get('pdf_job_id')
+    pdf_job = job_queue.get(pdf_job_id) if pdf_job_id else None
+    if pdf_job is None and job['file']:
+        # Generated before PDFs moved to their own job
+        pdf_job = {"status": JOB_DONE, "file": job['file'], "result": {"pages": fit.get('pages') if fit else None},
+                   "payload": {"markdown_source": job['result']['markdown_source']}}
+    pdf_pending = pdf_job is not None and pdf_job['status'] in (JOB_QUEUED, JOB_RUNNING)
+
+    # Display results
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.subheader("✅ Your Resume is Ready!")
+        file_name = f"Resume_{final_state['jd_analysis'].get('company_name', 'Company')}.pdf"
+        if pdf_job and pdf_job['status'] == JOB_DONE:
+            st.download_button(label="Download Resume (PDF)", data=pdf_job['file'], file_name=file_name, mime="application/pdf")
+        else:
+            st.button("Download Resume (PDF)", disabled=True, help="The PDF is still rendering; the preview below is ready now.")
+            if pdf_job and pdf_job['status'] == JOB_FAILED:
+                st.error(f"PDF rendering failed: {pdf_job['error']}")
+            elif pdf_pending:
+                st.caption("Rendering the PDF...")
+
+        if pdf_job is None or pdf_job['status'] == JOB_FAILED or pdf_job['payload']['markdown_source'] != preview_markdown:
+            if st.button("Create PDF from edits" if preview_markdown != job['result']['markdown_source'] else "Create PDF"):
+                pdf_jobs[job_id] = enqueue_pdf_render(st.session_state.user_id, preview_markdown)
+                st.rerun()
+
+        if fit:
+            pages = (pdf_job['result'] or {}).get('pages') if pdf_job and pdf_job['status'] == JOB_DONE else None
+            if pages and pages > fit['max_pages']:
+                st.warning(f"The resume came out at {pages} page(s), over the {fit['max_pages']}-page limit.")
+            elif pages:
+                st.caption(f"Fits on {pages} page(s) (estimated {fit['estimated_pages']}).")
+            else:
+                st.caption(f"Estimated at {fit['estimated_pages']} page(s).")
+            if fit['changes']:
+                with st.expander("What was trimmed to fit"):
+                    for change in fit['changes']:
+                        st.write(f"- {change}")
+
+        ats_score = job['result'].get('ats_score')
+        if ats_score:
+            st.subheader("🎯 ATS Keyword Coverage")
+            initial = ats_score.get('initial_coverage')
+            st.metric(
+                "JD keywords found in the resume",
+                f"{ats_score['coverage']:.0%}",
+                delta=f"{ats_score['coverage'] - initial:+.0%} after re-tailoring" if ats_score.get('retailored') and initial is not None else None
+            )
+            if ats_score['missing']:
+                st.caption("Missing: " + ", ".join(ats_score['missing']))
+
+        st.subheader("💡 Tailored Summary")
+        st.info(final_state['tailored_summary'])
+
+    with col2:
+        st.subheader("🔍 Job Analysis")
+        st.json({
+            "Job Title": final_state['jd_analysis'].get('job_title'),
+            "Company": final_state['jd_analysis'].get('company_name'),
+            "Required Skills": final_state['jd_analysis'].get('required_skills'),
+            "ATS Keywords": final_state['jd_analysis'].get('keywords')
+        })
+
+    st.subheader("👀 Preview")
+    with st.expander("Edit bullets"):
+        st.caption("Untick bullets to drop them. The preview updates right away; create a PDF when you are happy with it.")
+        for section, title_key in (('tailored_experiences', 'position'), ('tailored_projects', 'title')):
+            for item in base_state.get(section) or []:
+                if item.get('achievements'):
+                    st.markdown(f"**{item.get(title_key) or ''}**")
+                for i, achievement in enumerate(item.get('achievements') or []):
+                    st.checkbox(achievement, value=True, key=f"keep:{job_id}:{section}:{item.get('id')}:{i}")
+    components.html(resume_gen.render_html(preview_markdown), height=PREVIEW_HEIGHT, scrolling=True)
+
+    if pdf_pending:
+        time.sleep(POLL_SECONDS)
+        st.rerun()
@@ -1,10 +1,24 @@
 import streamlit as st
-from utils.database import DatabaseManager
+from utils.profiler import start_rerun_profile, render_profiler_panel
+start_rerun_profile("History")  # before the other imports so their cost is profiled
+from utils.warmup import start_warmup
+from utils.database import DatabaseManager, RESUME_DETAIL_COLUMNS
+from utils.export import EXPORT_RESUMES_JOB, enqueue_export
+from utils.invalidation import PROFILE_SCOPE, RESUMES_SCOPE, get_invalidation_bus
+from utils.job_queue import get_job_queue, get_job_worker, JOB_QUEUED, JOB_RUNNING, JOB_FAILED
 from utils.resume_generator import ResumeGenerator
+import os
 import pandas as pd
+import time
+
+PAGE_SIZE = 20
+EXPORT_POLL_SECONDS = 1
+ANALYTICS_TTL_SECONDS = 60 * 60  # new resumes and profile edits move the version, see below
 
 st.set_page_config(layout="wide")
+render_profiler_panel()
 st.title("📊 Generated Resume History")
+start_warmup()  # the page header is out; load heavy dependencies in the background
 
 if not st.session_state.get('user_id'):
     st.warning("Please log in from the main page to view your history.")
@@ -13,43 +27,198 @@ if not st.session_state.get('user_id'):
 db_manager = DatabaseManager()
 resume_gen = ResumeGenerator() # Needed to re-generate PDF from markdown
 
-resumes = db_manager.get_generated_resumes(st.session_state.user_id)
+# Keyset cursors: history_cursors[i] is the last row of page i-1 (None for the first page)
+if 'history_cursors' not in st.session_state:
+    st.session_state.history_cursors = [None]
+if 'history_details' not in st.session_state:
+    st.session_state.history_details = {}
+# Resume IDs ticked for export, kept across pages
+if 'export_selection' not in st.session_state:
+    st.session_state.export_selection = set()
+if 'export_job_id' not in st.session_state:
+    latest_export = get_job_queue().latest_for_user(st.session_state.user_id, EXPORT_RESUMES_JOB)
+    st.session_state.export_job_id = latest_export['id'] if latest_export else None
+
+@st.cache_data(ttl=ANALYTICS_TTL_SECONDS, show_spinner=False)
+def load_analytics(user_id, version):
+    """One RPC over per-user rollups, so this stays fast however long the history is"""
+    return DatabaseManager().get_resume_analytics(user_id)
+
+def render_insights():
+    try:
+        # Keyed on the invalidation versions, so a save or profile edit in any worker shows up at once
+        bus = get_invalidation_bus()
+        version = (bus.version(RESUMES_SCOPE, st.session_state.user_id), bus.version(PROFILE_SCOPE, st.session_state.user_id))
+        analytics = load_analytics(st.session_state.user_id, version)
+    except Exception as e:
+        st.warning(f"Insights are unavailable: {str(e)}")
+        return
+    if not analytics.get('total_resumes'):
+        st.caption("Insights appear once you have generated a few resumes.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Most requested skills**")
+        top_skills = pd.DataFrame(analytics['top_skills'], columns=['skill', 'resume_count', 'in_profile'])
+        if top_skills.empty:
+            st.caption("No required skills were extracted from your job descriptions yet.")
+        else:
+            st.bar_chart(top_skills, x='skill', y='resume_count')
+    with col2:
+        st.markdown("**Skill gaps** (requested, but not in your profile)")
+        gaps = pd.DataFrame(analytics['skill_gaps'], columns=['skill', 'resume_count'])
+        if gaps.empty:
+            st.success("Your profile lists every frequently requested skill.")
+        else:
+            gaps['share'] = 100 * gaps['resume_count'] / analytics['total_resumes']
+            st.dataframe(
+                gaps,
+                column_config={
+                    "skill": "Skill",
+                    "resume_count": "Resumes",
+                    "share": st.column_config.ProgressColumn("Share of applications", format="%.0f%%", min_value=0, max_value=100)
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Applications per company**")
+        st.bar_chart(pd.DataFrame(analytics['companies']), x='company_name', y='resume_count')
+    with col2:
+        st.markdown("**Applications per week**")
+        weeks = pd.DataFrame(analytics['weeks'], columns=['week', 'resume_count'])
+        st.line_chart(weeks, x='week', y='resume_count')
+
+def render_resume_expander(resume, snippet=None):
+    """Expander for one resume; the heavy fields are only fetched once it is opened"""
+    with st.expander(f"{resume['company_name']} - {resume['job_title']} ({pd.to_datetime(resume['created_at']).strftime('%Y-%m-%d')})"):
+        if snippet:
+            st.markdown(snippet)
+        if not st.toggle("Show details", key=f"details_{resume['id']}"):
+            return
+
+        details = st.session_state.history_details.get(resume['id'])
+        if details is None:
+            details = db_manager.get_resume_by_id(resume['id'], columns=RESUME_DETAIL_COLUMNS) or {}
+            st.session_state.history_details[resume['id']] = details
+
+        st.subheader("Tailored Summary")
+        st.info(details.get('tailored_summary') or 'No summary found.')
+
+        ats_score = details.get('ats_score')
+        if ats_score:
+            st.metric("ATS keyword coverage", f"{ats_score['coverage']:.0%}")
+            if ats_score.get('missing'):
+                st.caption("Missing: " + ", ".join(ats_score['missing']))
+
+        st.subheader("Job Analysis")
+        st.json(details.get('jd_analysis') or {})
+
+        # Re-generate PDF on demand from the stored markdown
+        if st.button("Re-download PDF", key=f"download_{resume['id']}"):
+            markdown_source = details.get("markdown_source")
+            if markdown_source:
+                pdf_bytes = resume_gen.create_pdf_from_markdown(markdown_source)
 
-if not resumes:
+                st.download_button(
+                    label="Click to Download Again",
+                    data=pdf_bytes,
+                    file_name=f"Resume_{resume['company_name']}.pdf",
+                    mime="application/pdf"
+                )
+            else:
+                st.error("Could not re-generate PDF. Markdown source not found.")
+
+# --- Insights ---
+with st.expander("📈 Insights", expanded=False):
+    render_insights()
+
+# --- Search ---
+search_query = st.text_input("🔎 Search your resumes", placeholder="e.g. fintech kafka")
+
+if search_query.strip():
+    search_start = time.perf_counter()
+    hits = db_manager.search_generated_resumes(st.session_state.user_id, search_query)
+    st.caption(f"{len(hits)} result(s) in {(time.perf_counter() - search_start) * 1000:.0f} ms")
+    if not hits:
+        st.info("No resumes match your search.")
+    for hit in hits:
+        render_resume_expander(hit, snippet=hit['snippet'])
+    st.stop()
+
+st.divider()
+
+cursors = st.session_state.history_cursors
+resumes = db_manager.list_generated_resumes(st.session_state.user_id, limit=PAGE_SIZE, after=cursors[-1])
+
+if not resumes and len(cursors) == 1:
     st.info("You haven't generated any resumes yet. Go to the 'Generate Resume' page to get started!")
 else:
-    # Display as a table
-    df = pd.DataFrame(resumes)
-    st.dataframe(df[['created_at', 'company_name', 'job_title']])
+    # Display as a table; the checkbox column picks resumes for bulk export
+    selection = st.session_state.export_selection
+    df = pd.DataFrame(resumes, columns=['id', 'created_at', 'company_name', 'job_title'])
+    df.insert(0, 'export', df['id'].isin(selection))
+    edited = st.data_editor(
+        df,
+        column_config={"id": None, "export": st.column_config.CheckboxColumn("Export")},
+        disabled=['created_at', 'company_name', 'job_title'],
+        hide_index=True,
+        key=f"history_table_{len(cursors)}"
+    )
+    for resume_id, selected in zip(edited['id'], edited['export']):
+        if selected:
+            selection.add(resume_id)
+        else:
+            selection.discard(resume_id)
+
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        if st.button("⬅️ Newer", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+    with col2:
+        if st.button("Older ➡️", disabled=len(resumes) < PAGE_SIZE):
+            last = resumes[-1]
+            cursors.append({'created_at': last['created_at'], 'id': last['id']})
+            st.rerun()
+    with col3:
+        st.caption(f"Page {len(cursors)}")
 
     st.divider()
 
-    # Display details in expanders
     for resume in resumes:
-        with st.expander(f"{resume['company_name']} - {resume['job_title']} ({pd.to_datetime(resume['created_at']).strftime('%Y-%m-%d')})"):
-            st.subheader("Tailored Summary")
-            st.info(resume.get('tailored_summary', 'No summary found.'))
-            
-            st.subheader("Job Analysis")
-            st.json(resume.get('jd_analysis', {}))
-            
-            # Re-generate PDF on demand
-            if st.button("Re-download PDF", key=f"download_{resume['id']}"):
-                # This is a placeholder since we don't have the full state
-                # A better approach is to store the markdown and regenerate
-                markdown_source = resume.get("markdown_source")
-                if markdown_source:
-                    # We can't perfectly recreate the PDF as we don't have the full state,
-                    # but we can from the stored markdown.
-                    html_content = markdown2.markdown(markdown_source, extras=["tables"])
-                    css = resume_gen.css_style
-                    pdf_bytes = resume_gen.HTML(string=html_content).write_pdf(stylesheets=[resume_gen.CSS(string=css)])
-                    
-                    st.download_button(
-                        label="Click to Download Again",
-                        data=pdf_bytes,
-                        file_name=f"Resume_{resume['company_name']}.pdf",
-                        mime="application/pdf"
-                    )
-                else:
-                    st.error("Could not re-generate PDF. Markdown source not found.")
+        render_resume_expander(resume)
+
+    # --- Bulk export ---
+    st.divider()
+    st.subheader("📦 Export")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"Export selected ({len(selection)})", disabled=not selection):
+            st.session_state.export_job_id = enqueue_export(st.session_state.user_id, sorted(selection))
+    with col2:
+        if st.button("Export all resumes"):
+            st.session_state.export_job_id = enqueue_export(st.session_state.user_id)
+
+    export_job = get_job_queue().get(st.session_state.export_job_id, include_file=False) if st.session_state.export_job_id else None
+    if export_job and export_job['status'] in (JOB_QUEUED, JOB_RUNNING):
+        get_job_worker()
+        with st.spinner("Building your ZIP archive..."):
+            time.sleep(EXPORT_POLL_SECONDS)
+        st.rerun()
+    elif export_job and export_job['status'] == JOB_FAILED:
+        st.error(f"Export failed: {export_job['error']}")
+    elif export_job:
+        result = export_job['result']
+        if os.path.exists(result['path']):
+            st.caption(
+                f"{result['exported']} resume(s), {result['size_bytes'] / 1024 / 1024:.1f} MB"
+                + (f" — {result['failed']} could not be rendered (see manifest)" if result['failed'] else "")
+            )
+            with open(result['path'], 'rb') as archive:
+                st.download_button("Download ZIP", data=archive, file_name="resumes.zip", mime="application/zip")
+        else:
+            st.info("Your last export has expired; start a new one.")
@@ -0,0 +1,68 @@
+import streamlit as st
+from utils.profiler import start_rerun_profile, render_profiler_panel
+start_rerun_profile("Job Match")  # before the other imports so their cost is profiled
+from utils.warmup import start_warmup
+from utils.async_runtime import run_sync
+from utils.database import DatabaseManager
+from utils.job_match import arank_job_descriptions, split_job_descriptions
+import pandas as pd
+import time
+
+st.set_page_config(layout="wide")
+render_profiler_panel()
+st.title("🎯 Match Job Postings")
+start_warmup()  # the page header is out; load heavy dependencies in the background
+
+if not st.session_state.get('user_id'):
+    st.warning("Please log in from the main page to match job postings.")
+    st.stop()
+
+st.caption("Paste several job postings, separated by a line of three dashes (---), to see which fit your profile best.")
+jds_text = st.text_area("Job Postings", height=300, placeholder="First posting...\n---\nSecond posting...")
+use_llm = st.checkbox(
+    "Use AI analysis", value=False,
+    help="Also runs the full job description analysis on each posting (slower, catches skills your profile does not mention)."
+)
+
+if st.button("Rank Postings", type="primary"):
+    jd_texts = split_job_descriptions(jds_text)
+    if not jd_texts:
+        st.error("Please paste at least one job posting.")
+    else:
+        with st.spinner(f"Matching {len(jd_texts)} posting(s) against your profile..."):
+            start = time.time()
+            try:
+                inputs = run_sync(DatabaseManager().aload_generation_inputs(st.session_state.user_id))
+                st.session_state.job_matches = run_sync(arank_job_descriptions(jd_texts, inputs, use_llm=use_llm))
+                st.session_state.job_match_texts = jd_texts
+                st.session_state.job_match_seconds = time.time() - start
+            except Exception as e:
+                st.error(f"Matching failed: {str(e)}")
+
+matches = st.session_state.get('job_matches')
+if matches:
+    st.success(f"Ranked {len(matches)} posting(s) in {st.session_state.job_match_seconds:.2f} seconds.")
+    table = pd.DataFrame([{
+        "Rank": rank,
+        "Job": match['job_title'],
+        "Company": match['company_name'],
+        "Fit": match['fit'] * 100,
+        "Required skills covered": match['required_coverage'] * 100,
+        "Matched": ", ".join(match['matched']),
+        "Missing": ", ".join(match['missing']),
+        "Closest role/project": match['best_match'] or "",
+    } for rank, match in enumerate(matches, start=1)])
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Fit": st.column_config.ProgressColumn("Fit", format="%.0f%%", min_value=0, max_value=100),
+            "Required skills covered": st.column_config.ProgressColumn("Required skills covered", format="%.0f%%", min_value=0, max_value=100),
+        }
+    )
+
+    with st.expander("Posting text"):
+        rank = st.number_input("Rank", min_value=1, max_value=len(matches), value=1, step=1)
+        st.text(st.session_state.job_match_texts[matches[int(rank) - 1]['index']])
+        st.caption("Paste it on the Generate Resume page to tailor a resume for it.")
@@ -0,0 +1,46 @@
+"""Retrying a generation job against the Supabase and Groq stand-ins (tools/standins.py)."""
+import os
+import tempfile
+import uuid
+
+os.environ.setdefault("RESUME_AGENT_DATA_DIR", tempfile.mkdtemp(prefix="resume-tests-"))
+
+import pytest
+import streamlit as st
+
+import utils.generation as generation
+from tools.standins import FakeDatabase, LatencyModel, install, seed_user
+from utils.async_runtime import run_sync
+
+JOB_DESCRIPTION = "Backend Engineer at Example Corp\nPython, Kafka and PostgreSQL on AWS."
+
+@pytest.fixture(scope="module")
+def db():
+    st.secrets._secrets = {"SUPABASE_URL": "http://supabase.local", "SUPABASE_KEY": "test", "GROQ_API_KEY": "test"}
+    database = FakeDatabase()
+    install(database, LatencyModel(0), LatencyModel(0))
+    return database
+
+def test_retry_after_saving_returns_the_saved_resume(db, monkeypatch):
+    user = seed_user(db, 0)
+    job = {"id": uuid.uuid4().hex, "attempts": 1}
+    payload = {"user_id": user["id"], "job_description": JOB_DESCRIPTION}
+
+    async def fail_after_saving(thread_id):
+        raise RuntimeError("worker lost after the save")
+
+    # The first attempt saves the resume, then fails before its checkpoints are dropped
+    delete_checkpoints = generation.adelete_checkpoints
+    monkeypatch.setattr(generation, "adelete_checkpoints", fail_after_saving)
+    with pytest.raises(RuntimeError):
+        run_sync(generation.run_generation_job(payload, job))
+
+    # The retry resumes the finished checkpoint and saves again
+    monkeypatch.setattr(generation, "adelete_checkpoints", delete_checkpoints)
+    first = [row for row in db.rows("generated_resumes") if row.get("job_id") == job["id"]]
+    result, _ = run_sync(generation.run_generation_job(payload, {**job, "attempts": 2}))
+
+    saved = [row for row in db.rows("generated_resumes") if row.get("job_id") == job["id"]]
+    assert len(first) == 1 and len(saved) == 1
+    assert result["resume_id"] == first[0]["id"]
+    assert len([row for row in db.rows("generated_resumes") if row["user_id"] == user["id"]]) == 1
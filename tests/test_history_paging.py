@@ -0,0 +1,44 @@
+"""Keyset pagination of the resume history against the Supabase stand-in (tools/standins.py)."""
+from tools.standins import FakeDatabase, FakeSupabase, LatencyModel
+from utils.database import DatabaseManager
+
+USER_ID = "user-1"
+
+def make_manager(db: FakeDatabase) -> DatabaseManager:
+    manager = DatabaseManager.__new__(DatabaseManager)  # no secrets or network needed
+    manager.supabase = FakeSupabase(db, LatencyModel(0))
+    return manager
+
+def seed(db: FakeDatabase, created_at: list) -> None:
+    db.insert("generated_resumes", [
+        {"id": f"r{i:02d}", "user_id": USER_ID, "created_at": ts, "job_title": f"Role {i}", "company_name": "Acme"}
+        for i, ts in enumerate(created_at)
+    ])
+    db.insert("generated_resumes", [{"id": "other", "user_id": "user-2", "created_at": created_at[0]}])
+
+def test_pages_cover_every_row_once_in_order():
+    db = FakeDatabase()
+    # Several rows share a timestamp, so the id tie-breaker decides where pages split
+    seed(db, ["2024-05-01T10:00:00.5+00:00"] * 5 + ["2024-05-02T09:00:00+00:00", "2024-04-30T08:00:00+00:00"])
+    manager = make_manager(db)
+
+    pages, after = [], None
+    for _ in range(10):  # a cursor that is ignored would page forever
+        page = manager.list_generated_resumes(USER_ID, limit=2, after=after)
+        if not page:
+            break
+        pages.append([row["id"] for row in page])
+        after = page[-1]
+
+    expected = sorted(
+        (row for row in db.rows("generated_resumes") if row["user_id"] == USER_ID),
+        key=lambda row: (row["created_at"], row["id"]), reverse=True
+    )
+    assert [rid for page in pages for rid in page] == [row["id"] for row in expected]
+    assert all(len(page) == 2 for page in pages[:-1])
+
+def test_first_page_is_newest_first():
+    db = FakeDatabase()
+    seed(db, ["2024-01-01T00:00:00+00:00", "2024-03-01T00:00:00+00:00", "2024-02-01T00:00:00+00:00"])
+    page = make_manager(db).list_generated_resumes(USER_ID, limit=10)
+    assert [row["id"] for row in page] == ["r01", "r02", "r00"]
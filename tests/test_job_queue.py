@@ -0,0 +1,57 @@
+"""The SQLite job queue: lease ownership and single-flight."""
+import sqlite3
+
+from utils.job_queue import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobQueue
+
+def make_queue() -> JobQueue:
+    conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return JobQueue(conn)
+
+def expire_lease(queue: JobQueue, job_id: str) -> None:
+    queue.conn.execute("UPDATE jobs SET lease_expires_at = 0 WHERE id = ?", (job_id,))
+
+def test_a_stale_attempt_cannot_overwrite_the_new_owner():
+    queue = make_queue()
+    job_id = queue.enqueue("render", {"n": 1})
+    stale = queue.claim_next(["render"])
+    expire_lease(queue, job_id)
+    current = queue.claim_next(["render"])
+    assert current["id"] == job_id and current["attempts"] == 2
+
+    # The first worker wakes up after losing its lease: neither outcome is written
+    assert not queue.complete(job_id, stale["attempts"], {"from": "stale"})
+    assert not queue.fail(job_id, "RuntimeError: stale", stale["attempts"])
+    assert queue.get(job_id)["status"] == JOB_RUNNING
+
+    assert queue.complete(job_id, current["attempts"], {"from": "current"})
+    job = queue.get(job_id)
+    assert job["status"] == JOB_DONE and job["result"] == {"from": "current"}
+
+    # A finished job is not reopened by a late failure either
+    assert not queue.fail(job_id, "RuntimeError: late", current["attempts"])
+    assert queue.get(job_id)["status"] == JOB_DONE
+
+def test_join_running_false_queues_one_successor():
+    queue = make_queue()
+    first = queue.enqueue("refresh", {}, idempotency_key="k", join_running=False)
+    assert queue.enqueue("refresh", {}, idempotency_key="k", join_running=False) == first  # still queued: joined
+
+    running = queue.claim_next(["refresh"])
+    successor = queue.enqueue("refresh", {}, idempotency_key="k", join_running=False)
+    assert successor != first
+    assert queue.enqueue("refresh", {}, idempotency_key="k", join_running=False) == successor
+    assert queue.enqueue("refresh", {}, idempotency_key="k") == successor  # the default joins either
+
+    # The running job fails: its queued successor redoes the work, so it is not re-queued beside it
+    assert queue.fail(first, "RuntimeError: boom", running["attempts"])
+    assert queue.get(first)["status"] == JOB_FAILED
+    assert queue.get(successor)["status"] == JOB_QUEUED
+
+def test_a_failure_is_retried_without_a_successor():
+    queue = make_queue()
+    job_id = queue.enqueue("render", {}, idempotency_key="k")
+    job = queue.claim_next(["render"])
+    assert queue.enqueue("render", {}, idempotency_key="k") == job_id  # joins the running job
+    assert queue.fail(job_id, "RuntimeError: boom", job["attempts"])
+    assert queue.get(job_id)["status"] == JOB_QUEUED
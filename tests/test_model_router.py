@@ -0,0 +1,125 @@
+"""Model routing against the offline Groq stand-in (tools/standins.py)."""
+import asyncio
+import time
+
+import pytest
+
+import utils.ai_agents as ai_agents
+from tools.standins import FakeAsyncGroq, LatencyModel
+from utils.ai_agents import AIAgents
+from utils.model_router import ModelRouter, TASK_JD_ANALYSIS, TASK_SELECTION, TASK_SUMMARY
+
+TIERS = {
+    "fast": ["fast-a", "fast-b"],
+    "balanced": ["bal-a", "bal-b", "bal-c"],
+    "quality": ["qual-a", "bal-a"]
+}
+
+class SequenceLatency(LatencyModel):
+    """Latencies handed out in order; the last one repeats"""
+
+    def __init__(self, *seconds: float):
+        super().__init__(0)
+        self.seconds = list(seconds)
+
+    def sample(self) -> float:
+        return self.seconds.pop(0) if len(self.seconds) > 1 else self.seconds[0]
+
+def make_router(**kwargs) -> ModelRouter:
+    return ModelRouter(tiers=TIERS, **kwargs)
+
+@pytest.fixture
+def agents(monkeypatch):
+    """AIAgents factory on a stand-in client and a fresh router"""
+    def build(client: FakeAsyncGroq, router: ModelRouter) -> AIAgents:
+        monkeypatch.setattr(ai_agents, "get_groq_client", lambda: client)
+        instance = AIAgents()
+        instance.router = router
+        return instance
+    return build
+
+def test_tasks_route_to_their_tier():
+    router = make_router()
+    assert router.candidates(TASK_JD_ANALYSIS) == ["bal-a", "bal-b", "bal-c"]
+    assert router.candidates(TASK_SUMMARY) == ["qual-a", "bal-a"]
+    assert make_router(task_tiers={TASK_SUMMARY: "fast"}).candidates(TASK_SUMMARY) == ["fast-a", "fast-b"]
+
+def test_fast_tier_orders_by_latency_and_unhealthy_models_go_last():
+    router = make_router()
+    for _ in range(5):
+        router.record("fast-a", 0.9, ok=True)
+        router.record("fast-b", 0.1, ok=True)
+    assert router.candidates(TASK_SELECTION) == ["fast-b", "fast-a"]
+    for _ in range(6):
+        # Never three failures in a row, so its breaker stays closed while the error rate climbs
+        router.record("fast-b", 0.1, ok=False)
+        router.record("fast-b", 0.1, ok=False)
+        router.record("fast-b", 0.1, ok=True)
+    assert router.candidates(TASK_SELECTION) == ["fast-a", "fast-b"]
+
+def test_fails_over_to_the_next_model(agents):
+    client = FakeAsyncGroq(LatencyModel(0), failing={"bal-a"})
+    instance = agents(client, make_router())
+    response = asyncio.run(instance._acall_llm("Say hi", task=TASK_JD_ANALYSIS))
+    assert response
+    assert client.calls == ["bal-a", "bal-b"]
+    assert instance.router.snapshot()["bal-a"]["error_rate"] == 1.0
+
+def test_returns_empty_when_every_model_fails(agents):
+    client = FakeAsyncGroq(LatencyModel(0), failing={"qual-a", "bal-a"})
+    instance = agents(client, make_router())
+    assert asyncio.run(instance._acall_llm("Say hi", task=TASK_SUMMARY)) == ""
+    assert client.calls == ["qual-a", "bal-a"]
+
+def test_slow_request_is_hedged(agents):
+    router = make_router()
+    for _ in range(5):
+        router.record("bal-a", 0.02, ok=True)  # p95 well under the slow request
+    client = FakeAsyncGroq(LatencyModel(0), model_latency={"bal-a": SequenceLatency(2.0, 0.01)})
+    instance = agents(client, router)
+    start = time.monotonic()
+    response = asyncio.run(instance._acall_llm("Say hi", task=TASK_JD_ANALYSIS))
+    assert response
+    assert time.monotonic() - start < 1.0
+    assert client.calls == ["bal-a", "bal-a"]
+
+def test_breaker_opens_half_opens_and_closes(agents):
+    router = make_router(breaker_failure_threshold=2, breaker_cooldown=0.2)
+    client = FakeAsyncGroq(LatencyModel(0), failing={"bal-a"})
+    instance = agents(client, router)
+
+    for _ in range(2):
+        asyncio.run(instance._acall_llm("Say hi", task=TASK_JD_ANALYSIS))
+    assert router.snapshot()["bal-a"]["breaker"] == "open"
+    assert "bal-a" not in router.candidates(TASK_JD_ANALYSIS)
+
+    time.sleep(0.25)
+    assert router.snapshot()["bal-a"]["breaker"] == "half_open"
+    # Listing candidates must not use up the probe, however often it happens
+    assert router.candidates(TASK_JD_ANALYSIS)[0] == "bal-a"
+    assert router.candidates(TASK_SUMMARY) == ["qual-a", "bal-a"]
+
+    client.chat.completions.failing.clear()
+    client.calls.clear()
+    assert asyncio.run(instance._acall_llm("Say hi", task=TASK_JD_ANALYSIS))
+    assert client.calls == ["bal-a"]  # the probe
+    assert router.snapshot()["bal-a"]["breaker"] == "closed"
+
+def test_half_open_allows_one_probe_at_a_time():
+    router = make_router(breaker_failure_threshold=1, breaker_cooldown=0.2)
+    router.record("bal-a", 0.01, ok=False)
+    time.sleep(0.25)
+    assert router.claim("bal-a")
+    assert not router.claim("bal-a")
+    assert "bal-a" not in router.candidates(TASK_JD_ANALYSIS)
+
+def test_failed_probe_reopens_the_breaker(agents):
+    router = make_router(breaker_failure_threshold=1, breaker_cooldown=0.2)
+    client = FakeAsyncGroq(LatencyModel(0), failing={"bal-a"})
+    instance = agents(client, router)
+    asyncio.run(instance._acall_llm("Say hi", task=TASK_JD_ANALYSIS))
+    time.sleep(0.25)
+    client.calls.clear()
+    asyncio.run(instance._acall_llm("Say hi", task=TASK_JD_ANALYSIS))
+    assert client.calls == ["bal-a", "bal-b"]  # the probe went out and failed over
+    assert router.snapshot()["bal-a"]["breaker"] == "open"
@@ -0,0 +1,42 @@
+"""Lenient, incremental parsing of LLM JSON (utils/structured_output.py)."""
+import pytest
+
+from utils.structured_output import IncrementalJSONParser, SchemaError, coerce_to_schema, parse_json_lenient
+
+SCHEMA = {"title": str, "skills": [str], "years": int}
+
+def test_a_bracket_in_leading_prose_does_not_start_an_object():
+    text = 'Sure! [see below] {"a": 1}'
+    assert parse_json_lenient(text, {"a": int}) == {"a": 1}
+    assert parse_json_lenient("Here you go ```json\n{\"a\": [1, 2]}\n```", {"a": [int]}) == {"a": [1, 2]}
+
+def test_a_brace_in_leading_prose_does_not_start_an_array():
+    assert parse_json_lenient('Picked {two} of them: [0, 2]', [int]) == [0, 2]
+
+def test_without_a_schema_either_container_starts_the_value():
+    assert parse_json_lenient('Result: [1, 2]') == [1, 2]
+    assert parse_json_lenient('no json here') is None
+
+def test_truncated_stream_is_repaired_and_fields_arrive_as_they_complete():
+    parser = IncrementalJSONParser(SCHEMA)
+    chunks = ['Ok: {"title": "Backend', ' Engineer", "skills": ["Python", "Ka', 'fka"], "years": 1']
+    fields = [parser.feed(chunk) for chunk in chunks]
+
+    assert fields[0] == []
+    assert fields[1] == [("title", "Backend Engineer")]
+    assert fields[2] == [("skills", ["Python", "Kafka"])]
+    assert not parser.done
+    # The stream stopped mid-number: the open object is closed around what arrived
+    assert parser.snapshot() == {"title": "Backend Engineer", "skills": ["Python", "Kafka"], "years": 1}
+
+def test_truncation_inside_a_key_backs_off_to_the_last_member():
+    assert parse_json_lenient('{"title": "SRE", "skil', SCHEMA) == {"title": "SRE"}
+    assert parse_json_lenient('{"skills": ["Go", "Rust', SCHEMA) == {"skills": ["Go", "Rust"]}
+
+def test_coercion_fixes_types_and_drops_what_does_not_fit():
+    value = {"title": 42, "skills": ["Python", {"name": "Go"}, 3], "years": "5", "extra": True}
+    assert coerce_to_schema(value, SCHEMA) == {"title": "42", "skills": ["Python", "3"], "years": 5}
+    assert coerce_to_schema({"skills": "Python", "years": 2.5}, SCHEMA) == {"skills": ["Python"]}
+    assert coerce_to_schema({"ok": 1}, {"ok": bool}) == {}
+    with pytest.raises(SchemaError):
+        coerce_to_schema(["not", "an", "object"], SCHEMA)
@@ -0,0 +1,69 @@
+"""Background achievement variants (utils/variant_bank.py) with the LLM and database stubbed out."""
+import os
+import sqlite3
+import tempfile
+
+os.environ.setdefault("RESUME_AGENT_DATA_DIR", tempfile.mkdtemp(prefix="resume-tests-"))
+
+import utils.ai_agents as ai_agents
+import utils.database as database
+import utils.model_router as model_router
+import utils.variant_bank as variant_bank
+from utils.async_runtime import run_sync
+from utils.variant_bank import VariantBank, item_hash
+
+EXPERIENCE = {
+    "id": "exp-1", "position": "Backend Engineer", "technologies": ["Python", "Redis"],
+    "achievements": ["Built Python services for payments", "Cut p99 latency with Redis caching"]
+}
+SKILLS = [{"skill_name": "PostgreSQL"}, {"skill_name": "Figma"}]
+
+class StubAgents:
+    """Records the focus each item was tailored toward and answers with canned rewrites"""
+
+    def __init__(self, rewrites):
+        self.rewrites = rewrites
+        self.focus = []
+
+    async def atailor_experience_description(self, experience, jd_analysis):
+        self.focus.append(list(jd_analysis["keywords"]))
+        return {"achievements": self.rewrites.pop(0)}
+
+def run_precompute(monkeypatch, rewrites, clusters):
+    agents = StubAgents(rewrites)
+    inputs = {"all_experiences": [EXPERIENCE], "all_projects": [], "all_skills": SKILLS}
+
+    class StubDatabase:
+        async def aload_generation_inputs(self, user_id):
+            return inputs
+
+    conn = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    bank = VariantBank(conn)
+    monkeypatch.setattr(ai_agents, "AIAgents", lambda router=None: agents)
+    monkeypatch.setattr(database, "DatabaseManager", StubDatabase)
+    monkeypatch.setattr(model_router, "get_background_router", lambda: None)
+    monkeypatch.setattr(variant_bank, "get_variant_bank", lambda: bank)
+    monkeypatch.setattr(variant_bank, "profile_clusters", lambda inputs: [])
+    result, _ = run_sync(variant_bank.run_variant_precompute({"user_id": "user-1", "clusters": clusters}, {"id": "job-1"}))
+    return result, agents, bank.get("experience", "exp-1", item_hash(EXPERIENCE))
+
+def test_focus_is_limited_to_keywords_the_profile_backs(monkeypatch):
+    rewrites = [["Built Python microservices for payments", "Cut p99 latency with Redis caching"]]
+    result, agents, variants = run_precompute(monkeypatch, rewrites, ["backend"])
+
+    # Python and Redis come from the item, PostgreSQL from the user's skills; Kafka, Go, gRPC... do not
+    assert [keyword.lower() for keyword in agents.focus[0]] == ["python", "postgresql", "redis"]
+    assert result["stored"] == 0 and result["rejected"] == 1  # "microservices" is not in the item
+    assert "backend" not in variants
+
+def test_a_rewrite_within_the_item_is_stored(monkeypatch):
+    rewrite = ["Built Python services handling payments", "Used Redis caching to cut p99 latency"]
+    result, _, variants = run_precompute(monkeypatch, [list(rewrite)], ["backend"])
+    assert result["stored"] == 1 and result["rejected"] == 0
+    assert variants["backend"] == rewrite
+
+def test_a_family_the_profile_does_not_back_keeps_the_original(monkeypatch):
+    result, agents, variants = run_precompute(monkeypatch, [], ["mobile"])
+    assert agents.focus == []  # no LLM call
+    assert variants["mobile"] == EXPERIENCE["achievements"]
@@ -0,0 +1,117 @@
+"""Cold-start import report for the app and each page.
+
+Every entry script runs in a fresh interpreter under ``python -X importtime``:
+the first (logged-out) run of the script through Streamlit's AppTest is timed,
+then the background warm-up is run and timed on its own. The report shows
+which heavy packages each first paint still imports, so regressions from a new
+top-level import are easy to spot.
+
+    python tools/import_report.py
+    python tools/import_report.py --top 15 --json import_report.json
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.warmup import WARM_MODULES
+
+SCRIPTS = {
+    "Home": "app.py",
+    "Profile Setup": os.path.join("pages", "1_📋_Profile_Setup.py"),
+    "Generate Resume": os.path.join("pages", "2_🚀_Generate_Resume.py"),
+    "History": os.path.join("pages", "3_📊_History.py"),
+    "Job Match": os.path.join("pages", "4_🎯_Job_Match.py"),
+}
+PAINT_MARKER = "import-report: first paint done"
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# Runs in the child interpreter; argv[1] is the script path
+CHILD = f"""
+import json, os, sys, time
+sys.path.insert(0, {ROOT!r})
+os.environ["RESUME_AGENT_WARMUP"] = "0"
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=120)
+for key in ("SUPABASE_URL", "SUPABASE_KEY", "GROQ_API_KEY"):
+    at.secrets[key] = "import-report"
+at.run()
+first_paint = time.perf_counter() - start
+sys.stderr.write({PAINT_MARKER!r} + "\\n")
+sys.stderr.flush()
+
+from utils.warmup import get_warmup
+os.environ["RESUME_AGENT_WARMUP"] = "1"
+get_warmup.cache_clear()
+warmup = get_warmup()
+warmup.wait()
+print(json.dumps({{"first_paint_s": first_paint, "exception": [str(e.value) for e in at.exception], "warmup": warmup.report()}}))
+"""
+
+def parse_importtime(lines: List[str]) -> Dict[str, float]:
+    """Cumulative seconds per top-level package imported in these -X importtime lines"""
+    cumulative: Dict[str, float] = {}
+    for line in lines:
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative_us, indent, name = match.groups()
+        # Nesting is shown by indentation; only outermost imports carry a meaningful total
+        if len(indent) <= 1:
+            root = name.split(".")[0]
+            cumulative[root] = cumulative.get(root, 0.0) + int(cumulative_us) / 1e6
+    return cumulative
+
+def measure(script: str) -> Dict:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD, os.path.join(ROOT, script)],
+        capture_output=True, text=True, cwd=ROOT
+    )
+    if proc.returncode != 0 or not proc.stdout.strip():
+        raise RuntimeError(f"{script} failed:\n{proc.stderr[-2000:]}")
+    stderr = proc.stderr.splitlines()
+    split = stderr.index(PAINT_MARKER) if PAINT_MARKER in stderr else len(stderr)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    paint_imports = parse_importtime(stderr[:split])
+    heavy_roots = {name.split(".")[0] for name in WARM_MODULES}
+    return {
+        "first_paint_ms": round(result["first_paint_s"] * 1000),
+        "exception": result["exception"],
+        "paint_imports_ms": {name: round(s * 1000, 1) for name, s in sorted(paint_imports.items(), key=lambda kv: -kv[1])},
+        "heavy_at_paint": sorted(heavy_roots & set(paint_imports)),
+        "warmup": result["warmup"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import report")
+    parser.add_argument("--top", type=int, default=10, help="packages to list per page")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    report = {}
+    for page, script in SCRIPTS.items():
+        report[page] = entry = measure(script)
+        print(f"\n{page} ({script}): first paint {entry['first_paint_ms']} ms")
+        if entry["exception"]:
+            print(f"  exception: {entry['exception'][0]}")
+        print("  heavy packages at first paint: " + (", ".join(entry["heavy_at_paint"]) or "none"))
+        for name, ms in list(entry["paint_imports_ms"].items())[:args.top]:
+            print(f"  {name:<28}{ms:>10.1f} ms")
+    warmup = report["Home"]["warmup"]
+    print(f"\nBackground warm-up: {warmup['total_ms']} ms")
+    for label, ms in warmup["timings_ms"].items():
+        print(f"  {label:<28}{ms:>10.1f} ms" + (f"  ({warmup['errors'][label]})" if label in warmup["errors"] else ""))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
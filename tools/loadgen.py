@@ -0,0 +1,261 @@
+"""Concurrent multi-session load generator for the whole app.
+
+Drives N simulated users through login (app.py), a profile edit, a resume
+generation and the history page using Streamlit's AppTest harness, with
+Supabase and Groq replaced by in-process stand-ins (tools/standins.py). All
+sessions share one process, just as they share one Streamlit server.
+
+    python tools/loadgen.py --sessions 40 --concurrency 8
+
+Reports throughput, latency percentiles per page, thread counts and memory
+growth per session.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Keep the job queue, search index and caches of a load run away from real data
+os.environ.setdefault("RESUME_AGENT_DATA_DIR", tempfile.mkdtemp(prefix="resume-load-"))
+
+from streamlit.testing.v1 import AppTest
+
+from tools.standins import FakeDatabase, LatencyModel, install, seed_user
+
+APP = os.path.join(ROOT, "app.py")
+PROFILE_PAGE = os.path.join(ROOT, "pages", "1_📋_Profile_Setup.py")
+GENERATE_PAGE = os.path.join(ROOT, "pages", "2_🚀_Generate_Resume.py")
+HISTORY_PAGE = os.path.join(ROOT, "pages", "3_📊_History.py")
+STEPS = ["login", "profile_edit", "generate", "history"]
+FAKE_SECRETS = {"SUPABASE_URL": "http://supabase.local", "SUPABASE_KEY": "load-test", "GROQ_API_KEY": "load-test"}
+
+JOB_DESCRIPTION = """Senior Backend Engineer at Example Corp (fintech).
+We are looking for an engineer with 5+ years of Python, Kafka and PostgreSQL experience
+to build event-driven payment services on Kubernetes and AWS. Experience with Terraform
+and GraphQL is a plus. You will own services end to end and mentor other engineers."""
+
+def rss_bytes() -> int:
+    """Current resident set size (falls back to the peak where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def _edit_profile(user_id: str, full_name: str, skill_name: str) -> None:
+    """The writes behind the Profile page's Save Profile and Add Skill forms"""
+    from utils.database import DatabaseManager
+
+    db_manager = DatabaseManager()
+    db_manager.update_user_profile(user_id, {"full_name": full_name})
+    db_manager.add_skill({
+        "user_id": user_id, "skill_name": skill_name,
+        "category": "Technical", "proficiency_level": 3
+    })
+
+def share_test_runtime() -> None:
+    """Let AppTest runs overlap on threads, as sessions do on one server.
+
+    Each AppTest run installs its own mock Runtime and swaps ``st.secrets``, and
+    clears both when it finishes, under any run still going on another thread.
+    One mock Runtime and the fake secrets are installed process-wide instead.
+    Streamlit also caches the page list of the one main script a server has; every
+    page is a main script here, so that list is cached per script. Compiled pages
+    are shared too, as on a server: AppTest compiles them again on every run, and
+    parsing on several threads at once is not safe on every Python 3.11.
+    """
+    from unittest.mock import MagicMock
+
+    import streamlit as st
+    from streamlit import source_util
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.runtime.secrets import Secrets
+    from streamlit.testing.v1 import local_script_runner
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: shared)
+    Runtime.exists = classmethod(lambda cls: True)
+    st.secrets = Secrets([])
+    st.secrets._secrets = dict(FAKE_SECRETS)
+
+    pages_by_script: Dict[str, Dict] = {}
+    get_pages = source_util.get_pages
+
+    def get_script_pages(main_script_path: str) -> Dict:
+        with source_util._pages_cache_lock:
+            if main_script_path not in pages_by_script:
+                source_util._cached_pages = None
+                pages_by_script[main_script_path] = get_pages(main_script_path)
+            return pages_by_script[main_script_path]
+
+    source_util.get_pages = get_script_pages
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+def _new_app(path: str, timeout: float, user: Dict = None) -> AppTest:
+    at = AppTest.from_file(path, default_timeout=timeout)
+    if user:
+        at.session_state.user_id = user["id"]
+        at.session_state.user_email = user["email"]
+    return at
+
+def _button(at: AppTest, label: str):
+    for button in at.button:
+        if button.label == label:
+            return button
+    raise RuntimeError(f"no '{label}' button")
+
+def _text_input(at: AppTest, label: str):
+    for text_input in at.text_input:
+        if text_input.label == label:
+            return text_input
+    raise RuntimeError(f"no '{label}' text input")
+
+def _check(at: AppTest, step: str) -> None:
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].value}")
+
+def run_session(index: int, user: Dict, timeout: float, unique_jd: bool) -> Dict[str, float]:
+    """One simulated user; returns the latency of each step in seconds"""
+    timings = {}
+
+    start = time.perf_counter()
+    at = _new_app(APP, timeout).run()
+    at.text_input[0].input(user["email"]).run()
+    _button(at, "Continue").click().run()
+    _check(at, "login")
+    if at.session_state.user_id != user["id"]:
+        raise RuntimeError("login: user was not signed in")
+    timings["login"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # The page's forms end in st.rerun(), which AppTest replays with the submit still
+    # pressed, so the writes go through DatabaseManager and the page is then reloaded
+    full_name = f"Load User {index} (edited)"
+    _edit_profile(user["id"], full_name, f"Skill {index}")
+    at = _new_app(PROFILE_PAGE, timeout, user).run()
+    _check(at, "profile_edit")
+    if _text_input(at, "Full Name*").value != full_name:
+        raise RuntimeError("profile_edit: the edited profile was not shown")
+    timings["profile_edit"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    at = _new_app(GENERATE_PAGE, timeout, user).run()
+    jd_text = JOB_DESCRIPTION + (f"\nRequisition #{index}" if unique_jd else "")
+    at.text_area[0].input(jd_text)
+    # The page polls the job queue with st.rerun(), so this returns once the resume is ready
+    _button(at, "Generate Resume").click().run()
+    _check(at, "generate")
+    if not any("Resume generated" in s.value for s in at.success):
+        raise RuntimeError("generate: no resume was produced")
+    timings["generate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    at = _new_app(HISTORY_PAGE, timeout, user).run()
+    _check(at, "history")
+    timings["history"] = time.perf_counter() - start
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent multi-session load test")
+    parser.add_argument("--sessions", type=int, default=20, help="simulated users in total")
+    parser.add_argument("--concurrency", type=int, default=5, help="users active at once")
+    parser.add_argument("--db-latency-ms", type=float, default=40, help="median Supabase latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=700, help="median Groq latency")
+    parser.add_argument("--timeout", type=float, default=120, help="per-script-run timeout in seconds")
+    parser.add_argument("--shared-jd", action="store_true", help="give every user the same JD (exercises single-flight)")
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    share_test_runtime()
+    db = FakeDatabase()
+    install(db, LatencyModel(args.db_latency_ms), LatencyModel(args.llm_latency_ms))
+    users = [seed_user(db, i) for i in range(args.sessions + 1)]
+
+    # Warm-up: imports, cached resources and the job worker should not count as per-session growth
+    run_session(args.sessions, users[-1], args.timeout, unique_jd=True)
+
+    latencies: Dict[str, List[float]] = {step: [] for step in STEPS}
+    errors: List[str] = []
+    peak_threads = threading.active_count()
+    threads_start = peak_threads
+    rss_start = rss_bytes()
+    sampling = True
+
+    def sample_threads():
+        nonlocal peak_threads
+        while sampling:
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.1)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="session") as pool:
+        futures = [pool.submit(run_session, i, users[i], args.timeout, not args.shared_jd) for i in range(args.sessions)]
+        for future in as_completed(futures):
+            try:
+                for step, seconds in future.result().items():
+                    latencies[step].append(seconds)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    wall = time.perf_counter() - wall_start
+    sampling = False
+    sampler.join()
+    rss_end = rss_bytes()
+
+    completed = args.sessions - len(errors)
+    page_runs = sum(len(v) for v in latencies.values())
+    report = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "errors": len(errors),
+        "wall_seconds": round(wall, 2),
+        "sessions_per_second": round(completed / wall, 3) if wall else 0,
+        "steps_per_second": round(page_runs / wall, 3) if wall else 0,
+        "latency_ms": {
+            step: {**{f"p{p}": round(percentile(values, p) * 1000) for p in (50, 95, 99)}, "max": round(max(values, default=0) * 1000)}
+            for step, values in latencies.items()
+        },
+        "threads": {"start": threads_start, "peak": peak_threads, "end": threading.active_count()},
+        "rss_mb": {"start": round(rss_start / 2**20, 1), "end": round(rss_end / 2**20, 1)},
+        "rss_growth_kb_per_session": round((rss_end - rss_start) / 1024 / max(args.sessions, 1), 1)
+    }
+
+    print(f"\n{args.sessions} sessions, concurrency {args.concurrency}: {completed} ok, {len(errors)} failed in {wall:.1f} s")
+    print(f"Throughput: {report['sessions_per_second']} sessions/s, {report['steps_per_second']} page steps/s")
+    print(f"\n{'step':<14}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}  (ms)")
+    for step, stats in report["latency_ms"].items():
+        print(f"{step:<14}{stats['p50']:>8}{stats['p95']:>8}{stats['p99']:>8}{stats['max']:>8}")
+    print(f"\nThreads: {threads_start} at start, {peak_threads} peak, {report['threads']['end']} at end")
+    print(f"RSS: {report['rss_mb']['start']} MB -> {report['rss_mb']['end']} MB "
+          f"({report['rss_growth_kb_per_session']} KB per session)")
+    for error in errors[:10]:
+        print(f"  error: {error}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Timing of the multi-JD match matrix.
+
+Builds a synthetic profile (tools/state_memory.py) and a batch of synthetic
+postings drawn from the role-family keywords, then times the local analysis
+and the scoring separately. No network calls: analysis is the local path only.
+
+    python tools/match_bench.py --jds 500
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.state_memory import synthetic_inputs
+from utils.job_match import aanalyze_job_descriptions, score_matches
+from utils.variant_bank import SKILL_CLUSTERS
+
+def synthetic_jds(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    clusters = list(SKILL_CLUSTERS)
+    jds = []
+    for n in range(count):
+        cluster = rng.choice(clusters)
+        required = rng.sample(SKILL_CLUSTERS[cluster], k=min(6, len(SKILL_CLUSTERS[cluster])))
+        preferred = rng.sample(SKILL_CLUSTERS[rng.choice(clusters)], k=3)
+        jds.append(
+            f"{cluster.title()} Engineer {n}\n"
+            f"We are hiring for our platform team. You will own services end to end.\n"
+            f"Requirements: {', '.join(required)}, and 4+ years of professional experience.\n"
+            f"Nice to have: {', '.join(preferred)}.\n"
+        )
+    return jds
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-JD match matrix timing")
+    parser.add_argument("--jds", type=int, default=500)
+    parser.add_argument("--experiences", type=int, default=15)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--skills", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inputs = synthetic_inputs(args.experiences, args.projects, args.skills, 4)
+    jds = synthetic_jds(args.jds)
+
+    start = time.perf_counter()
+    analyses = asyncio.run(aanalyze_job_descriptions(jds, inputs))
+    analysis_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        ranked = score_matches(analyses, inputs)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    print(f"jds                {args.jds}")
+    print(f"local_analysis_ms  {analysis_ms:.1f}")
+    print(f"score_ms_best      {min(timings):.1f}")
+    print(f"score_ms_median    {sorted(timings)[len(timings) // 2]:.1f}")
+    print(f"top                {ranked[0]['job_title']}  fit={ranked[0]['fit']:.0%}")
+
+if __name__ == "__main__":
+    main()
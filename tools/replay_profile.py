@@ -0,0 +1,88 @@
+"""CPU profile of one resume generation replayed offline from a cassette.
+
+Record a trace with the app itself (every Groq and Supabase exchange is saved):
+
+    RESUME_AGENT_CASSETTE_MODE=record RESUME_AGENT_CASSETTE=trace.jsonl streamlit run app.py
+
+then replay it here with no network. Profile loading, the workflow, Markdown
+generation and the WeasyPrint render run for real under cProfile; the network
+answers come from the cassette with their original timing or none at all.
+The Streamlit secrets still have to exist (any values do when replaying).
+
+    python tools/replay_profile.py trace.jsonl --user-id <uuid> --jd jd.txt --latency zero
+"""
+import argparse
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.cassette import CASSETTE_REPLAY, LATENCY_ORIGINAL, LATENCY_ZERO, Cassette, install_cassette
+
+async def generate(user_id: str, jd_text: str, timings: dict) -> None:
+    from utils.ai_agents import AIAgents, final_resume_state
+    from utils.database import DatabaseManager
+    from utils.generation import build_initial_state
+    from utils.profile_snapshot import load_profile_snapshot
+    from utils.resume_generator import ResumeGenerator
+
+    start = time.perf_counter()
+    inputs = await DatabaseManager().aload_generation_inputs(user_id)
+    snapshot = load_profile_snapshot(user_id, inputs)
+    timings["load_profile"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    state = await AIAgents().arun_workflow(build_initial_state(user_id, jd_text, snapshot))
+    final_state = final_resume_state(state, snapshot)
+    timings["workflow"] = time.perf_counter() - start
+
+    resume_gen = ResumeGenerator()
+    start = time.perf_counter()
+    markdown_content = resume_gen.build_markdown(final_state)
+    timings["markdown"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    resume_gen.render_pdf(markdown_content)
+    timings["render_pdf"] = time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded generation offline under cProfile")
+    parser.add_argument("cassette", help="cassette recorded with RESUME_AGENT_CASSETTE_MODE=record")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--jd", required=True, help="file with the job description used in the recording")
+    parser.add_argument("--latency", choices=[LATENCY_ORIGINAL, LATENCY_ZERO], default=LATENCY_ZERO)
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, ...)")
+    parser.add_argument("--top", type=int, default=30)
+    parser.add_argument("--pstats", help="also dump the raw profile to this file")
+    args = parser.parse_args()
+
+    with open(args.jd, "r", encoding="utf-8") as f:
+        jd_text = f.read()
+    cassette = Cassette(args.cassette, CASSETTE_REPLAY, args.latency)
+    install_cassette(cassette)
+
+    timings = {}
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    asyncio.run(generate(args.user_id, jd_text, timings))
+    profiler.disable()
+    timings["total"] = time.perf_counter() - start
+
+    for stage, seconds in timings.items():
+        print(f"{stage:<14}{seconds * 1000:>10.1f} ms")
+    print(f"cassette      {cassette.stats}")
+    if args.pstats:
+        profiler.dump_stats(args.pstats)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(args.sort).print_stats(args.top)
+    print(out.getvalue())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,356 @@
+"""In-process stand-ins for Supabase and Groq, with realistic latency, for load tests.
+
+``install()`` swaps the client factories the app uses (``supabase.create_client``,
+``utils.database.create_client``/``acreate_client``, ``groq.Groq``/``groq.AsyncGroq``)
+for fakes backed by one shared in-memory database.
+"""
+import asyncio
+import copy
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Set
+
+SAMPLE_WORDS = ["Python", "Kafka", "PostgreSQL", "Kubernetes", "React", "AWS", "Terraform", "Go", "GraphQL", "Spark"]
+
+class LatencyModel:
+    """Log-normal latency around a median, like most network services"""
+
+    def __init__(self, median_ms: float, sigma: float = 0.5):
+        self.median = median_ms / 1000
+        self.sigma = sigma
+
+    def sample(self) -> float:
+        if self.median <= 0:
+            return 0.0
+        return random.lognormvariate(math.log(self.median), self.sigma)
+
+class FakeDatabase:
+    """Thread-safe in-memory tables shared by every fake client"""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+
+    def rows(self, table: str) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(table, [])
+
+    def insert(self, table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        inserted = []
+        with self.lock:
+            for row in rows:
+                row = {"id": str(uuid.uuid4()), "created_at": datetime.now(timezone.utc).isoformat(), **row}
+                self.rows(table).append(row)
+                inserted.append(copy.deepcopy(row))
+        return inserted
+
+# Operators of PostgREST logic trees (``or_`` filters), compared as strings like eq/lt/gt below
+_LOGIC_OPERATORS = {
+    "eq": lambda a, b: a == b, "neq": lambda a, b: a != b,
+    "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b,
+    "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+}
+
+def _split_logic(text: str) -> List[str]:
+    """Split a PostgREST condition list on the commas outside parentheses and quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, char in enumerate(text):
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+def _logic_filter(text: str, combine=any):
+    """Row predicate for a PostgREST logic tree such as ``a.lt.1,and(a.eq.1,b.lt."x")``"""
+    conditions = []
+    for part in _split_logic(text):
+        nested = re.fullmatch(r"(and|or)\((.*)\)", part, re.S)
+        if nested:
+            conditions.append(_logic_filter(nested.group(2), all if nested.group(1) == "and" else any))
+            continue
+        column, operator, value = part.split(".", 2)
+        value = value[1:-1] if value.startswith('"') and value.endswith('"') else value
+        compare = _LOGIC_OPERATORS[operator]
+        conditions.append(
+            lambda row, column=column, compare=compare, value=value:
+                row.get(column) is not None and compare(str(row.get(column)), value)
+        )
+    return lambda row: combine(condition(row) for condition in conditions)
+
+class FakeQuery:
+    """Just enough of the postgrest query builder for this app, down to the ``or_``
+    logic trees and chained ``order`` calls of keyset pagination
+    """
+
+    def __init__(self, db: FakeDatabase, table: str, latency: LatencyModel):
+        self.db = db
+        self.table = table
+        self.latency = latency
+        self.action = "select"
+        self.columns = "*"
+        self.payload: Any = None
+        self.on_conflict = ""
+        self.ignore_duplicates = False
+        self.filters = []
+        self.order_keys: List[tuple] = []
+        self.limit_count: Optional[int] = None
+
+    def select(self, columns: str = "*", count=None):
+        self.columns = columns
+        return self
+
+    def insert(self, data):
+        self.action, self.payload = "insert", data
+        return self
+
+    def upsert(self, data, on_conflict: str = "", ignore_duplicates: bool = False, **kwargs):
+        self.action, self.payload = "upsert", data
+        self.on_conflict, self.ignore_duplicates = on_conflict, ignore_duplicates
+        return self
+
+    def update(self, data):
+        self.action, self.payload = "update", data
+        return self
+
+    def delete(self):
+        self.action = "delete"
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) == str(value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) != str(value))
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and str(row.get(column)) > str(value))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and str(row.get(column)) < str(value))
+        return self
+
+    def in_(self, column, values):
+        allowed = {str(v) for v in values}
+        self.filters.append(lambda row: str(row.get(column)) in allowed)
+        return self
+
+    def or_(self, filters, reference_table=None):
+        self.filters.append(_logic_filter(filters))
+        return self
+
+    def order(self, column, desc: bool = False, **kwargs):
+        self.order_keys.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self.limit_count = size
+        return self
+
+    def _matches(self, row) -> bool:
+        return all(f(row) for f in self.filters)
+
+    def _project(self, row) -> Dict[str, Any]:
+        embeds = dict(re.findall(r"(\w+)\(([^)]*)\)", self.columns))
+        plain = [c.strip() for c in re.sub(r"\w+\([^)]*\)", "", self.columns).split(",") if c.strip()]
+        result = dict(row) if "*" in plain else {c: row.get(c) for c in plain}
+        if "job_descriptions" in embeds:
+            jd = next((r for r in self.db.rows("job_descriptions") if r.get("hash") == row.get("jd_hash")), None)
+            result["job_descriptions"] = {"body_z": jd["body_z"]} if jd else None
+        return copy.deepcopy(result)
+
+    def _run(self) -> SimpleNamespace:
+        if self.action == "insert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            return SimpleNamespace(data=self.db.insert(self.table, rows), count=None)
+        if self.action == "upsert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            key = self.on_conflict or "id"
+            with self.db.lock:
+                existing = {str(r.get(key)) for r in self.db.rows(self.table)}
+            fresh = [r for r in rows if str(r.get(key)) not in existing]
+            return SimpleNamespace(data=self.db.insert(self.table, fresh), count=None)
+        with self.db.lock:
+            matched = [row for row in self.db.rows(self.table) if self._matches(row)]
+            if self.action == "update":
+                for row in matched:
+                    row.update(self.payload)
+            elif self.action == "delete":
+                self.db.tables[self.table] = [row for row in self.db.rows(self.table) if not self._matches(row)]
+            # Stable sorts, last key first, give the chained order() calls their precedence
+            for column, desc in reversed(self.order_keys):
+                matched.sort(key=lambda row: str(row.get(column) or ""), reverse=desc)
+            if self.limit_count is not None:
+                matched = matched[:self.limit_count]
+            data = [self._project(row) for row in matched] if self.action == "select" else copy.deepcopy(matched)
+        return SimpleNamespace(data=data, count=len(data))
+
+    def execute(self) -> SimpleNamespace:
+        time.sleep(self.latency.sample())
+        return self._run()
+
+class AsyncFakeQuery(FakeQuery):
+    async def execute(self) -> SimpleNamespace:
+        await asyncio.sleep(self.latency.sample())
+        return self._run()
+
+class FakeSupabase:
+    query_class = FakeQuery
+
+    def __init__(self, db: FakeDatabase, latency: LatencyModel):
+        self.db = db
+        self.latency = latency
+
+    def table(self, name: str):
+        return self.query_class(self.db, name, self.latency)
+
+    def rpc(self, name: str, params=None):
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=[], count=None))
+
+class AsyncFakeSupabase(FakeSupabase):
+    query_class = AsyncFakeQuery
+
+def _fill_template(value: Any, key: str = "") -> Any:
+    """Plausible answer for a schema template from utils.structured_output"""
+    if isinstance(value, dict):
+        return {k: _fill_template(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        if key == "indices":
+            return [0, 1, 2]
+        return [_fill_template(value[0], key) if not isinstance(value[0], str) else random.choice(SAMPLE_WORDS) for _ in range(3)]
+    if isinstance(value, bool):
+        return True
+    if isinstance(value, (int, float)):
+        return 3
+    return f"Sample {key.replace('_', ' ')}".strip()
+
+def fake_completion(prompt: str) -> str:
+    """Response text for a prompt: schema-shaped JSON when the prompt declares one"""
+    match = re.search(r"exactly this structure:\n(.+)$", prompt, re.S)
+    if match:
+        try:
+            return json.dumps(_fill_template(json.loads(match.group(1).strip())))
+        except json.JSONDecodeError:
+            pass
+    return ("Results-driven engineer with a track record of shipping reliable distributed systems "
+            f"using {', '.join(random.sample(SAMPLE_WORDS, 3))}.")
+
+def _message(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def _chunk(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+class _AsyncCompletions:
+    def __init__(self, latency: LatencyModel, model_latency: Optional[Dict[str, LatencyModel]] = None,
+                 failing: Optional[Set[str]] = None):
+        self.latency = latency
+        self.model_latency = model_latency or {}
+        self.failing = failing if failing is not None else set()
+        self.calls: List[str] = []
+
+    async def create(self, model: str, messages, stream: bool = False, **kwargs):
+        self.calls.append(model)
+        content = fake_completion(messages[-1]["content"])
+        total = self.model_latency.get(model, self.latency).sample()
+        if model in self.failing:
+            await asyncio.sleep(total)
+            raise ConnectionError(f"{model} is unavailable")
+        if not stream:
+            await asyncio.sleep(total)
+            return _message(content)
+
+        async def chunks():
+            # About a third of the time goes to the first token, the rest is spread over the stream
+            await asyncio.sleep(total * 0.3)
+            pieces = [content[i:i + 16] for i in range(0, len(content), 16)] or [""]
+            for piece in pieces:
+                await asyncio.sleep(total * 0.7 / len(pieces))
+                yield _chunk(piece)
+        return chunks()
+
+class _SyncCompletions:
+    def __init__(self, latency: LatencyModel):
+        self.latency = latency
+
+    def create(self, model: str, messages, **kwargs):
+        time.sleep(self.latency.sample())
+        return _message(fake_completion(messages[-1]["content"]))
+
+class FakeAsyncGroq:
+    """Async Groq client; ``model_latency`` overrides the latency per model, models in
+    ``failing`` raise after it, and every requested model is appended to ``calls``"""
+
+    def __init__(self, latency: LatencyModel, model_latency: Optional[Dict[str, LatencyModel]] = None,
+                 failing: Optional[Set[str]] = None):
+        self.chat = SimpleNamespace(completions=_AsyncCompletions(latency, model_latency, failing))
+
+    @property
+    def calls(self) -> List[str]:
+        return self.chat.completions.calls
+
+class FakeGroq:
+    def __init__(self, latency: LatencyModel):
+        self.chat = SimpleNamespace(completions=_SyncCompletions(latency))
+
+def install(db: FakeDatabase, db_latency: LatencyModel, llm_latency: LatencyModel) -> None:
+    """Point every client factory the app uses at the stand-ins"""
+    import groq
+    import supabase
+    import utils.database as database
+
+    def create_client(url, key, *args, **kwargs):
+        return FakeSupabase(db, db_latency)
+
+    async def acreate_client(url, key, *args, **kwargs):
+        return AsyncFakeSupabase(db, db_latency)
+
+    supabase.create_client = create_client
+    database.create_client = create_client
+    database.acreate_client = acreate_client
+    groq.Groq = lambda *args, **kwargs: FakeGroq(llm_latency)
+    groq.AsyncGroq = lambda *args, **kwargs: FakeAsyncGroq(llm_latency)
+
+def seed_user(db: FakeDatabase, index: int) -> Dict[str, Any]:
+    """Create a user with a realistic profile and return their profile row"""
+    email = f"load{index}@example.com"
+    profile = db.insert("user_profiles", [{
+        "email": email,
+        "full_name": f"Load User {index}",
+        "years_of_experience": 5,
+        "location": "Remote"
+    }])[0]
+    user_id = profile["id"]
+    db.insert("work_experiences", [{
+        "user_id": user_id,
+        "company_name": f"Company {n}",
+        "position": "Software Engineer",
+        "start_date": f"20{15 + n}-01-01",
+        "achievements": [f"Built {random.choice(SAMPLE_WORDS)} pipelines serving {n + 1}M requests/day" for _ in range(3)],
+        "technologies": random.sample(SAMPLE_WORDS, 4)
+    } for n in range(4)])
+    db.insert("projects", [{
+        "user_id": user_id,
+        "title": f"Project {n}",
+        "start_date": f"20{18 + n}-06-01",
+        "achievements": [f"Shipped a {random.choice(SAMPLE_WORDS)} service"],
+        "technologies": random.sample(SAMPLE_WORDS, 3)
+    } for n in range(3)])
+    db.insert("education", [{"user_id": user_id, "institution": "State University", "degree": "BSc", "start_date": "2010-09-01"}])
+    db.insert("skills", [{"user_id": user_id, "skill_name": word, "category": "Technical", "proficiency_level": 4} for word in SAMPLE_WORDS[:6]])
+    return profile
@@ -0,0 +1,127 @@
+"""Per-generation memory of the resume workflow state.
+
+Runs the real workflow (Groq replaced by the stand-in from tools/standins.py)
+for a synthetic profile of configurable size, several generations at once for
+the same user, under tracemalloc. Prints the allocation peak and what each
+generation keeps afterwards, next to the size the old list-of-dicts state
+layout (full profile lists plus copied selections and tailored items) would
+have had for the same run.
+
+    python tools/state_memory.py --experiences 40 --projects 25 --skills 150 --concurrent 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tracemalloc
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.standins import FakeAsyncGroq, LatencyModel, SAMPLE_WORDS
+from utils.ai_agents import AIAgents, final_resume_state
+from utils.generation import build_initial_state
+from utils.profile_snapshot import load_profile_snapshot
+
+JOB_DESCRIPTION = """Senior Backend Engineer at Example Corp (fintech). 5+ years of Python,
+Kafka and PostgreSQL, event-driven payment services on Kubernetes and AWS."""
+
+def deep_size(obj: Any, seen=None) -> int:
+    """Bytes held by ``obj`` and everything it references (slots included), counted once"""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict) or hasattr(obj, "keys") and hasattr(obj, "items"):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_size(item, seen) for item in obj)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if slot != "__weakref__" and hasattr(obj, slot):
+                size += deep_size(getattr(obj, slot), seen)
+    return size
+
+def synthetic_inputs(experiences: int, projects: int, skills: int, bullets: int) -> Dict[str, Any]:
+    def achievements(n: int) -> List[str]:
+        return [f"Led the {SAMPLE_WORDS[(n + i) % len(SAMPLE_WORDS)]} migration for {i + 2} teams, "
+                f"cutting p99 latency by {10 + i}% and saving ${i + 1}00k per year" for i in range(bullets)]
+    return {
+        "user_profile": {"id": "u1", "full_name": "Memory Test", "email": "m@example.com", "location": "Remote",
+                         "years_of_experience": 8, "education": [{"institution": "State University", "degree": "BSc"}]},
+        "all_experiences": [{
+            "id": f"exp-{n}", "user_id": "u1", "company_name": f"Company {n}", "position": "Software Engineer",
+            "location": "Remote", "start_date": "2015-01-01", "end_date": "2016-01-01", "is_current": False,
+            "description": "Backend services and data pipelines. " * 4,
+            "achievements": achievements(n), "technologies": SAMPLE_WORDS[:5]
+        } for n in range(experiences)],
+        "all_projects": [{
+            "id": f"proj-{n}", "user_id": "u1", "title": f"Project {n}", "description": "Side project. " * 6,
+            "achievements": achievements(n), "technologies": SAMPLE_WORDS[3:7]
+        } for n in range(projects)],
+        "all_skills": [{"id": f"skill-{n}", "user_id": "u1", "skill_name": f"{SAMPLE_WORDS[n % len(SAMPLE_WORDS)]} {n}",
+                        "category": "Technical", "proficiency_level": 4} for n in range(skills)]
+    }
+
+def legacy_state(inputs: Dict[str, Any], final_state: Dict[str, Any]) -> Dict[str, Any]:
+    """The same run in the old layout: every profile list plus copied selections and tailored items"""
+    by_id = {item["id"]: item for item in inputs["all_experiences"] + inputs["all_projects"]}
+    return {
+        **final_state,
+        **{key: json.loads(json.dumps(value)) for key, value in inputs.items()},
+        "selected_experiences": [dict(by_id[e["id"]]) for e in final_state["tailored_experiences"]],
+        "selected_projects": [dict(by_id[p["id"]]) for p in final_state["tailored_projects"]],
+    }
+
+async def run(args) -> Dict[str, Any]:
+    inputs = synthetic_inputs(args.experiences, args.projects, args.skills, args.bullets)
+    agents = AIAgents()
+    agents.groq_client = FakeAsyncGroq(LatencyModel(args.llm_latency_ms))
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    snapshot = load_profile_snapshot("u1", inputs)
+    snapshot_bytes = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    states = await asyncio.gather(*[
+        agents.arun_workflow(build_initial_state("u1", JOB_DESCRIPTION, snapshot)) for _ in range(args.concurrent)
+    ])
+    finals = [final_resume_state(state, snapshot) for state in states]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    legacy = legacy_state(inputs, finals[0])
+    return {
+        "profile": {k: args.__dict__[k] for k in ("experiences", "projects", "skills", "bullets")},
+        "concurrent": args.concurrent,
+        "snapshot_kb_shared": round(snapshot_bytes / 1024, 1),
+        "peak_kb_per_generation": round((peak - start) / 1024 / args.concurrent, 1),
+        "retained_kb_per_generation": round((current - start) / 1024 / args.concurrent, 1),
+        "workflow_state_kb": round(deep_size(states[0]) / 1024, 1),
+        "final_state_kb": round(deep_size(finals[0]) / 1024, 1),
+        "final_state_json_kb": round(len(json.dumps(finals[0])) / 1024, 1),
+        "legacy_state_kb": round(deep_size(legacy) / 1024, 1),
+        "legacy_state_json_kb": round(len(json.dumps(legacy)) / 1024, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Workflow state memory per generation")
+    parser.add_argument("--experiences", type=int, default=40)
+    parser.add_argument("--projects", type=int, default=25)
+    parser.add_argument("--skills", type=int, default=150)
+    parser.add_argument("--bullets", type=int, default=6, help="achievements per experience/project")
+    parser.add_argument("--concurrent", type=int, default=10, help="generations for the same profile at once")
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    width = max(len(k) for k in report)
+    for key, value in report.items():
+        print(f"{key:<{width}}  {value}")
+
+if __name__ == "__main__":
+    main()
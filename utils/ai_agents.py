@@ -1,106 +1,370 @@
-Of course. Here is the complete and final version of the `utils/ai_agents.py` file, continuing from the `# Fallback summary` point. This version includes robust error handling and fallback logic for every step to prevent crashes.
-
-## 6️⃣ `utils/ai_agents.py` (Complete Crash-Proof Version)
-```python
-import groq
+import asyncio
+import contextvars
 import json
+import operator
 import streamlit as st
-from typing import List, Dict, Any, TypedDict, Optional
-from langgraph.graph import StateGraph, END
+from contextlib import aclosing, contextmanager
+from typing import List, Dict, Any, TypedDict, Optional, Annotated, Tuple
 import re
+import time
 import traceback
+from utils.structured_output import IncrementalJSONParser, coerce_to_schema, parse_json_lenient, schema_instructions, SchemaError
+from utils.async_runtime import run_sync
+from utils.cache import TTLCache
+from utils.cassette import install_cassette_from_env
+from utils.checkpoints import aget_checkpointer, checkpoint_config
+from utils.deadline import (
+    call_timeout, current_deadline, deadline_scope, has_budget, remaining_budget,
+    MIN_LLM_BUDGET_SECONDS, NON_CRITICAL_MIN_BUDGET_SECONDS, SUMMARY_RESERVE_SECONDS
+)
+from utils.ats_score import jd_keywords, score_sections, sections_to_retailor, source_sections, state_sections
+from utils.variant_bank import cluster_for_jd, enqueue_variant_precompute, get_variant_bank
+from utils.profile_snapshot import ProfileRecord, ProfileSnapshot, get_profile_snapshot
+from utils.model_router import (
+    ModelRouter, get_model_router, TASK_JD_ANALYSIS, TASK_SELECTION, TASK_SUMMARY, TASK_TAILORING, TASK_COMPANY_RESEARCH
+)
+
+# Company research is shared across users and changes slowly, so cache it for a long time
+COMPANY_RESEARCH_TTL = 60 * 60 * 24 * 30
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "plc", "gmbh", "ag", "sa", "group", "holdings"}
+
+# Declared output schemas for every structured prompt
+JD_ANALYSIS_SCHEMA = {
+    "job_title": str,
+    "company_name": str,
+    "required_skills": [str],
+    "preferred_skills": [str],
+    "responsibilities": [str],
+    "qualifications": [str],
+    "experience_required": str,
+    "education_required": str,
+    "keywords": [str],
+    "industry": str,
+    "job_type": str
+}
+COMPANY_INFO_SCHEMA = {
+    "company_culture": [str],
+    "company_size": str,
+    "known_technologies": [str],
+    "company_values": [str],
+    "work_environment": str
+}
+INDEX_SELECTION_SCHEMA = {"indices": [int]}
+ACHIEVEMENTS_SCHEMA = {"achievements": [str]}
+
+# Upper bound for a single Groq request; shrunk further by any workflow deadline
+LLM_TIMEOUT_SECONDS = 30
+
+# Models served with Groq's JSON mode (response_format=json_object), which does not support streaming
+JSON_MODE_MODELS = {"mixtral-8x7b-32768", "llama3-8b-8192", "llama3-70b-8192", "gemma-7b-it"}
+
+def normalize_company_name(company_name: str) -> str:
+    """Normalize a company name so spelling variants share one cache entry"""
+    tokens = re.sub(r"[^a-z0-9&+ ]", " ", (company_name or "").lower()).split()
+    while len(tokens) > 1 and tokens[-1] in COMPANY_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+# Process-wide company research cache keyed only by the normalized name
+_company_research_cache = TTLCache(ttl=COMPANY_RESEARCH_TTL, max_entries=5000)
+
+# LLM answers asked for and received in the current workflow step (see AIAgents._step_scope)
+_llm_tally: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("llm_tally", default=None)
+
+def _tally_llm(key: str) -> None:
+    tally = _llm_tally.get()
+    if tally is not None:
+        tally[key] += 1
+
+def _note_warning(message: str) -> None:
+    """Keep a failure for the step's state; Streamlit calls from the event loop never reach the page"""
+    tally = _llm_tally.get()
+    if tally is not None and message not in tally["warnings"]:
+        tally["warnings"].append(message)
+
+async def _aclose_stream(stream) -> None:
+    """Release a streamed response: groq's AsyncStream has close(), plain async generators aclose()"""
+    close = getattr(stream, "close", None) or getattr(stream, "aclose", None)
+    if close is not None:
+        await close()
+
+@st.cache_resource
+def get_groq_client():
+    """Process-wide async Groq client, so every session shares one connection pool"""
+    import groq  # deferred like langgraph below: pages that never call the LLM skip the import
+    install_cassette_from_env()  # record/replay runs (utils/cassette.py)
+    return groq.AsyncGroq(api_key=st.secrets["GROQ_API_KEY"])
 
 class ResumeState(TypedDict):
-    """State for the resume generation workflow"""
+    """State for the resume generation workflow.
+
+    Profile items live in a shared ProfileSnapshot; the state refers to them by
+    ID and keeps only the fields the workflow rewrote (see final_resume_state).
+    """
     user_id: str
     job_description: str
     jd_analysis: Dict[str, Any]
-    user_profile: Dict[str, Any]
-    all_experiences: List[Dict[str, Any]]
-    all_projects: List[Dict[str, Any]]
-    all_skills: List[Dict[str, Any]]
-    selected_experiences: List[Dict[str, Any]]
-    selected_projects: List[Dict[str, Any]]
+    profile_key: str
+    selected_experience_ids: List[str]
+    selected_project_ids: List[str]
     selected_skills: List[str]
     tailored_summary: str
-    tailored_experiences: List[Dict[str, Any]]
-    tailored_projects: List[Dict[str, Any]]
-    resume_content: str
+    # Tailored fields per item ID, applied over the snapshot's records
+    experience_overlays: Dict[str, Dict[str, Any]]
+    project_overlays: Dict[str, Dict[str, Any]]
     company_info: Dict[str, Any]
+    # Keyword coverage after the review pass (utils.ats_score), and what it re-tailored
+    ats_score: Dict[str, Any]
+    # Items tailored from the precomputed variant bank instead of a live LLM call
+    variant_hits: Annotated[List[str], operator.add]
+    # Steps whose LLM calls all went unanswered (deadline spent, Groq down), so their output is the fallback
+    fallback_steps: Annotated[List[str], operator.add]
+    # Failures worth telling the user about (Groq unavailable, calls that failed), shown by the page
+    warnings: Annotated[List[str], operator.add]
     error: Optional[str]
+    # Absolute time.time() by which the workflow must finish; None for no limit
+    deadline: Optional[float]
+    # Names of finished nodes; the reducer is what lets analyze_jd fan out to parallel branches
+    completed_steps: Annotated[List[str], operator.add]
 
 class AIAgents:
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None):
+        self.client_error = None
         try:
-            self.groq_client = groq.Groq(api_key=st.secrets["GROQ_API_KEY"])
-            self.model = "mixtral-8x7b-32768"
+            self.groq_client = get_groq_client()
         except Exception as e:
-            st.error(f"Failed to initialize Groq client: {str(e)}")
+            self.client_error = f"Failed to initialize Groq client: {str(e)}"
             self.groq_client = None
-            self.model = None
+        # Picks a model per task type and fails over using shared latency/error stats
+        self.router = router or get_model_router()
+        self._workflow = None
+        self._checkpointed_workflow = None
     
     def _safe_json_parse(self, text: str, default: Any = None) -> Any:
-        """Safely parse JSON with multiple fallback strategies"""
+        """Safely parse JSON from an LLM response, repairing truncated output"""
         if default is None:
             default = {}
         
-        # Clean the text
-        text = text.strip()
-        
-        # Remove markdown code blocks
-        if text.startswith("```json"):
-            text = text[7:]
-        elif text.startswith("```"):
-            text = text[3:]
-        
-        if text.endswith("```"):
-            text = text[:-3]
-        
-        text = text.strip()
-        
-        # Try to parse
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            # Try to find JSON object in the text
-            try:
-                # Look for JSON object pattern
-                match = re.search(r'\{[^{}]*\}', text, re.DOTALL)
-                if match:
-                    return json.loads(match.group())
-            except:
-                pass
-            
-            # Try to find JSON array pattern
-            try:
-                match = re.search(r'\[[\d,\s]+\]', text)
-                if match:
-                    return json.loads(match.group())
-            except:
-                pass
-        
-        return default
+        result = parse_json_lenient(text)
+        return default if result is None else result
     
-    def _call_llm(self, prompt: str, temperature: float = 0.3, max_tokens: int = 1000) -> str:
-        """Helper method to call Groq LLM with error handling"""
-        if not self.groq_client:
-            return ""
-        
+    def _call_llm(self, prompt: str, temperature: float = 0.3, max_tokens: int = 1000, json_mode: bool = False, task: str = TASK_TAILORING) -> str:
+        """Sync facade for _acall_llm"""
+        return run_sync(self._acall_llm(prompt, temperature, max_tokens, json_mode, task))
+    
+    async def _acomplete(self, model: str, prompt: str, temperature: float, max_tokens: int, json_mode: bool) -> str:
+        """One chat completion against one model, recorded in the router's stats"""
+        import groq
+        start = time.monotonic()
+        timeout = call_timeout(LLM_TIMEOUT_SECONDS)
         try:
-            response = self.groq_client.chat.completions.create(
-                model=self.model,
+            extra = {"response_format": {"type": "json_object"}} if json_mode and model in JSON_MODE_MODELS else {}
+            response = await self.groq_client.chat.completions.create(
+                model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
                 max_tokens=max_tokens,
-                timeout=30  # 30 second timeout
+                timeout=timeout,
+                **extra
             )
-            return response.choices[0].message.content
+        except asyncio.CancelledError:
+            raise  # a losing hedge, not a model failure
         except Exception as e:
-            st.warning(f"LLM call failed: {str(e)}")
+            self._record_failure(model, start, timeout, e)
+            raise
+        self.router.record(model, time.monotonic() - start, ok=True)
+        return response.choices[0].message.content
+
+    def _record_failure(self, model: str, start: float, timeout: float, error: Exception) -> None:
+        """Count a failed call against the model, unless it only timed out because our deadline shortened its timeout"""
+        import groq
+        import httpx
+        # Running out of our own deadline says nothing about the model's health
+        if isinstance(error, (groq.APITimeoutError, httpx.TimeoutException)) and timeout < LLM_TIMEOUT_SECONDS:
+            return
+        self.router.record(model, time.monotonic() - start, ok=False)
+    
+    async def _ahedged_complete(self, model: str, prompt: str, temperature: float, max_tokens: int, json_mode: bool) -> str:
+        """Complete with a hedge: if the first request outlives the model's hedge delay
+        (a high latency percentile), send a duplicate and take whichever answers first."""
+        attempts = {asyncio.ensure_future(self._acomplete(model, prompt, temperature, max_tokens, json_mode))}
+        hedged = False
+        last_error = None
+        try:
+            while attempts:
+                timeout = None if hedged else self.router.hedge_delay(model)
+                done, attempts = await asyncio.wait(attempts, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    last_error = attempt.exception()
+                if not hedged and not done:
+                    # The first request is slower than usual for this model: issue the duplicate
+                    hedged = True
+                    attempts.add(asyncio.ensure_future(self._acomplete(model, prompt, temperature, max_tokens, json_mode)))
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+        raise last_error
+    
+    async def _acall_llm(self, prompt: str, temperature: float = 0.3, max_tokens: int = 1000, json_mode: bool = False, task: str = TASK_TAILORING) -> str:
+        """Helper method to call Groq LLM with error handling.
+
+        Tries the router's models for ``task`` in order until one succeeds, hedging
+        slow requests. Models with an open circuit breaker are skipped, so while
+        Groq is unhealthy this returns "" at once and callers use their fallbacks.
+        The same happens once the current deadline leaves too little time for a
+        call. ``json_mode`` is applied only on models that support it.
+        """
+        _tally_llm("asked")
+        if not self.groq_client:
+            _note_warning(self.client_error)
             return ""
+        
+        last_error = None
+        for model in self.router.candidates(task):
+            if not has_budget(MIN_LLM_BUDGET_SECONDS):
+                break
+            if not self.router.claim(model):
+                continue  # another request took its half-open probe meanwhile
+            try:
+                response = await self._ahedged_complete(model, prompt, temperature, max_tokens, json_mode)
+                _tally_llm("answered")
+                return response
+            except Exception as e:
+                last_error = e
+        
+        if last_error is not None:
+            _note_warning(f"LLM call failed: {str(last_error)}")
+        return ""
     
-    def analyze_job_description(self, jd_text: str) -> Dict[str, Any]:
-        """Analyze job description with robust error handling"""
+    async def _astream_llm(self, prompt: str, temperature: float = 0.3, max_tokens: int = 1000, task: str = TASK_TAILORING):
+        """Yield response text chunks from a streaming Groq call; yields nothing on failure.
+
+        Fails over to the next model only if nothing has been streamed yet.
+        """
+        _tally_llm("asked")
+        if not self.groq_client:
+            _note_warning(self.client_error)
+            return
+        
+        last_error = None
+        for model in self.router.candidates(task):
+            if not has_budget(MIN_LLM_BUDGET_SECONDS):
+                break
+            if not self.router.claim(model):
+                continue
+            start = time.monotonic()
+            timeout = call_timeout(LLM_TIMEOUT_SECONDS)
+            streamed = False
+            stream = None
+            try:
+                stream = await self.groq_client.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    timeout=timeout,
+                    stream=True
+                )
+                async for chunk in stream:
+                    if remaining_budget() == 0:
+                        # Out of time: keep what has streamed so far (the parser repairs truncation)
+                        return
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if not streamed:
+                            streamed = True
+                            _tally_llm("answered")
+                        yield chunk.choices[0].delta.content
+                self.router.record(model, time.monotonic() - start, ok=True)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._record_failure(model, start, timeout, e)
+                last_error = e
+                if streamed:
+                    break
+            finally:
+                if stream is not None:
+                    await _aclose_stream(stream)
+        
+        if last_error is not None:
+            _note_warning(f"LLM call failed: {str(last_error)}")
+    
+    async def _acall_structured(self, prompt: str, schema: Dict[str, Any], temperature: float = 0.3, max_tokens: int = 1000, on_field=None, task: str = TASK_TAILORING) -> Optional[Dict[str, Any]]:
+        """Call the LLM for a JSON object matching ``schema``.
+
+        Uses JSON mode when the model supports it. When ``on_field`` is given the
+        response is streamed instead and ``on_field(key, value)`` is called for each
+        top-level field as soon as it is complete. Returns the schema-coerced
+        object (possibly partial if the output was truncated), or None if nothing
+        usable came back.
+        """
+        prompt = f"{prompt}\n\n{schema_instructions(schema)}"
+        parser = IncrementalJSONParser(schema)
+        
+        if on_field is not None:
+            # Closed on an early break too, so the response's connection is released at once
+            async with aclosing(self._astream_llm(prompt, temperature=temperature, max_tokens=max_tokens, task=task)) as chunks:
+                async for chunk in chunks:
+                    for key, value in parser.feed(chunk):
+                        if key in schema:
+                            try:
+                                on_field(key, coerce_to_schema(value, schema[key]))
+                            except SchemaError:
+                                pass
+                    if parser.done:
+                        break
+        else:
+            response = await self._acall_llm(prompt, temperature=temperature, max_tokens=max_tokens, json_mode=True, task=task)
+            parser.feed(response)
+        
+        try:
+            result = coerce_to_schema(parser.snapshot(), schema)
+        except SchemaError:
+            return None
+        return result or None
+    
+    async def _aselect_indices(self, prompt: str, count: int) -> List[int]:
+        """Ask the LLM to pick item indices; returns only in-range, de-duplicated indices"""
+        result = await self._acall_structured(prompt, INDEX_SELECTION_SCHEMA, max_tokens=50, task=TASK_SELECTION)
+        indices = []
+        for idx in (result or {}).get("indices", []):
+            if 0 <= idx < count and idx not in indices:
+                indices.append(idx)
+        return indices
+    
+    # Sync facades over the async implementations, for callers outside the event loop
+    def analyze_job_description(self, jd_text: str, on_field=None) -> Dict[str, Any]:
+        return run_sync(self.aanalyze_job_description(jd_text, on_field))
+    
+    def research_company(self, company_name: str, industry: str = "") -> Dict[str, Any]:
+        return run_sync(self.aresearch_company(company_name, industry))
+    
+    def select_relevant_experiences(self, experiences: List[Dict], jd_analysis: Dict, limit: int = 3) -> List[Dict]:
+        return run_sync(self.aselect_relevant_experiences(experiences, jd_analysis, limit))
+    
+    def select_relevant_projects(self, projects: List[Dict], jd_analysis: Dict, limit: int = 3) -> List[Dict]:
+        return run_sync(self.aselect_relevant_projects(projects, jd_analysis, limit))
+    
+    def generate_tailored_summary(self, profile: Dict, jd_analysis: Dict, experiences: List[Dict], company_info: Optional[Dict] = None) -> str:
+        return run_sync(self.agenerate_tailored_summary(profile, jd_analysis, experiences, company_info))
+    
+    def tailor_experience_description(self, experience: Dict, jd_analysis: Dict) -> Dict:
+        return run_sync(self.atailor_experience_description(experience, jd_analysis))
+    
+    def tailor_project_description(self, project: Dict, jd_analysis: Dict) -> Dict:
+        return run_sync(self.atailor_project_description(project, jd_analysis))
+    
+    def run_workflow(self, initial_state: ResumeState, thread_id: Optional[str] = None) -> ResumeState:
+        return run_sync(self.arun_workflow(initial_state, thread_id))
+    
+    async def aanalyze_job_description(self, jd_text: str, on_field=None) -> Dict[str, Any]:
+        """Analyze job description with robust error handling.
+
+        ``on_field(key, value)`` is called as each field streams in, if given.
+        """
         default_result = {
             "job_title": "Software Engineer",
             "company_name": "Company",
@@ -118,37 +382,26 @@ class AIAgents:
         if not jd_text:
             return default_result
         
+        # Limit length to avoid token issues
         prompt = f"""
-        Analyze this job description and extract information in JSON format:
-        {{
-            "job_title": "extracted job title",
-            "company_name": "extracted company name",
-            "required_skills": ["skill1", "skill2"],
-            "preferred_skills": ["skill1", "skill2"],
-            "responsibilities": ["resp1", "resp2"],
-            "qualifications": ["qual1", "qual2"],
-            "experience_required": "X years",
-            "education_required": "degree requirement",
-            "keywords": ["keyword1", "keyword2"],
-            "industry": "industry name",
-            "job_type": "full-time/part-time/contract/remote"
-        }}
+        Analyze this job description and extract the job title, company name, required and
+        preferred skills, responsibilities, qualifications, experience required (e.g. "X years"),
+        education required, ATS keywords, industry and job type (full-time/part-time/contract/remote).
         
         Job Description:
-        {jd_text[:2000]}  # Limit length to avoid token issues
+        {jd_text[:2000]}
         """
         
         try:
-            response = self._call_llm(prompt)
-            if response:
-                result = self._safe_json_parse(response, default_result)
+            result = await self._acall_structured(prompt, JD_ANALYSIS_SCHEMA, on_field=on_field, task=TASK_JD_ANALYSIS)
+            if result:
                 # Ensure all required keys exist
                 for key in default_result:
                     if key not in result:
                         result[key] = default_result[key]
                 return result
         except Exception as e:
-            st.warning(f"JD analysis failed: {str(e)}")
+            _note_warning(f"JD analysis failed: {str(e)}")
         
         # Fallback: Basic extraction
         try:
@@ -173,8 +426,11 @@ class AIAgents:
         
         return default_result
     
-    def research_company(self, company_name: str, industry: str = "") -> Dict[str, Any]:
-        """Research company with fallback values"""
+    async def aresearch_company(self, company_name: str, industry: str = "", allow_lookup: bool = True) -> Dict[str, Any]:
+        """Research company with fallback values, served from the shared cache when possible.
+
+        With ``allow_lookup=False`` only the cache is consulted.
+        """
         default_result = {
             "company_culture": ["innovation", "teamwork", "excellence"],
             "company_size": "medium",
@@ -183,37 +439,52 @@ class AIAgents:
             "work_environment": "professional and collaborative"
         }
         
-        if not company_name or company_name == "Company":
+        normalized_name = normalize_company_name(company_name)
+        if not normalized_name or normalized_name == "company":
             return default_result
         
+        try:
+            if allow_lookup:
+                # Failed lookups raise inside the cache, so fallbacks are never cached
+                cached = await _company_research_cache.aget_or_compute(
+                    normalized_name, lambda: self._afetch_company_info(company_name, industry)
+                )
+            else:
+                cached = _company_research_cache.get(normalized_name)
+                if cached is None:
+                    return default_result
+            result = dict(cached)
+            for key in default_result:
+                if key not in result:
+                    result[key] = default_result[key]
+            return result
+        except Exception:
+            pass
+        
+        return default_result
+    
+    async def _afetch_company_info(self, company_name: str, industry: str = "") -> Dict[str, Any]:
+        """Ask the LLM about a company; raises when the response is unusable"""
         prompt = f"""
-        Provide brief information about {company_name} in the {industry} industry.
-        Format as JSON with these fields:
-        - company_culture (list of 3 values)
-        - company_size (startup/small/medium/large)
-        - known_technologies (list of technologies)
-        - company_values (list of 3 values)
-        - work_environment (brief description)
+        Provide brief information about {company_name} in the {industry} industry:
+        3 company culture values, company size (startup/small/medium/large), known
+        technologies, 3 company values and a brief description of the work environment.
         
         Keep it concise. If unknown, provide reasonable assumptions.
         """
         
-        try:
-            response = self._call_llm(prompt, temperature=0.5, max_tokens=300)
-            if response:
-                result = self._safe_json_parse(response, default_result)
-                # Validate and limit list sizes
-                if isinstance(result.get("company_culture"), list):
-                    result["company_culture"] = result["company_culture"][:5]
-                if isinstance(result.get("known_technologies"), list):
-                    result["known_technologies"] = result["known_technologies"][:10]
-                return result
-        except:
-            pass
+        result = await self._acall_structured(prompt, COMPANY_INFO_SCHEMA, temperature=0.5, max_tokens=300, task=TASK_COMPANY_RESEARCH)
+        if not result:
+            raise ValueError(f"No usable company research for {company_name}")
         
-        return default_result
+        # Limit list sizes
+        if "company_culture" in result:
+            result["company_culture"] = result["company_culture"][:5]
+        if "known_technologies" in result:
+            result["known_technologies"] = result["known_technologies"][:10]
+        return result
     
-    def select_relevant_experiences(self, experiences: List[Dict], jd_analysis: Dict, limit: int = 3) -> List[Dict]:
+    async def aselect_relevant_experiences(self, experiences: List[Dict], jd_analysis: Dict, limit: int = 3) -> List[Dict]:
         """Select relevant experiences with fallback logic"""
         if not experiences:
             return []
@@ -228,26 +499,20 @@ class AIAgents:
             if required_skills and self.groq_client:
                 prompt = f"""
                 From these {len(experiences)} work experiences, select the {limit} most relevant.
-                Return ONLY a JSON array of indices (0-based). Example: [0, 2, 3]
+                Give their 0-based indices.
                 
                 Required skills: {', '.join(required_skills[:5])}
                 
                 Experiences:
                 """
                 
-                for i, exp in enumerate(experiences[:10]):  # Limit to first 10
+                candidates = experiences[:10]  # Limit to first 10
+                for i, exp in enumerate(candidates):
                     prompt += f"\n{i}. {exp.get('position', 'Position')} at {exp.get('company_name', 'Company')}"
                 
-                response = self._call_llm(prompt, max_tokens=50)
-                if response:
-                    indices = self._safe_json_parse(response, [])
-                    if isinstance(indices, list) and indices:
-                        selected = []
-                        for idx in indices:
-                            if isinstance(idx, int) and 0 <= idx < len(experiences):
-                                selected.append(experiences[idx])
-                        if selected:
-                            return selected[:limit]
+                indices = await self._aselect_indices(prompt, len(candidates))
+                if indices:
+                    return [candidates[idx] for idx in indices][:limit]
         except:
             pass
         
@@ -277,7 +542,7 @@ class AIAgents:
         # Final fallback: return most recent
         return experiences[:limit]
     
-    def select_relevant_projects(self, projects: List[Dict], jd_analysis: Dict, limit: int = 3) -> List[Dict]:
+    async def aselect_relevant_projects(self, projects: List[Dict], jd_analysis: Dict, limit: int = 3) -> List[Dict]:
         """Select relevant projects with fallback logic"""
         if not projects:
             return []
@@ -290,25 +555,19 @@ class AIAgents:
             required_skills = jd_analysis.get('required_skills', [])
             if required_skills and self.groq_client:
                 prompt = f"""
-                Select {limit} most relevant projects. Return JSON array of indices.
+                Select {limit} most relevant projects. Give their 0-based indices.
                 Required skills: {', '.join(required_skills[:5])}
                 
                 Projects:
                 """
                 
-                for i, proj in enumerate(projects[:10]):
+                candidates = projects[:10]
+                for i, proj in enumerate(candidates):
                     prompt += f"\n{i}. {proj.get('title', 'Project')}"
                 
-                response = self._call_llm(prompt, max_tokens=50)
-                if response:
-                    indices = self._safe_json_parse(response, [])
-                    if isinstance(indices, list) and indices:
-                        selected = []
-                        for idx in indices:
-                            if isinstance(idx, int) and 0 <= idx < len(projects):
-                                selected.append(projects[idx])
-                        if selected:
-                            return selected[:limit]
+                indices = await self._aselect_indices(prompt, len(candidates))
+                if indices:
+                    return [candidates[idx] for idx in indices][:limit]
         except:
             pass
         
@@ -343,7 +602,7 @@ class AIAgents:
             # Extract skill names
             all_skills = []
             for skill in skills:
-                if isinstance(skill, dict) and 'skill_name' in skill:
+                if isinstance(skill, (dict, ProfileRecord)) and 'skill_name' in skill:
                     all_skills.append(skill['skill_name'])
             
             if not all_skills:
@@ -369,9 +628,9 @@ class AIAgents:
             return (matching_skills + remaining_skills)[:20]  # Limit total
         except:
             # Fallback: return all skill names
-            return [s.get('skill_name', '') for s in skills if isinstance(s, dict)][:20]
+            return [s.get('skill_name', '') for s in skills if isinstance(s, (dict, ProfileRecord))][:20]
     
-    def generate_tailored_summary(self, profile: Dict, jd_analysis: Dict, experiences: List[Dict]) -> str:
+    async def agenerate_tailored_summary(self, profile: Dict, jd_analysis: Dict, experiences: List[Dict], company_info: Optional[Dict] = None) -> str:
         """Generate tailored summary with fallback"""
         try:
             # Build context
@@ -380,6 +639,15 @@ class AIAgents:
             target_role = jd_analysis.get('job_title', 'Software Engineer')
             key_skills = jd_analysis.get('required_skills', [])[:3]
             
+            company_context = ""
+            if company_info:
+                company_context = f"""
+                - Company: {jd_analysis.get('company_name', 'the company')} ({company_info.get('company_size', 'medium')})
+                - Company values: {', '.join(map(str, company_info.get('company_values', [])[:3]))}
+                - Company culture: {', '.join(map(str, company_info.get('company_culture', [])[:3]))}
+                - Technologies they use: {', '.join(map(str, company_info.get('known_technologies', [])[:5]))}
+                """
+            
             if self.groq_client:
                 prompt = f"""
                 Write a 3-4 sentence professional summary for a resume.
@@ -387,11 +655,11 @@ class AIAgents:
                 - Current/Recent: {current_role}
                 - Applying for: {target_role}
                 - Key skills: {', '.join(key_skills)}
-                
-                Make it compelling and ATS-friendly. No first person pronouns.
+                {company_context}
+                Make it compelling and ATS-friendly and aligned with the company's values. No first person pronouns.
                 """
                 
-                response = self._call_llm(prompt, temperature=0.7, max_tokens=150)
+                response = await self._acall_llm(prompt, temperature=0.7, max_tokens=150, task=TASK_SUMMARY)
                 if response and len(response) > 50:
                     return response.strip()
         except:
@@ -402,8 +670,8 @@ class AIAgents:
         skills = jd_analysis.get('required_skills', ['software development'])[:2]
         return f"Experienced professional with {years}+ years in software development. Skilled in {', '.join(skills)} with a proven track record of delivering high-quality solutions. Seeking to leverage technical expertise and problem-solving abilities in a challenging role."
     
-    def tailor_experience_description(self, experience: Dict, jd_analysis: Dict) -> Dict:
-        """Tailor experience with safe fallback"""
+    async def atailor_experience_description(self, experience: Dict, jd_analysis: Dict) -> Dict:
+        """Tailored fields for an experience; empty (keep the original) on any failure"""
         try:
             if self.groq_client and experience.get('achievements'):
                 prompt = f"""
@@ -411,26 +679,19 @@ class AIAgents:
                 Focus on keywords: {', '.join(jd_analysis.get('keywords', [])[:5])}
                 
                 Original Achievements:
-                {experience.get('achievements', [])}
-                
-                Return ONLY JSON with an "achievements" key containing a list of strings.
-                Example: {{"achievements": ["achievement1", "achievement2"]}}
+                {list(experience.get('achievements', []))}
                 """
                 
-                response = self._call_llm(prompt, temperature=0.5, max_tokens=300)
-                if response:
-                    tailored_data = self._safe_json_parse(response, {})
-                    new_experience = experience.copy()
-                    if isinstance(tailored_data.get('achievements'), list):
-                        new_experience['achievements'] = tailored_data['achievements']
-                    return new_experience
+                tailored_data = await self._acall_structured(prompt, ACHIEVEMENTS_SCHEMA, temperature=0.5, max_tokens=300, task=TASK_TAILORING)
+                if tailored_data and tailored_data.get('achievements'):
+                    return {'achievements': tailored_data['achievements']}
         except Exception:
             pass
         
-        return experience
+        return {}
     
-    def tailor_project_description(self, project: Dict, jd_analysis: Dict) -> Dict:
-        """Tailor project with safe fallback"""
+    async def atailor_project_description(self, project: Dict, jd_analysis: Dict) -> Dict:
+        """Tailored fields for a project; empty (keep the original) on any failure"""
         try:
             if self.groq_client and project.get('achievements'):
                 prompt = f"""
@@ -438,81 +699,304 @@ class AIAgents:
                 Focus on skills: {', '.join(jd_analysis.get('required_skills', [])[:5])}
                 
                 Original Achievements:
-                {project.get('achievements', [])}
-                
-                Return ONLY JSON with an "achievements" key containing a list of strings.
-                Example: {{"achievements": ["feature1", "feature2"]}}
+                {list(project.get('achievements', []))}
                 """
                 
-                response = self._call_llm(prompt, temperature=0.5, max_tokens=300)
-                if response:
-                    tailored_data = self._safe_json_parse(response, {})
-                    new_project = project.copy()
-                    if isinstance(tailored_data.get('achievements'), list):
-                        new_project['achievements'] = tailored_data['achievements']
-                    return new_project
+                tailored_data = await self._acall_structured(prompt, ACHIEVEMENTS_SCHEMA, temperature=0.5, max_tokens=300, task=TASK_TAILORING)
+                if tailored_data and tailored_data.get('achievements'):
+                    return {'achievements': tailored_data['achievements']}
         except Exception:
             pass
             
-        return project
+        return {}
     
-    def create_resume_workflow(self):
-        """Create the LangGraph workflow for resume generation"""
+    async def aretarget_achievements(self, item: Dict, missing_keywords: List[str]) -> Dict:
+        """Tailored fields that work in missing JD keywords; empty when nothing usable comes back"""
+        try:
+            if self.groq_client and item.get('achievements'):
+                prompt = f"""
+                Rewrite these achievements so they naturally include as many of these missing
+                job keywords as the original facts truthfully support. Do not invent experience.
+                Missing keywords: {', '.join(missing_keywords[:8])}
+                
+                Achievements:
+                {list(item.get('achievements', []))}
+                """
+                
+                tailored_data = await self._acall_structured(prompt, ACHIEVEMENTS_SCHEMA, temperature=0.4, max_tokens=300, task=TASK_TAILORING)
+                if tailored_data and tailored_data.get('achievements'):
+                    return {'achievements': tailored_data['achievements']}
+        except Exception:
+            pass
+        
+        return {}
+    
+    async def aretarget_summary(self, summary: str, missing_keywords: List[str]) -> str:
+        """Summary reworked to include missing JD keywords; the original on any failure"""
+        try:
+            if self.groq_client and summary:
+                prompt = f"""
+                Revise this resume summary to naturally include these job keywords where they fit,
+                keeping it 3-4 sentences, ATS-friendly and without first person pronouns.
+                Keywords: {', '.join(missing_keywords[:8])}
+                
+                Summary: {summary}
+                """
+                
+                response = await self._acall_llm(prompt, temperature=0.5, max_tokens=180, task=TASK_SUMMARY)
+                if response and len(response) > 50:
+                    return response.strip()
+        except Exception:
+            pass
+        
+        return summary
+    
+    def create_resume_workflow(self, checkpointer=None):
+        """Create the LangGraph workflow for resume generation (run it with ainvoke)"""
+        from langgraph.graph import StateGraph, END
         workflow = StateGraph(ResumeState)
         
         # Define nodes
         workflow.add_node("analyze_jd", self.analyze_jd_node)
+        workflow.add_node("research_company", self.research_company_node)
         workflow.add_node("select_content", self.select_content_node)
         workflow.add_node("tailor_summary", self.tailor_summary_node)
         workflow.add_node("tailor_experiences", self.tailor_experiences_node)
         workflow.add_node("tailor_projects", self.tailor_projects_node)
+        workflow.add_node("ats_review", self.ats_review_node)
         
         # Define edges
         workflow.set_entry_point("analyze_jd")
         workflow.add_edge("analyze_jd", "select_content")
-        workflow.add_edge("select_content", "tailor_summary")
-        workflow.add_edge("tailor_summary", "tailor_experiences")
+        # Company research runs alongside selection and tailoring; only the summary
+        # needs it, so it waits for both branches and research stays off the critical path
+        workflow.add_edge("analyze_jd", "research_company")
+        workflow.add_edge("select_content", "tailor_experiences")
         workflow.add_edge("tailor_experiences", "tailor_projects")
-        workflow.add_edge("tailor_projects", END)
+        workflow.add_edge(["tailor_projects", "research_company"], "tailor_summary")
+        workflow.add_edge("tailor_summary", "ats_review")
+        workflow.add_edge("ats_review", END)
         
-        return workflow.compile()
+        return workflow.compile(checkpointer=checkpointer)
     
-    # Node functions for the workflow
-    def analyze_jd_node(self, state: ResumeState) -> ResumeState:
+    async def arun_workflow(self, initial_state: ResumeState, thread_id: Optional[str] = None) -> ResumeState:
+        """Run the resume workflow on the current event loop.
+
+        With a ``thread_id`` the state is checkpointed after every step, and a run
+        that already has checkpoints under that ID continues after its last
+        finished node (``initial_state`` is then ignored).
+        """
+        if thread_id is None:
+            if self._workflow is None:
+                self._workflow = self.create_resume_workflow()
+            return await self._workflow.ainvoke(initial_state)
+
+        if self._checkpointed_workflow is None:
+            self._checkpointed_workflow = self.create_resume_workflow(await aget_checkpointer())
+        config = checkpoint_config(thread_id)
+        saved = await self._checkpointed_workflow.aget_state(config)
+        if not saved.values:
+            return await self._checkpointed_workflow.ainvoke(initial_state, config)
+        if not saved.next:
+            return saved.values  # the graph finished; a later step of the job failed
+        await self._checkpointed_workflow.ainvoke(None, config)
+        # A resumed run's output only has the channels written since the checkpoint
+        return (await self._checkpointed_workflow.aget_state(config)).values
+    
+    # Node functions for the workflow. Nodes return only the keys they own so
+    # that parallel branches never write the same state key in one step.
+    # Each node runs under the run's deadline; LLM timeouts shrink with the
+    # remaining budget, and steps before the summary keep some of it back.
+    @contextmanager
+    def _step_scope(self, state: ResumeState, reserve: float = 0.0):
+        """Deadline scope and LLM tally for one node.
+
+        The deadline of the enclosing run wins over the state's: a run resumed
+        from a checkpoint carries the previous attempt's, already spent, deadline.
+        """
+        deadline = current_deadline()
+        tally = {"asked": 0, "answered": 0, "warnings": []}
+        token = _llm_tally.set(tally)
+        try:
+            with deadline_scope(state.get("deadline") if deadline is None else deadline, reserve):
+                yield tally
+        finally:
+            _llm_tally.reset(token)
+
+    @staticmethod
+    def _step_outcome(step: str, tally: Dict[str, Any]) -> Dict[str, List[str]]:
+        """State update for a step's LLM outcome: ``fallback_steps`` gets ``step`` when it
+        asked the LLM and got nothing back, ``warnings`` the failures it ran into
+        """
+        return {
+            "fallback_steps": [step] if tally["asked"] and not tally["answered"] else [],
+            "warnings": tally["warnings"]
+        }
+
+    async def analyze_jd_node(self, state: ResumeState) -> Dict[str, Any]:
         """Node: Analyze job description"""
-        state["jd_analysis"] = self.analyze_job_description(state["job_description"])
-        return state
+        with self._step_scope(state) as tally:
+            jd_analysis = await self.aanalyze_job_description(state["job_description"])
+        return {"jd_analysis": jd_analysis, **self._step_outcome("analyze_jd", tally), "completed_steps": ["analyze_jd"]}
+    
+    async def research_company_node(self, state: ResumeState) -> Dict[str, Any]:
+        """Node: Research the target company (cached per normalized company name).
+
+        Non-critical: with little budget left only a cached answer is used,
+        otherwise the generic company defaults.
+        """
+        jd_analysis = state["jd_analysis"]
+        with self._step_scope(state, reserve=SUMMARY_RESERVE_SECONDS) as tally:
+            company_info = await self.aresearch_company(
+                jd_analysis.get("company_name", ""),
+                jd_analysis.get("industry", ""),
+                allow_lookup=has_budget(NON_CRITICAL_MIN_BUDGET_SECONDS)
+            )
+        return {"company_info": company_info, **self._step_outcome("research_company", tally), "completed_steps": ["research_company"]}
     
-    def select_content_node(self, state: ResumeState) -> ResumeState:
+    async def select_content_node(self, state: ResumeState) -> Dict[str, Any]:
         """Node: Select relevant experiences, projects, and skills"""
         jd_analysis = state["jd_analysis"]
-        state["selected_experiences"] = self.select_relevant_experiences(state["all_experiences"], jd_analysis)
-        state["selected_projects"] = self.select_relevant_projects(state["all_projects"], jd_analysis)
-        state["selected_skills"] = self.select_relevant_skills(state["all_skills"], jd_analysis)
-        return state
+        snapshot = get_profile_snapshot(state["profile_key"])
+        with self._step_scope(state, reserve=SUMMARY_RESERVE_SECONDS) as tally:
+            selected_experiences, selected_projects = await asyncio.gather(
+                self.aselect_relevant_experiences(snapshot.experiences, jd_analysis),
+                self.aselect_relevant_projects(snapshot.projects, jd_analysis)
+            )
+        return {
+            "selected_experience_ids": [exp['id'] for exp in selected_experiences],
+            "selected_project_ids": [proj['id'] for proj in selected_projects],
+            "selected_skills": self.select_relevant_skills(snapshot.skills, jd_analysis),
+            **self._step_outcome("select_content", tally),
+            "completed_steps": ["select_content"]
+        }
     
-    def tailor_summary_node(self, state: ResumeState) -> ResumeState:
+    async def tailor_summary_node(self, state: ResumeState) -> Dict[str, Any]:
         """Node: Generate tailored professional summary"""
-        state["tailored_summary"] = self.generate_tailored_summary(
-            state["user_profile"],
-            state["jd_analysis"],
-            state["selected_experiences"]
-        )
-        return state
-        
-    def tailor_experiences_node(self, state: Resume_State) -> ResumeState:
-        """Node: Tailor descriptions for selected experiences"""
-        tailored = []
-        for exp in state["selected_experiences"]:
-            tailored.append(self.tailor_experience_description(exp, state["jd_analysis"]))
-        state["tailored_experiences"] = tailored
-        return state
-        
-    def tailor_projects_node(self, state: ResumeState) -> ResumeState:
-        """Node: Tailor descriptions for selected projects"""
-        tailored = []
-        for proj in state["selected_projects"]:
-            tailored.append(self.tailor_project_description(proj, state["jd_analysis"]))
-        state["tailored_projects"] = tailored
-        return state
-```
+        snapshot = get_profile_snapshot(state["profile_key"])
+        with self._step_scope(state) as tally:
+            tailored_summary = await self.agenerate_tailored_summary(
+                snapshot.profile,
+                state["jd_analysis"],
+                [snapshot.experience(item_id) for item_id in state["selected_experience_ids"]],
+                state.get("company_info")
+            )
+        return {"tailored_summary": tailored_summary, **self._step_outcome("tailor_summary", tally), "completed_steps": ["tailor_summary"]}
+        
+    async def _atailor_from_bank(self, state: ResumeState, item_kind: str, records: List[ProfileRecord], tailor) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Overlays for ``records``: stored variants where the JD's role family was
+        precomputed, live ``tailor`` calls for the rest (and a background refresh
+        so the next JD of this family is a hit). Returns overlays and hit names.
+        """
+        jd_analysis = state["jd_analysis"]
+        cluster = cluster_for_jd(jd_analysis)
+        bank = get_variant_bank()
+        overlays: Dict[str, Dict[str, Any]] = {}
+        hits, misses = [], []
+        for record in records:
+            variant = await asyncio.to_thread(bank.best_variant, item_kind, record, jd_analysis, cluster)
+            if variant is None:
+                misses.append(record)
+            else:
+                hits.append(f"{item_kind}:{record['id']}")
+                if variant:
+                    overlays[record['id']] = variant
+        if misses:
+            if cluster:
+                await asyncio.to_thread(enqueue_variant_precompute, state["user_id"], [cluster])
+            tailored = await asyncio.gather(*[tailor(record, jd_analysis) for record in misses])
+            overlays.update({record['id']: overlay for record, overlay in zip(misses, tailored) if overlay})
+        return overlays, hits
+
+    async def tailor_experiences_node(self, state: ResumeState) -> Dict[str, Any]:
+        """Node: Tailor descriptions for selected experiences (bank first, then concurrent LLM calls)"""
+        snapshot = get_profile_snapshot(state["profile_key"])
+        records = [snapshot.experience(item_id) for item_id in state["selected_experience_ids"]]
+        with self._step_scope(state, reserve=SUMMARY_RESERVE_SECONDS) as tally:
+            overlays, hits = await self._atailor_from_bank(state, "experience", records, self.atailor_experience_description)
+        return {"experience_overlays": overlays, "variant_hits": hits,
+                **self._step_outcome("tailor_experiences", tally), "completed_steps": ["tailor_experiences"]}
+        
+    async def tailor_projects_node(self, state: ResumeState) -> Dict[str, Any]:
+        """Node: Tailor descriptions for selected projects (bank first, then concurrent LLM calls).
+
+        Non-critical: when the budget is nearly spent only stored variants are
+        used and the other projects keep their original descriptions.
+        """
+        snapshot = get_profile_snapshot(state["profile_key"])
+        records = [snapshot.project(item_id) for item_id in state["selected_project_ids"]]
+        with self._step_scope(state, reserve=SUMMARY_RESERVE_SECONDS) as tally:
+            if has_budget(NON_CRITICAL_MIN_BUDGET_SECONDS):
+                tailor = self.atailor_project_description
+            else:
+                # Stored variants cost nothing, so they are still used
+                async def tailor(record, jd_analysis):
+                    return {}
+            overlays, hits = await self._atailor_from_bank(state, "project", records, tailor)
+        return {"project_overlays": overlays, "variant_hits": hits,
+                **self._step_outcome("tailor_projects", tally), "completed_steps": ["tailor_projects"]}
+
+    async def ats_review_node(self, state: ResumeState) -> Dict[str, Any]:
+        """Node: Score keyword coverage locally and re-tailor only the sections whose
+        original records support missing keywords, each with just those keywords.
+
+        Non-critical: with little budget left the first score is kept as-is.
+        """
+        snapshot = get_profile_snapshot(state["profile_key"])
+        keywords = jd_keywords(state["jd_analysis"])
+        sources = source_sections(final_resume_state({**state, "experience_overlays": {}, "project_overlays": {}}, snapshot))
+        score = score_sections(state_sections(final_resume_state(state, snapshot)), keywords, sources)
+        update: Dict[str, Any] = {"completed_steps": ["ats_review"]}
+        weak = sections_to_retailor(score)
+        with self._step_scope(state) as tally:
+            if not weak or not has_budget(NON_CRITICAL_MIN_BUDGET_SECONDS):
+                update["ats_score"] = {**score, "retailored": []}
+                return update
+
+            experience_overlays = dict(state.get("experience_overlays") or {})
+            project_overlays = dict(state.get("project_overlays") or {})
+
+            async def retailor(section: str, missing: List[str]):
+                kind, _, item_id = section.partition(":")
+                if kind == "summary":
+                    update["tailored_summary"] = await self.aretarget_summary(state["tailored_summary"], missing)
+                elif kind == "experience":
+                    current = snapshot.experience(item_id).to_dict(experience_overlays.get(item_id))
+                    experience_overlays[item_id] = {**experience_overlays.get(item_id, {}), **await self.aretarget_achievements(current, missing)}
+                elif kind == "project":
+                    current = snapshot.project(item_id).to_dict(project_overlays.get(item_id))
+                    project_overlays[item_id] = {**project_overlays.get(item_id, {}), **await self.aretarget_achievements(current, missing)}
+
+            await asyncio.gather(*[retailor(section, missing) for section, missing in weak])
+        update.update(self._step_outcome("ats_review", tally))
+
+        update["experience_overlays"] = {k: v for k, v in experience_overlays.items() if v}
+        update["project_overlays"] = {k: v for k, v in project_overlays.items() if v}
+        rescored = score_sections(state_sections(final_resume_state({**state, **update}, snapshot)), keywords, sources)
+        update["ats_score"] = {**rescored, "initial_coverage": score["coverage"], "retailored": [section for section, _ in weak]}
+        return update
+
+
+def final_resume_state(state: ResumeState, snapshot: ProfileSnapshot) -> Dict[str, Any]:
+    """The finished workflow state in the shape the pages and ResumeGenerator read.
+
+    Only the selected items are expanded to dicts (with their tailored fields),
+    so the result kept with the job stays small however large the profile is.
+    """
+    return {
+        "user_id": state["user_id"],
+        "job_description": state["job_description"],
+        "jd_analysis": state["jd_analysis"],
+        "company_info": state.get("company_info") or {},
+        "user_profile": snapshot.profile_dict(),
+        "all_skills": snapshot.skill_dicts(),
+        "selected_skills": state.get("selected_skills") or [],
+        "tailored_summary": state["tailored_summary"],
+        "tailored_experiences": snapshot.resolve_experiences(state.get("selected_experience_ids") or [], state.get("experience_overlays")),
+        "tailored_projects": snapshot.resolve_projects(state.get("selected_project_ids") or [], state.get("project_overlays")),
+        "ats_score": state.get("ats_score") or {},
+        "variant_hits": state.get("variant_hits") or [],
+        "fallback_steps": state.get("fallback_steps") or [],
+        "warnings": state.get("warnings") or [],
+        "completed_steps": state.get("completed_steps") or []
+    }
@@ -0,0 +1,35 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Optional
+
+# One event loop per process runs every async Groq/Supabase call, so in-flight
+# generations cost a coroutine each rather than a blocked thread each.
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="async-runtime", daemon=True)
+            thread.start()
+            _loop = loop
+        return _loop
+
+def submit(coro: Awaitable[Any]) -> Future:
+    """Schedule a coroutine on the shared loop and return a concurrent Future"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+def run_sync(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """Run a coroutine on the shared loop and block until it finishes (sync facade)"""
+    loop = get_event_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        raise RuntimeError("run_sync() cannot be called from the shared event loop; await the coroutine instead")
+    return submit(coro).result(timeout)
@@ -0,0 +1,176 @@
+import html
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Local ATS-style keyword coverage: how many of the JD's keywords and required
+# skills appear in each section of the resume. Pure token matching, so it runs
+# in well under a millisecond and can decide which sections deserve another
+# LLM pass.
+
+# A section is re-tailored when at least this many JD keywords missing from the
+# resume appear in what it is written from (see source_sections)
+ATS_MIN_RECOVERABLE_KEYWORDS = 1
+# Longest keyword phrase matched, in tokens
+MAX_NGRAM = 4
+
+# Common spellings folded onto one form before matching
+TOKEN_ALIASES = {
+    "postgres": "postgresql",
+    "k8s": "kubernetes",
+    "golang": "go",
+    "js": "javascript",
+    "ts": "typescript",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "reactjs": "react",
+    "react.js": "react",
+    "py": "python",
+    "ci/cd": "cicd",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+def normalize_tokens(text: str) -> List[str]:
+    """Lowercased tokens with aliases folded and simple plurals stripped"""
+    tokens = []
+    for token in _TOKEN_RE.findall((text or "").lower()):
+        token = token.rstrip("./-")
+        token = TOKEN_ALIASES.get(token, token)
+        if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+            token = token[:-1]
+        if token:
+            tokens.append(token)
+    return tokens
+
+def _ngrams(tokens: List[str], max_n: int = MAX_NGRAM) -> Counter:
+    grams = Counter()
+    for n in range(1, max_n + 1):
+        grams.update(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+    return grams
+
+def token_ngrams(text: str) -> Counter:
+    """Counts of every normalized phrase of 1..MAX_NGRAM tokens in ``text``"""
+    return _ngrams(normalize_tokens(text))
+
+def keyword_hits(text: str, keywords: Iterable[str]) -> int:
+    """How many of ``keywords`` occur in ``text``"""
+    grams = token_ngrams(text)
+    return sum(1 for keyword in keywords if grams[" ".join(normalize_tokens(keyword))] > 0)
+
+def jd_keywords(jd_analysis: Dict[str, Any]) -> List[str]:
+    """The JD's ATS keywords and required skills, deduplicated by normalized form"""
+    seen, keywords = set(), []
+    for keyword in list(jd_analysis.get('keywords') or []) + list(jd_analysis.get('required_skills') or []):
+        normalized = " ".join(normalize_tokens(str(keyword)))
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            keywords.append(str(keyword))
+    return keywords
+
+def keyword_counts(sections: Dict[str, str], keywords: List[str]) -> np.ndarray:
+    """keywords x sections matrix of occurrence counts"""
+    # Normalized keyword -> its rows, so each section's phrases are looked up once
+    index: Dict[str, List[int]] = {}
+    for row, keyword in enumerate(keywords):
+        index.setdefault(" ".join(normalize_tokens(keyword)), []).append(row)
+    longest = min(MAX_NGRAM, max((term.count(" ") + 1 for term in index), default=0))
+    rows, cols, counts = [], [], []
+    for col, text in enumerate(sections.values()):
+        for gram, count in _ngrams(normalize_tokens(text), longest).items():
+            for row in index.get(gram, ()):
+                rows.append(row)
+                cols.append(col)
+                counts.append(count)
+    matrix = np.zeros((len(keywords), len(sections)), dtype=np.int32)
+    np.add.at(matrix, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), np.array(counts, dtype=np.int32))
+    return matrix
+
+def score_sections(sections: Dict[str, str], keywords: List[str], sources: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Coverage of ``keywords`` overall and per section, plus what is missing.
+
+    With ``sources`` (text each section is written from), ``recoverable`` lists
+    per section the missing keywords its source supports.
+    """
+    if not keywords:
+        return {"coverage": 1.0, "keywords": 0, "matched": [], "missing": [], "sections": {name: 1.0 for name in sections}, "recoverable": {}}
+    counts = keyword_counts(sections, keywords)
+    present = counts > 0
+    found = present.any(axis=1) if sections else np.zeros(len(keywords), dtype=bool)
+    per_section = present.mean(axis=0) if sections else np.zeros(0)
+    recoverable = {}
+    if sources:
+        supported = keyword_counts(sources, keywords) > 0
+        for col, name in enumerate(sources):
+            hits = supported[:, col] & ~found
+            if hits.any():
+                recoverable[name] = [keyword for keyword, hit in zip(keywords, hits) if hit]
+    return {
+        "coverage": round(float(found.mean()), 3),
+        "keywords": len(keywords),
+        "matched": [keyword for keyword, hit in zip(keywords, found) if hit],
+        "missing": [keyword for keyword, hit in zip(keywords, found) if not hit],
+        "sections": {name: round(float(value), 3) for name, value in zip(sections, per_section)},
+        "recoverable": recoverable,
+    }
+
+def _item_text(item: Dict[str, Any], title_keys: Iterable[str]) -> str:
+    parts = [str(item.get(key) or "") for key in title_keys]
+    parts += [str(a) for a in item.get('achievements') or []]
+    parts += [", ".join(map(str, item.get('technologies') or []))]
+    return "\n".join(parts)
+
+def state_sections(state: Dict[str, Any]) -> Dict[str, str]:
+    """Rendered text per tailorable unit of a final state: summary, each role and project, skills.
+
+    Keys are ``summary``, ``experience:<id>``, ``project:<id>`` and ``skills``,
+    so low-scoring units can be sent back for tailoring individually.
+    """
+    sections = {"summary": state.get('tailored_summary') or ""}
+    for exp in state.get('tailored_experiences') or []:
+        sections[f"experience:{exp.get('id')}"] = _item_text(exp, ('position', 'company_name'))
+    for proj in state.get('tailored_projects') or []:
+        sections[f"project:{proj.get('id')}"] = _item_text(proj, ('title',))
+    sections["skills"] = ", ".join(str(s.get('skill_name') or "") for s in state.get('all_skills') or [])
+    return sections
+
+def source_sections(original_state: Dict[str, Any]) -> Dict[str, str]:
+    """What each tailorable section may truthfully draw on, keyed like ``state_sections``.
+
+    ``original_state`` is a final state without tailoring overlays: a role or
+    project draws on its full original record (description included), the
+    summary on every selected item plus the skills.
+    """
+    sources = {}
+    for exp in original_state.get('tailored_experiences') or []:
+        sources[f"experience:{exp.get('id')}"] = _item_text(exp, ('position', 'company_name', 'description'))
+    for proj in original_state.get('tailored_projects') or []:
+        sources[f"project:{proj.get('id')}"] = _item_text(proj, ('title', 'description'))
+    skills = ", ".join(str(s.get('skill_name') or "") for s in original_state.get('all_skills') or [])
+    return {"summary": "\n".join(list(sources.values()) + [skills]), **sources}
+
+def markdown_sections(markdown_content: str) -> Dict[str, str]:
+    """Plain text of a rendered resume per <h2> section (the header goes under "header")"""
+    sections: Dict[str, str] = {}
+    markdown_content = re.sub(r"<style>.*?</style>", "", markdown_content or "", flags=re.S)
+    parts = re.split(r"<h2>(.*?)</h2>", markdown_content)
+    names = ["header"] + parts[1::2]
+    for name, body in zip(names, parts[0::2]):
+        sections[html.unescape(_TAG_RE.sub(" ", name)).strip()] = html.unescape(_TAG_RE.sub(" ", body))
+    return sections
+
+def score_resume(markdown_content: str, jd_analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """ATS keyword coverage of a rendered resume against its JD analysis"""
+    return score_sections(markdown_sections(markdown_content), jd_keywords(jd_analysis))
+
+def sections_to_retailor(score: Dict[str, Any], min_keywords: int = ATS_MIN_RECOVERABLE_KEYWORDS, limit: int = 3) -> List[Tuple[str, List[str]]]:
+    """(section, keywords) for the sections that could work in the most missing keywords, best first.
+
+    Only keywords a section's own source supports count, so a resume missing a
+    skill the profile never mentions triggers no re-tailoring at all.
+    """
+    candidates = [(name, keywords) for name, keywords in (score.get("recoverable") or {}).items()
+                  if name != "skills" and len(keywords) >= min_keywords]
+    return sorted(candidates, key=lambda item: -len(item[1]))[:limit]
@@ -0,0 +1,277 @@
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from utils.local_store import get_local_data_dir
+
+# Record/replay of every HTTP exchange the app makes (Groq, Supabase), so a
+# performance run can be repeated without the network. In record mode each
+# request/response pair is appended to a cassette (JSON lines) together with its
+# time to headers and the arrival time of each body chunk; in replay mode the
+# cassette answers instead of the network, with the original or zero latency.
+#
+# supabase-py builds its httpx clients internally, so the cassette sits under
+# httpx's default transports rather than on each client; it is switched on with
+#   RESUME_AGENT_CASSETTE_MODE=record|replay
+#   RESUME_AGENT_CASSETTE=<path>              (default .local_data/cassettes/default.jsonl)
+#   RESUME_AGENT_CASSETTE_LATENCY=original|zero
+
+CASSETTE_RECORD = "record"
+CASSETTE_REPLAY = "replay"
+LATENCY_ORIGINAL = "original"
+LATENCY_ZERO = "zero"
+
+class CassetteMiss(LookupError):
+    """A replayed request that the cassette has no recording for"""
+
+def _body_digest(content: bytes) -> str:
+    try:
+        # Key order in JSON bodies is not significant
+        content = json.dumps(json.loads(content), sort_keys=True).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        pass
+    return hashlib.sha256(content).hexdigest()[:32]
+
+def request_key(method: str, target: str, content: bytes) -> str:
+    """Strict match: method, path with query, and body (the host is left out so any project URL replays)"""
+    return f"{method} {target} {_body_digest(content)}"
+
+def endpoint_key(method: str, target: str) -> str:
+    """Loose match: method and path only, for bodies that differ between runs (timestamps, model choice)"""
+    return f"{method} {target.split('?', 1)[0]}"
+
+class Cassette:
+    """Recorded HTTP exchanges in a JSON-lines file, served back in recorded order"""
+
+    def __init__(self, path: str, mode: str, latency: str = LATENCY_ORIGINAL):
+        if mode not in (CASSETTE_RECORD, CASSETTE_REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}'")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._by_request: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._by_endpoint: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.stats = {"recorded": 0, "replayed": 0, "loose": 0, "misses": 0}
+        if mode == CASSETTE_REPLAY:
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def _load(self) -> None:
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._by_request[entry["key"]].append(entry)
+                    self._by_endpoint[entry["endpoint"]].append(entry)
+
+    def record(self, method: str, target: str, content: bytes, status: int, headers: List[Tuple[bytes, bytes]],
+               headers_after: float, chunks: List[Tuple[float, bytes]]) -> None:
+        entry = {
+            "key": request_key(method, target, content),
+            "endpoint": endpoint_key(method, target),
+            "method": method,
+            "target": target,
+            "status": status,
+            "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in headers],
+            "headers_after": round(headers_after, 6),
+            "chunks": [[round(at, 6), base64.b64encode(chunk).decode("ascii")] for at, chunk in chunks],
+            "recorded_at": time.time()
+        }
+        line = json.dumps(entry)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.stats["recorded"] += 1
+
+    def _take(self, entries: Deque[Dict[str, Any]]) -> Dict[str, Any]:
+        # Identical requests get their recordings in order; the last one keeps answering
+        entry = entries.popleft() if len(entries) > 1 else entries[0]
+        for other in (self._by_request[entry["key"]], self._by_endpoint[entry["endpoint"]]):
+            if other is not entries and len(other) > 1 and entry in other:
+                other.remove(entry)
+        return entry
+
+    def lookup(self, method: str, target: str, content: bytes) -> Dict[str, Any]:
+        """The next recording for a request: exact match first, then the next one for the same endpoint"""
+        with self._lock:
+            entries = self._by_request.get(request_key(method, target, content))
+            if entries:
+                self.stats["replayed"] += 1
+                return self._take(entries)
+            entries = self._by_endpoint.get(endpoint_key(method, target))
+            if entries:
+                self.stats["replayed"] += 1
+                self.stats["loose"] += 1
+                return self._take(entries)
+            self.stats["misses"] += 1
+        raise CassetteMiss(f"No recording for {method} {target}")
+
+    def delays(self, entry: Dict[str, Any]) -> Tuple[float, List[Tuple[float, bytes]]]:
+        """Wait before the headers, and (wait, bytes) per body chunk, under the latency setting"""
+        chunks = [(at, base64.b64decode(data)) for at, data in entry["chunks"]]
+        if self.latency == LATENCY_ZERO:
+            return 0.0, [(0.0, chunk) for _, chunk in chunks]
+        previous, paced = 0.0, []
+        for at, chunk in chunks:
+            paced.append((max(0.0, at - previous), chunk))
+            previous = at
+        return entry["headers_after"], paced
+
+def _target(request) -> str:
+    return request.url.raw_path.decode("ascii")
+
+class _RecordingStream:
+    """Passes a response body through while noting when each chunk arrived"""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+        self._started = time.perf_counter()
+        self.chunks: List[Tuple[float, bytes]] = []
+
+    def _note(self, chunk: bytes) -> bytes:
+        self.chunks.append((time.perf_counter() - self._started, chunk))
+        return chunk
+
+def _stream_classes():
+    import httpx
+
+    class SyncRecordingStream(_RecordingStream, httpx.SyncByteStream):
+        def __iter__(self):
+            for chunk in self._stream:
+                yield self._note(chunk)
+
+        def close(self) -> None:
+            self._stream.close()
+            self._on_close(self.chunks)
+
+    class AsyncRecordingStream(_RecordingStream, httpx.AsyncByteStream):
+        async def __aiter__(self):
+            async for chunk in self._stream:
+                yield self._note(chunk)
+
+        async def aclose(self) -> None:
+            await self._stream.aclose()
+            self._on_close(self.chunks)
+
+    class SyncReplayStream(httpx.SyncByteStream):
+        def __init__(self, chunks):
+            self._chunks = chunks
+
+        def __iter__(self):
+            for wait, chunk in self._chunks:
+                if wait:
+                    time.sleep(wait)
+                yield chunk
+
+    class AsyncReplayStream(httpx.AsyncByteStream):
+        def __init__(self, chunks):
+            self._chunks = chunks
+
+        async def __aiter__(self):
+            for wait, chunk in self._chunks:
+                if wait:
+                    await asyncio.sleep(wait)
+                yield chunk
+
+    return SyncRecordingStream, AsyncRecordingStream, SyncReplayStream, AsyncReplayStream
+
+_installed: Optional[Cassette] = None
+_install_lock = threading.Lock()
+
+def install_cassette(cassette: Cassette) -> None:
+    """Route every httpx request in this process through ``cassette``"""
+    global _installed
+    import httpx
+
+    with _install_lock:
+        if _installed is not None:
+            raise RuntimeError(f"A cassette is already installed ({_installed.path})")
+        SyncRecordingStream, AsyncRecordingStream, SyncReplayStream, AsyncReplayStream = _stream_classes()
+        real_handle = httpx.HTTPTransport.handle_request
+        real_ahandle = httpx.AsyncHTTPTransport.handle_async_request
+
+        def replayed(request, entry, stream):
+            return httpx.Response(status_code=entry["status"], headers=entry["headers"], stream=stream, request=request)
+
+        def handle_request(transport, request):
+            content = request.read()
+            if cassette.mode == CASSETTE_REPLAY:
+                entry = cassette.lookup(request.method, _target(request), content)
+                wait, chunks = cassette.delays(entry)
+                if wait:
+                    time.sleep(wait)
+                return replayed(request, entry, SyncReplayStream(chunks))
+            started = time.perf_counter()
+            response = real_handle(transport, request)
+            headers_after = time.perf_counter() - started
+            on_close = lambda chunks: cassette.record(request.method, _target(request), content, response.status_code,
+                                                      response.headers.raw, headers_after, chunks)
+            return httpx.Response(status_code=response.status_code, headers=response.headers.raw,
+                                  stream=SyncRecordingStream(response.stream, on_close), extensions=response.extensions)
+
+        async def handle_async_request(transport, request):
+            content = await request.aread()
+            if cassette.mode == CASSETTE_REPLAY:
+                entry = cassette.lookup(request.method, _target(request), content)
+                wait, chunks = cassette.delays(entry)
+                if wait:
+                    await asyncio.sleep(wait)
+                return replayed(request, entry, AsyncReplayStream(chunks))
+            started = time.perf_counter()
+            response = await real_ahandle(transport, request)
+            headers_after = time.perf_counter() - started
+            on_close = lambda chunks: cassette.record(request.method, _target(request), content, response.status_code,
+                                                      response.headers.raw, headers_after, chunks)
+            return httpx.Response(status_code=response.status_code, headers=response.headers.raw,
+                                  stream=AsyncRecordingStream(response.stream, on_close), extensions=response.extensions)
+
+        httpx.HTTPTransport.handle_request = handle_request
+        httpx.AsyncHTTPTransport.handle_async_request = handle_async_request
+        httpx.HTTPTransport._cassette_originals = (real_handle, real_ahandle)
+        _installed = cassette
+
+def uninstall_cassette() -> None:
+    """Put httpx's own transports back"""
+    global _installed
+    import httpx
+
+    with _install_lock:
+        originals = getattr(httpx.HTTPTransport, "_cassette_originals", None)
+        if originals is not None:
+            httpx.HTTPTransport.handle_request, httpx.AsyncHTTPTransport.handle_async_request = originals
+            del httpx.HTTPTransport._cassette_originals
+        _installed = None
+
+def installed_cassette() -> Optional[Cassette]:
+    return _installed
+
+def default_cassette_path() -> str:
+    return os.path.join(get_local_data_dir(), "cassettes", "default.jsonl")
+
+def install_cassette_from_env() -> Optional[Cassette]:
+    """Install the cassette configured by the environment, once per process; None when it is off"""
+    mode = os.environ.get("RESUME_AGENT_CASSETTE_MODE", "").strip().lower()
+    if not mode:
+        return None
+    with _install_lock:
+        if _installed is not None:
+            return _installed
+    cassette = Cassette(
+        os.environ.get("RESUME_AGENT_CASSETTE") or default_cassette_path(),
+        mode,
+        os.environ.get("RESUME_AGENT_CASSETTE_LATENCY", LATENCY_ORIGINAL).strip().lower()
+    )
+    try:
+        install_cassette(cassette)
+    except RuntimeError:
+        pass  # another thread got there first
+    return _installed
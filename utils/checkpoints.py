@@ -0,0 +1,81 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional
+
+from utils.local_store import get_local_data_dir
+
+if TYPE_CHECKING:
+    from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
+
+# Workflow checkpoints: the resume graph saves its state after every step under
+# the generation's job ID, so a retried or resumed job picks up after the last
+# node that finished instead of paying for the JD analysis and tailoring again.
+# A job's checkpoints are dropped once it succeeds; ones left behind by jobs that
+# never finished are purged after WORKFLOW_CHECKPOINT_TTL_SECONDS.
+
+WORKFLOW_CHECKPOINT_TTL_SECONDS = int(os.environ.get("WORKFLOW_CHECKPOINT_TTL_SECONDS", str(60 * 60 * 24)))
+CHECKPOINT_PURGE_INTERVAL_SECONDS = 3600
+
+_saver: Optional["AsyncSqliteSaver"] = None
+_saver_lock: Optional[asyncio.Lock] = None
+_last_purge = 0.0
+
+def checkpoint_db_path() -> str:
+    return os.path.join(get_local_data_dir(), "checkpoints.sqlite3")
+
+async def aget_checkpointer() -> "AsyncSqliteSaver":
+    """Process-wide SQLite checkpointer, saving after every workflow step.
+
+    Must be called on the shared event loop; aiosqlite binds the connection to it.
+    """
+    global _saver, _saver_lock
+    if _saver is not None:
+        return _saver
+    if _saver_lock is None:
+        _saver_lock = asyncio.Lock()
+    async with _saver_lock:
+        if _saver is None:
+            import aiosqlite
+            from langgraph.checkpoint.aiosqlite import AsyncSqliteSaver
+            from langgraph.checkpoint.base import CheckpointAt
+
+            conn = aiosqlite.connect(checkpoint_db_path(), timeout=30)
+            conn.daemon = True  # the connection's thread lives as long as the process; don't block exit on it
+            saver = AsyncSqliteSaver(conn=conn, at=CheckpointAt.END_OF_STEP)
+            await saver.setup()  # connects; concurrent callers must not await the connection twice
+            await saver.conn.execute("PRAGMA journal_mode=WAL")
+            await saver.conn.commit()
+            _saver = saver
+    return _saver
+
+def checkpoint_config(thread_id: str) -> dict:
+    """Run config selecting the latest checkpoint of ``thread_id``"""
+    return {"configurable": {"thread_id": thread_id}}
+
+async def adelete_checkpoints(thread_id: str) -> None:
+    """Drop every checkpoint of a finished run"""
+    saver = await aget_checkpointer()
+    await saver.conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+    await saver.conn.commit()
+
+async def apurge_checkpoints(older_than: float = WORKFLOW_CHECKPOINT_TTL_SECONDS) -> int:
+    """Delete checkpoints of runs whose latest step is older than ``older_than`` seconds"""
+    saver = await aget_checkpointer()
+    # thread_ts is an ISO-8601 UTC timestamp, so it orders as text
+    cutoff = datetime.fromtimestamp(time.time() - older_than, timezone.utc).isoformat()
+    cursor = await saver.conn.execute(
+        "DELETE FROM checkpoints WHERE thread_id IN "
+        "(SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(thread_ts) < ?)",
+        (cutoff,)
+    )
+    await saver.conn.commit()
+    return cursor.rowcount
+
+async def amaybe_purge_checkpoints() -> None:
+    """Purge stale checkpoints at most once per CHECKPOINT_PURGE_INTERVAL_SECONDS"""
+    global _last_purge
+    if time.time() - _last_purge > CHECKPOINT_PURGE_INTERVAL_SECONDS:
+        _last_purge = time.time()
+        await apurge_checkpoints()
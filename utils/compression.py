@@ -0,0 +1,39 @@
+import base64
+import hashlib
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # in requirements.txt; a partial install still writes (and reads) zlib
+    zstandard = None
+
+# Compressed text is stored as "<codec>:<base64>". zstd rows need the zstandard
+# package to read, so every process that shares the database must install it.
+ZSTD_PREFIX = "zstd:"
+ZLIB_PREFIX = "zlib:"
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 9
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the exact text, used as its content address"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def compress_text(text: str) -> str:
+    """Compress text into a self-describing, JSON-safe string"""
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return ZSTD_PREFIX + base64.b64encode(zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)).decode("ascii")
+    return ZLIB_PREFIX + base64.b64encode(zlib.compress(raw, ZLIB_LEVEL)).decode("ascii")
+
+def decompress_text(value: Optional[str]) -> Optional[str]:
+    """Inverse of compress_text; values without a codec prefix are returned unchanged"""
+    if not value:
+        return value
+    if value.startswith(ZLIB_PREFIX):
+        return zlib.decompress(base64.b64decode(value[len(ZLIB_PREFIX):])).decode("utf-8")
+    if value.startswith(ZSTD_PREFIX):
+        if zstandard is None:
+            raise RuntimeError("This row was compressed with zstd; install the 'zstandard' package to read it")
+        return zstandard.ZstdDecompressor().decompress(base64.b64decode(value[len(ZSTD_PREFIX):])).decode("utf-8")
+    return value
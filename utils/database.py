@@ -1,19 +1,127 @@
-from supabase import create_client, Client
+import asyncio
 import streamlit as st
-from typing import List, Dict, Any, Optional
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from utils.cassette import install_cassette_from_env
+from utils.cache import TTLCache
+from utils.compression import compress_text, content_hash, decompress_text
+from utils.invalidation import PROFILE_SCOPE, RESUMES_SCOPE, get_invalidation_bus, invalidate_cache_on, publish_invalidation
+from utils.search import get_search_index
+
+# Columns needed to list resume history; the large text/JSON fields are fetched per resume on demand
+RESUME_SUMMARY_COLUMNS = "id, created_at, job_title, company_name"
+# markdown_source is only set on rows saved before compression (see migrations/002)
+RESUME_DETAIL_COLUMNS = "id, created_at, job_title, company_name, tailored_summary, jd_analysis, ats_score, markdown_z, markdown_source"
+# Full rows, with the shared job description embedded through jd_hash
+RESUME_FULL_COLUMNS = "*, job_descriptions(body_z)"
+# Profile data for generation is cached per process; writes from any process invalidate it
+GENERATION_INPUTS_TTL = 60 * 60
+
+_generation_inputs_cache = TTLCache(ttl=GENERATION_INPUTS_TTL, max_entries=1000)
+
+def encode_resume_row(resume_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Split a resume into its generated_resumes row and its content-addressed JD row.
+
+    The JD text moves to job_descriptions (shared by every row and user with the
+    same text) and the markdown is stored compressed.
+    """
+    row = dict(resume_data)
+    jd_row = None
+    job_description = row.pop('job_description', None)
+    if job_description:
+        jd_row = {
+            "hash": content_hash(job_description),
+            "body_z": compress_text(job_description),
+            "size_bytes": len(job_description.encode("utf-8"))
+        }
+        row['jd_hash'] = jd_row['hash']
+    markdown_source = row.pop('markdown_source', None)
+    if markdown_source:
+        row['markdown_z'] = compress_text(markdown_source)
+    return row, jd_row
+
+def decode_resume_row(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Restore job_description and markdown_source on a fetched row"""
+    if not row:
+        return row
+    jd = row.pop('job_descriptions', None)
+    if jd and jd.get('body_z'):
+        row['job_description'] = decompress_text(jd['body_z'])
+    markdown_z = row.pop('markdown_z', None)
+    if markdown_z:
+        row['markdown_source'] = decompress_text(markdown_z)
+    return row
+
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
+
+# supabase pulls in httpx, postgrest, gotrue, realtime and storage3, so it is
+# imported on the first query rather than by every page that imports this module
+def create_client(url: str, key: str) -> "Client":
+    from supabase import create_client as _create_client
+    install_cassette_from_env()  # record/replay runs (utils/cassette.py)
+    return _create_client(url, key)
+
+async def acreate_client(url: str, key: str) -> "AsyncClient":
+    from supabase._async.client import create_client as _acreate_client
+    install_cassette_from_env()
+    return await _acreate_client(url, key)
+
+_subscribed = False
+
+def subscribe_caches() -> None:
+    """Hook this module's caches up to the invalidation bus (once per process)"""
+    global _subscribed
+    if _subscribed:
+        return
+    _subscribed = True
+    bus = get_invalidation_bus()
+    invalidate_cache_on(_generation_inputs_cache, PROFILE_SCOPE, "database.generation_inputs")
+
+    def forget_remote_resumes(event) -> None:
+        # Processes on this host share the search index and already updated it
+        if event.scope == RESUMES_SCOPE and event.user_id and event.host != bus.host:
+            get_search_index().forget_user(event.user_id)
+    bus.subscribe("database.search_index", forget_remote_resumes)
+
+_async_supabase: Optional["AsyncClient"] = None
+_async_supabase_lock = asyncio.Lock()
+
+async def get_async_supabase() -> "AsyncClient":
+    """Process-wide async Supabase client, created on the shared event loop"""
+    global _async_supabase
+    async with _async_supabase_lock:
+        if _async_supabase is None:
+            _async_supabase = await acreate_client(st.secrets["SUPABASE_URL"], st.secrets["SUPABASE_KEY"])
+    return _async_supabase
 
 class DatabaseManager:
     def __init__(self):
-        self.supabase: Client = create_client(
+        self.supabase: "Client" = create_client(
             st.secrets["SUPABASE_URL"],
             st.secrets["SUPABASE_KEY"]
         )
+        # Every process that reads through a manager (even one that only searches) hears remote writes
+        subscribe_caches()
+    
+    def _publish(self, scope: str, rows: Optional[List[Dict[str, Any]]], user_key: str = 'user_id') -> None:
+        """Invalidate cached data of the users these rows belong to, in every process (all users if unknown).
+
+        A profile change also refreshes the user's precomputed achievement variants.
+        """
+        # The variant bank pulls in the job queue, ATS scoring and numpy; most pages never write a profile
+        from utils.variant_bank import enqueue_variant_precompute
+
+        for user_id in {row.get(user_key) for row in rows or []} or {None}:
+            publish_invalidation(scope, user_id)
+            if scope == PROFILE_SCOPE and user_id is not None:
+                enqueue_variant_precompute(user_id)
     
     # User Profile Operations
     def create_user_profile(self, profile_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new user profile"""
         response = self.supabase.table('user_profiles').insert(profile_data).execute()
+        self._publish(PROFILE_SCOPE, response.data or [profile_data], user_key='id')
         return response.data[0] if response.data else None
     
     def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
@@ -24,12 +132,14 @@ class DatabaseManager:
     def update_user_profile(self, user_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update user profile"""
         response = self.supabase.table('user_profiles').update(updates).eq('id', user_id).execute()
+        self._publish(PROFILE_SCOPE, [{'user_id': user_id}])
         return response.data[0] if response.data else None
     
     # Work Experience Operations
     def add_work_experience(self, experience_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add work experience"""
         response = self.supabase.table('work_experiences').insert(experience_data).execute()
+        self._publish(PROFILE_SCOPE, response.data or [experience_data])
         return response.data[0] if response.data else None
     
     def get_work_experiences(self, user_id: str) -> List[Dict[str, Any]]:
@@ -40,17 +150,20 @@ class DatabaseManager:
     def update_work_experience(self, exp_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update work experience"""
         response = self.supabase.table('work_experiences').update(updates).eq('id', exp_id).execute()
+        self._publish(PROFILE_SCOPE, response.data)
         return response.data[0] if response.data else None
     
     def delete_work_experience(self, exp_id: str) -> bool:
         """Delete work experience"""
         response = self.supabase.table('work_experiences').delete().eq('id', exp_id).execute()
+        self._publish(PROFILE_SCOPE, response.data)
         return True
     
     # Project Operations
     def add_project(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add project"""
         response = self.supabase.table('projects').insert(project_data).execute()
+        self._publish(PROFILE_SCOPE, response.data or [project_data])
         return response.data[0] if response.data else None
     
     def get_projects(self, user_id: str) -> List[Dict[str, Any]]:
@@ -61,17 +174,20 @@ class DatabaseManager:
     def update_project(self, project_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
         """Update project"""
         response = self.supabase.table('projects').update(updates).eq('id', project_id).execute()
+        self._publish(PROFILE_SCOPE, response.data)
         return response.data[0] if response.data else None
     
     def delete_project(self, project_id: str) -> bool:
         """Delete project"""
         response = self.supabase.table('projects').delete().eq('id', project_id).execute()
+        self._publish(PROFILE_SCOPE, response.data)
         return True
     
     # Education Operations
     def add_education(self, education_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add education"""
         response = self.supabase.table('education').insert(education_data).execute()
+        self._publish(PROFILE_SCOPE, response.data or [education_data])
         return response.data[0] if response.data else None
     
     def get_education(self, user_id: str) -> List[Dict[str, Any]]:
@@ -82,12 +198,14 @@ class DatabaseManager:
     def delete_education(self, edu_id: str) -> bool:
         """Delete education"""
         response = self.supabase.table('education').delete().eq('id', edu_id).execute()
+        self._publish(PROFILE_SCOPE, response.data)
         return True
     
     # Skills Operations
     def add_skill(self, skill_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add skill"""
         response = self.supabase.table('skills').insert(skill_data).execute()
+        self._publish(PROFILE_SCOPE, response.data or [skill_data])
         return response.data[0] if response.data else None
     
     def get_skills(self, user_id: str) -> List[Dict[str, Any]]:
@@ -103,12 +221,14 @@ class DatabaseManager:
     def delete_skill(self, skill_id: str) -> bool:
         """Delete skill"""
         response = self.supabase.table('skills').delete().eq('id', skill_id).execute()
+        self._publish(PROFILE_SCOPE, response.data)
         return True
     
     # Certifications Operations
     def add_certification(self, cert_data: Dict[str, Any]) -> Dict[str, Any]:
         """Add certification"""
         response = self.supabase.table('certifications').insert(cert_data).execute()
+        self._publish(PROFILE_SCOPE, response.data or [cert_data])
         return response.data[0] if response.data else None
     
     def get_certifications(self, user_id: str) -> List[Dict[str, Any]]:
@@ -119,21 +239,179 @@ class DatabaseManager:
     def delete_certification(self, cert_id: str) -> bool:
         """Delete certification"""
         response = self.supabase.table('certifications').delete().eq('id', cert_id).execute()
+        self._publish(PROFILE_SCOPE, response.data)
         return True
     
     # Resume Operations
     def save_generated_resume(self, resume_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Save generated resume"""
-        response = self.supabase.table('generated_resumes').insert(resume_data).execute()
-        return response.data[0] if response.data else None
+        """Save generated resume (JD deduplicated, text compressed) and add it to the local search index"""
+        row, jd_row = encode_resume_row(resume_data)
+        if jd_row:
+            self.supabase.table('job_descriptions').upsert(jd_row, on_conflict='hash', ignore_duplicates=True).execute()
+        response = self.supabase.table('generated_resumes').insert(row).execute()
+        saved = decode_resume_row(response.data[0]) if response.data else None
+        index_error = self._index_saved_resume(saved, resume_data)
+        if index_error:
+            st.warning(index_error)
+        self._publish(RESUMES_SCOPE, [resume_data])
+        return saved
+    
+    def _index_saved_resume(self, saved: Optional[Dict[str, Any]], resume_data: Dict[str, Any]) -> Optional[str]:
+        """Add a freshly saved resume to the local search index; the error to report if that failed.
+
+        Runs off the script thread when saving from a job, so it must not call Streamlit.
+        """
+        if saved:
+            try:
+                get_search_index().add_resumes([{**resume_data, **saved}])
+            except Exception as e:
+                # The index is rebuilt from the database on demand, so never fail the save over it
+                return f"Could not update search index: {str(e)}"
+        return None
     
     def get_generated_resumes(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all generated resumes for a user"""
-        response = self.supabase.table('generated_resumes').select("*").eq('user_id', user_id).order('created_at', desc=True).execute()
-        return response.data or []
+        response = self.supabase.table('generated_resumes').select(RESUME_FULL_COLUMNS).eq('user_id', user_id).order('created_at', desc=True).execute()
+        return [decode_resume_row(row) for row in response.data or []]
+    
+    def list_generated_resumes(self, user_id: str, limit: int = 20, after: Optional[Dict[str, Any]] = None,
+                               columns: str = RESUME_SUMMARY_COLUMNS) -> List[Dict[str, Any]]:
+        """Get one page of resume summaries, newest first.
+
+        Uses keyset pagination on (created_at, id): pass the last row of the
+        previous page as ``after`` to get the next page.
+        """
+        query = self.supabase.table('generated_resumes').select(columns).eq('user_id', user_id)
+        if after:
+            created_at, last_id = after['created_at'], after['id']
+            query = query.or_(f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{last_id}")')
+        response = query.order('created_at', desc=True).order('id', desc=True).limit(limit).execute()
+        return [decode_resume_row(row) for row in response.data or []]
+    
+    def search_generated_resumes(self, user_id: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Full-text search over a user's resume history, best matches first"""
+        index = get_search_index()
+        if not index.is_user_indexed(user_id):
+            index.index_user(user_id, self.get_generated_resumes(user_id))
+        return index.search(user_id, query, limit)
+    
+    def get_resume_analytics(self, user_id: str, limit: int = 10, weeks: int = 12) -> Dict[str, Any]:
+        """Skill demand, skill gaps and applications per company/week, aggregated in the database (see migrations/004)"""
+        response = self.supabase.rpc('resume_analytics', {'p_user_id': user_id, 'p_limit': limit, 'p_weeks': weeks}).execute()
+        return response.data if isinstance(response.data, dict) else {}
     
-    def get_resume_by_id(self, resume_id: str) -> Optional[Dict[str, Any]]:
+    def get_resumes_by_ids(self, user_id: str, resume_ids: List[str], columns: str = RESUME_FULL_COLUMNS) -> List[Dict[str, Any]]:
+        """Get several of a user's resumes in one query, newest first"""
+        if not resume_ids:
+            return []
+        response = (self.supabase.table('generated_resumes').select(columns)
+                    .eq('user_id', user_id).in_('id', resume_ids)
+                    .order('created_at', desc=True).execute())
+        return [decode_resume_row(row) for row in response.data or []]
+    
+    def get_resume_by_id(self, resume_id: str, columns: str = RESUME_FULL_COLUMNS) -> Optional[Dict[str, Any]]:
         """Get specific resume by ID"""
-        response = self.supabase.table('generated_resumes').select("*").eq('id', resume_id).execute()
+        response = self.supabase.table('generated_resumes').select(columns).eq('id', resume_id).execute()
+        return decode_resume_row(response.data[0]) if response.data else None
+    
+    # Async counterparts for the generation path; these must run on the shared event loop
+    # (utils.async_runtime) and share one async client and connection pool per process.
+    async def _atable(self, table_name: str):
+        client = await get_async_supabase()
+        return client.table(table_name)
+    
+    async def aget_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Get user profile by ID"""
+        table = await self._atable('user_profiles')
+        response = await table.select("*").eq('id', user_id).execute()
         return response.data[0] if response.data else None
-      
+    
+    async def aget_work_experiences(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all work experiences for a user"""
+        table = await self._atable('work_experiences')
+        response = await table.select("*").eq('user_id', user_id).order('start_date', desc=True).execute()
+        return response.data or []
+    
+    async def aget_projects(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all projects for a user"""
+        table = await self._atable('projects')
+        response = await table.select("*").eq('user_id', user_id).order('start_date', desc=True).execute()
+        return response.data or []
+    
+    async def aget_education(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all education for a user"""
+        table = await self._atable('education')
+        response = await table.select("*").eq('user_id', user_id).order('start_date', desc=True).execute()
+        return response.data or []
+    
+    async def aget_skills(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all skills for a user"""
+        table = await self._atable('skills')
+        response = await table.select("*").eq('user_id', user_id).order('proficiency_level', desc=True).execute()
+        return response.data or []
+    
+    async def aload_generation_inputs(self, user_id: str) -> Dict[str, Any]:
+        """Everything the resume workflow needs for a user; shared between callers, so treat it as read-only.
+
+        Cached for GENERATION_INPUTS_TTL under the user's invalidation version,
+        which any profile write in any process moves on.
+        """
+        version = get_invalidation_bus().version(PROFILE_SCOPE, user_id)
+        return await _generation_inputs_cache.aget_or_compute(
+            (PROFILE_SCOPE, user_id, version), lambda: self._afetch_generation_inputs(user_id)
+        )
+    
+    async def _afetch_generation_inputs(self, user_id: str) -> Dict[str, Any]:
+        """Fetch everything the resume workflow needs for a user, concurrently"""
+        profile, education, experiences, projects, skills = await asyncio.gather(
+            self.aget_user_profile(user_id),
+            self.aget_education(user_id),
+            self.aget_work_experiences(user_id),
+            self.aget_projects(user_id),
+            self.aget_skills(user_id)
+        )
+        profile = profile or {}
+        profile['education'] = education
+        return {
+            "user_profile": profile,
+            "all_experiences": experiences,
+            "all_projects": projects,
+            "all_skills": skills
+        }
+    
+    async def _afind_resume_for_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        table = await self._atable('generated_resumes')
+        response = await table.select("*").eq('job_id', job_id).limit(1).execute()
+        return decode_resume_row(response.data[0]) if response.data else None
+
+    async def asave_generated_resume(self, resume_data: Dict[str, Any], warnings: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Save generated resume (JD deduplicated, text compressed) and add it to the local search index.
+
+        Idempotent per ``job_id`` (see migrations/005): a retried generation job gets
+        back the row its earlier attempt saved instead of inserting a second one.
+        A search-index failure does not fail the save; it is appended to ``warnings``.
+        """
+        job_id = resume_data.get('job_id')
+        if job_id:
+            existing = await self._afind_resume_for_job(job_id)
+            if existing:
+                return existing
+        row, jd_row = encode_resume_row(resume_data)
+        if jd_row:
+            jd_table = await self._atable('job_descriptions')
+            await jd_table.upsert(jd_row, on_conflict='hash', ignore_duplicates=True).execute()
+        table = await self._atable('generated_resumes')
+        try:
+            response = await table.insert(row).execute()
+        except Exception:
+            # Lost a race with another attempt of the same job to the unique index
+            existing = await self._afind_resume_for_job(job_id) if job_id else None
+            if existing:
+                return existing
+            raise
+        saved = decode_resume_row(response.data[0]) if response.data else None
+        index_error = await asyncio.to_thread(self._index_saved_resume, saved, resume_data)
+        if index_error and warnings is not None:
+            warnings.append(index_error)
+        await asyncio.to_thread(self._publish, RESUMES_SCOPE, [resume_data])
+        return saved
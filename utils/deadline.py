@@ -0,0 +1,61 @@
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# End-to-end budget for one resume generation, measured from the Generate click
+RESUME_DEADLINE_SECONDS = float(os.environ.get("RESUME_DEADLINE_SECONDS", "15"))
+# Kept back from the workflow for PDF rendering and saving
+RENDER_RESERVE_SECONDS = 2.0
+# Kept back by the steps before the summary so the summary still gets a real LLM call
+SUMMARY_RESERVE_SECONDS = 3.0
+# Below this an LLM call cannot usefully finish; callers go straight to their fallbacks
+MIN_LLM_BUDGET_SECONDS = 1.0
+# Non-critical steps (company research, project tailoring) are skipped below this
+NON_CRITICAL_MIN_BUDGET_SECONDS = 4.0
+
+# Absolute wall-clock deadline (time.time()) for the current task, or None for no limit.
+# asyncio tasks copy the context, so work started inside a scope inherits its deadline.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+def new_deadline(seconds: float = RESUME_DEADLINE_SECONDS) -> float:
+    """Absolute deadline ``seconds`` from now"""
+    return time.time() + seconds
+
+def current_deadline() -> Optional[float]:
+    return _deadline.get()
+
+def remaining_budget() -> Optional[float]:
+    """Seconds left before the current deadline (never negative), or None without one"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.time())
+
+def has_budget(seconds: float) -> bool:
+    """Whether at least ``seconds`` remain; always true without a deadline"""
+    budget = remaining_budget()
+    return budget is None or budget >= seconds
+
+def call_timeout(default: float) -> float:
+    """Timeout for one outbound call: ``default``, shrunk to the remaining budget"""
+    budget = remaining_budget()
+    return default if budget is None else min(default, budget)
+
+@contextmanager
+def deadline_scope(deadline: Optional[float], reserve: float = 0.0) -> Iterator[Optional[float]]:
+    """Run a block under ``deadline`` minus ``reserve`` seconds.
+
+    Scopes only ever tighten: an enclosing, earlier deadline still applies.
+    """
+    outer = _deadline.get()
+    if deadline is not None:
+        deadline -= reserve
+    if outer is not None:
+        deadline = outer if deadline is None else min(outer, deadline)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,145 @@
+import asyncio
+import csv
+import json
+import os
+import re
+import tempfile
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from utils.database import DatabaseManager
+from utils.job_queue import get_job_queue, get_job_worker, register_handler
+from utils.local_store import get_local_data_dir
+from utils.pdf_cache import render_cached_pdf, prune_pdf_cache
+from utils.resume_generator import ResumeGenerator
+
+EXPORT_RESUMES_JOB = "export_resumes"
+EXPORT_WORKERS = int(os.environ.get("EXPORT_WORKERS", "4"))
+# Rows fetched per query; with at most 2 * EXPORT_WORKERS renders in flight this bounds memory
+EXPORT_BATCH_SIZE = 25
+EXPORT_RETENTION_SECONDS = 60 * 60 * 24
+EXPORT_COLUMNS = "id, created_at, job_title, company_name, markdown_z, markdown_source"
+MANIFEST_FIELDS = ["file", "job_title", "company_name", "created_at", "error"]
+
+def get_export_dir() -> str:
+    path = os.path.join(get_local_data_dir(), "exports")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def prune_exports(older_than: float = EXPORT_RETENTION_SECONDS) -> None:
+    """Delete finished export archives nobody downloaded in time"""
+    cutoff = time.time() - older_than
+    for entry in os.scandir(get_export_dir()):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+def _iter_resumes(db_manager: DatabaseManager, user_id: str, resume_ids: Optional[List[str]]) -> Iterator[Dict[str, Any]]:
+    """Yield the resumes to export, one batch in memory at a time"""
+    if resume_ids is not None:
+        for start in range(0, len(resume_ids), EXPORT_BATCH_SIZE):
+            yield from db_manager.get_resumes_by_ids(user_id, resume_ids[start:start + EXPORT_BATCH_SIZE], columns=EXPORT_COLUMNS)
+        return
+    after = None
+    while True:
+        batch = db_manager.list_generated_resumes(user_id, limit=EXPORT_BATCH_SIZE, after=after, columns=EXPORT_COLUMNS)
+        yield from batch
+        if len(batch) < EXPORT_BATCH_SIZE:
+            return
+        after = {'created_at': batch[-1]['created_at'], 'id': batch[-1]['id']}
+
+def _archive_name(resume: Dict[str, Any]) -> str:
+    """Readable, unique file name inside the archive"""
+    parts = [str(resume.get('created_at') or '')[:10], resume.get('company_name') or 'Company', resume.get('job_title') or 'Resume']
+    stem = "_".join(re.sub(r"[^A-Za-z0-9]+", "-", part).strip("-") for part in parts if part)
+    return f"resumes/{stem}_{str(resume['id'])[:8]}.pdf"
+
+def _missing_markdown() -> str:
+    raise ValueError("Markdown source not found")
+
+def export_resumes_zip(user_id: str, resume_ids: Optional[List[str]], path: str) -> Dict[str, Any]:
+    """Write a ZIP of the user's resumes (all, or ``resume_ids``) to ``path``.
+
+    PDFs come from the PDF cache or are rendered by a small worker pool. Each
+    one is written into the archive from disk as soon as it is ready, and the
+    CSV/JSON manifests are spooled to temporary files, so memory use does not
+    grow with the number of resumes.
+    """
+    prune_exports()
+    prune_pdf_cache()
+    db_manager = DatabaseManager()
+    resume_gen = ResumeGenerator()
+    exported = failed = 0
+    # Unique per attempt: a re-claimed export must never write into another attempt's file
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+
+    with tempfile.TemporaryDirectory() as spool, \
+            ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="export") as pool, \
+            zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive, \
+            open(os.path.join(spool, "manifest.csv"), "w", newline="", encoding="utf-8") as csv_file, \
+            open(os.path.join(spool, "manifest.json"), "w", encoding="utf-8") as json_file:
+        writer = csv.DictWriter(csv_file, fieldnames=MANIFEST_FIELDS)
+        writer.writeheader()
+        json_file.write("[")
+        pending: deque = deque()
+
+        def write_next() -> None:
+            nonlocal exported, failed
+            entry, future = pending.popleft()
+            try:
+                pdf_path = future.result()
+                # PDFs are already compressed; storing them avoids wasted CPU
+                archive.write(pdf_path, entry["file"], compress_type=zipfile.ZIP_STORED)
+                exported += 1
+            except Exception as e:
+                entry["file"], entry["error"] = "", f"{type(e).__name__}: {e}"
+                failed += 1
+            writer.writerow(entry)
+            json_file.write(("," if exported + failed > 1 else "") + "\n" + json.dumps(entry))
+
+        for resume in _iter_resumes(db_manager, user_id, resume_ids):
+            entry = {
+                "file": _archive_name(resume),
+                "job_title": resume.get('job_title'),
+                "company_name": resume.get('company_name'),
+                "created_at": resume.get('created_at'),
+                "error": ""
+            }
+            markdown_source = resume.get('markdown_source')
+            if markdown_source:
+                future = pool.submit(render_cached_pdf, markdown_source, resume_gen.create_pdf_from_markdown)
+            else:
+                future = pool.submit(_missing_markdown)
+            pending.append((entry, future))
+            while len(pending) >= 2 * EXPORT_WORKERS:
+                write_next()
+        while pending:
+            write_next()
+
+        json_file.write("\n]\n")
+        csv_file.flush()
+        json_file.flush()
+        archive.write(csv_file.name, "manifest.csv")
+        archive.write(json_file.name, "manifest.json")
+
+    os.replace(tmp_path, path)
+    return {"exported": exported, "failed": failed, "path": path, "size_bytes": os.path.getsize(path)}
+
+async def run_export_job(payload: Dict[str, Any], job: Dict[str, Any]) -> Tuple[Dict[str, Any], None]:
+    """Job handler: build the export archive on disk; the job stores only its path"""
+    path = os.path.join(get_export_dir(), f"resumes_{job['id']}.zip")
+    result = await asyncio.to_thread(export_resumes_zip, payload["user_id"], payload.get("resume_ids"), path)
+    return result, None
+
+register_handler(EXPORT_RESUMES_JOB, run_export_job)
+
+def enqueue_export(user_id: str, resume_ids: Optional[List[str]] = None) -> str:
+    """Queue an export of all (or the given) resumes and return the job ID"""
+    get_job_worker()
+    return get_job_queue().enqueue(EXPORT_RESUMES_JOB, {"user_id": user_id, "resume_ids": resume_ids}, user_id=user_id)
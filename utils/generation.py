@@ -0,0 +1,190 @@
+import asyncio
+import hashlib
+import re
+from typing import Any, Dict, Optional, Tuple
+
+from utils.ai_agents import AIAgents, ResumeState, final_resume_state
+from utils.ats_score import score_resume
+from utils.async_runtime import run_sync
+from utils.checkpoints import adelete_checkpoints, amaybe_purge_checkpoints
+from utils.compression import content_hash
+from utils.database import DatabaseManager
+from utils.deadline import deadline_scope, new_deadline, RENDER_RESERVE_SECONDS, RESUME_DEADLINE_SECONDS
+from utils.job_queue import get_job_queue, get_job_worker, register_handler
+from utils.pdf_cache import cached_pdf_path, store_pdf
+from utils.profile_snapshot import ProfileSnapshot, load_profile_snapshot, profile_version
+from utils.resume_generator import ResumeGenerator
+
+GENERATE_RESUME_JOB = "generate_resume"
+RENDER_PDF_JOB = "render_pdf"
+
+def normalize_job_description(jd_text: str) -> str:
+    """Whitespace- and case-insensitive form of a JD, so trivial re-pastes match"""
+    return re.sub(r"\s+", " ", jd_text or "").strip().lower()
+
+def generation_key(user_id: str, jd_text: str, inputs: Dict[str, Any], max_pages: Optional[int] = None) -> str:
+    """Idempotency key: same user, same JD, same profile and page limit means the same resume"""
+    jd_hash = hashlib.sha256(normalize_job_description(jd_text).encode("utf-8")).hexdigest()
+    key = f"{user_id}:{jd_hash[:32]}:{profile_version(inputs)}"
+    return f"{key}:p{max_pages}" if max_pages else key
+
+def is_degraded(final_state: Dict[str, Any]) -> bool:
+    """Whether a resume was built mostly from fallbacks: the JD analysis, or half the steps, got no LLM answer"""
+    fallbacks = set(final_state.get("fallback_steps") or [])
+    steps = set(final_state.get("completed_steps") or [])
+    return "analyze_jd" in fallbacks or (bool(fallbacks) and len(fallbacks) * 2 >= len(steps))
+
+def build_initial_state(user_id: str, jd_text: str, snapshot: ProfileSnapshot, deadline: Optional[float] = None) -> ResumeState:
+    """Initial workflow state for a job description; the profile is referenced, not copied"""
+    return {
+        "user_id": user_id,
+        "job_description": jd_text,
+        "profile_key": snapshot.key,
+        "jd_analysis": {},
+        "selected_experience_ids": [],
+        "selected_project_ids": [],
+        "selected_skills": [],
+        "tailored_summary": "",
+        "experience_overlays": {},
+        "project_overlays": {},
+        "company_info": {},
+        "ats_score": {},
+        "variant_hits": [],
+        "fallback_steps": [],
+        "warnings": [],
+        "deadline": deadline,
+        "completed_steps": []
+    }
+
+async def run_generation_job(payload: Dict[str, Any], job: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+    """Job handler: run the workflow, save the resume and queue its PDF render.
+
+    The workflow must finish ``RENDER_RESERVE_SECONDS`` before the request's
+    deadline; steps that run out of budget fall back to deterministic content,
+    so a resume always arrives within the SLA. The first attempt's budget runs
+    from the Generate click; a retry or re-leased attempt starts a fresh one
+    instead of inheriting a deadline that expired with the failed attempt.
+    """
+    user_id = payload["user_id"]
+    jd_text = payload["job_description"]
+    deadline = payload.get("deadline")
+    if deadline is not None and job["attempts"] > 1:
+        deadline = new_deadline(payload.get("budget_seconds", RESUME_DEADLINE_SECONDS))
+    workflow_deadline = deadline - RENDER_RESERVE_SECONDS if deadline is not None else None
+
+    db_manager = DatabaseManager()
+    ai_agents = AIAgents()
+    resume_gen = ResumeGenerator()
+
+    # 1. Fetch all user data from DB (concurrently), unless it came with the job.
+    # Held for the whole run: the workflow state only refers to it by key
+    inputs = payload.get("inputs") or await db_manager.aload_generation_inputs(user_id)
+    snapshot = load_profile_snapshot(user_id, inputs)
+
+    # 2. Run the LangGraph workflow
+    with deadline_scope(workflow_deadline):
+        # Checkpointed under the job ID: a retried attempt resumes after the last finished node
+        workflow_state = await ai_agents.arun_workflow(build_initial_state(user_id, jd_text, snapshot, workflow_deadline), thread_id=job["id"])
+    final_state = final_resume_state(workflow_state, snapshot)
+
+    # 3. Build the Markdown, trimmed to the page limit if one was asked for. The PDF
+    # is rendered by a separate job so the page can show an HTML preview right away
+    max_pages = payload.get("max_pages")
+    fit_info = None
+    if max_pages:
+        markdown_content, fit_info = resume_gen.create_fitted_markdown(final_state, max_pages)
+    else:
+        markdown_content = resume_gen.build_markdown(final_state)
+    pdf_job_id = await asyncio.to_thread(enqueue_pdf_render, user_id, markdown_content)
+    # Score what will be rendered (fit mode may have trimmed content)
+    workflow_score = final_state.get('ats_score') or {}
+    ats_score = {
+        **score_resume(markdown_content, final_state['jd_analysis']),
+        "initial_coverage": workflow_score.get('initial_coverage', workflow_score.get('coverage')),
+        "retailored": workflow_score.get('retailored', [])
+    }
+
+    # 4. Save the result to the database, once per job: a retry that resumes the finished
+    # checkpoint (say the attempt failed after saving) gets the row already saved
+    warnings = list(final_state.get("warnings") or [])
+    saved = await db_manager.asave_generated_resume({
+        "job_id": job["id"],
+        "user_id": user_id,
+        "job_title": final_state['jd_analysis'].get('job_title', 'N/A'),
+        "company_name": final_state['jd_analysis'].get('company_name', 'N/A'),
+        "job_description": jd_text,
+        "jd_analysis": final_state['jd_analysis'],
+        "tailored_summary": final_state['tailored_summary'],
+        "ats_score": ats_score,
+        "markdown_source": markdown_content
+    }, warnings=warnings)
+
+    result = {
+        "resume_id": saved.get("id") if saved else None,
+        "final_state": final_state,
+        "markdown_source": markdown_content,
+        "ats_score": ats_score,
+        "fit": fit_info,
+        "pdf_job_id": pdf_job_id,
+        # Degraded results are shown but never handed to a later identical request
+        "degraded": is_degraded(final_state),
+        # Failures the workflow (and the save) ran into on the event loop, for the page to show
+        "warnings": list(dict.fromkeys(warnings))
+    }
+    await adelete_checkpoints(job["id"])
+    await amaybe_purge_checkpoints()
+    return result, None
+
+register_handler(GENERATE_RESUME_JOB, run_generation_job)
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+async def run_render_pdf_job(payload: Dict[str, Any], job: Dict[str, Any]) -> Tuple[Dict[str, Any], bytes]:
+    """Job handler: render resume Markdown to a PDF (the job's file), via the PDF cache"""
+    markdown_content = payload["markdown_source"]
+    path = await asyncio.to_thread(cached_pdf_path, markdown_content)
+    if path:
+        pdf_bytes, pages = await asyncio.to_thread(_read_file, path), None
+    else:
+        pdf_bytes, pages = await get_job_worker().run_cpu(ResumeGenerator().render_pdf, markdown_content)
+        await asyncio.to_thread(store_pdf, markdown_content, pdf_bytes)  # bulk exports reuse it
+    return {"pages": pages, "size_bytes": len(pdf_bytes)}, pdf_bytes
+
+register_handler(RENDER_PDF_JOB, run_render_pdf_job)
+
+def enqueue_pdf_render(user_id: str, markdown_content: str) -> str:
+    """Queue a PDF render of resume Markdown; the same Markdown always maps to one job"""
+    get_job_worker()
+    return get_job_queue().enqueue(
+        RENDER_PDF_JOB,
+        {"markdown_source": markdown_content},
+        user_id=user_id,
+        idempotency_key=f"pdf:{content_hash(markdown_content)}"
+    )
+
+def enqueue_generation(user_id: str, jd_text: str, force: bool = False, max_pages: Optional[int] = None) -> str:
+    """Queue a resume generation and make sure this process is working the queue.
+
+    Idempotent per user, normalized JD and profile version: a matching run that
+    is still in flight is joined, and a finished one is returned as-is unless
+    ``force`` is set or it was degraded. The end-to-end deadline starts now, so time spent waiting
+    in the queue counts. ``max_pages`` trims the resume to fit that many pages.
+    """
+    # Taken first: loading the profile below is part of the request's budget
+    deadline = new_deadline()
+    get_job_worker()
+    # The profile snapshot both versions the key and saves the job a second load
+    inputs = run_sync(DatabaseManager().aload_generation_inputs(user_id))
+    payload = {
+        "user_id": user_id, "job_description": jd_text, "inputs": inputs, "max_pages": max_pages or None,
+        "deadline": deadline, "budget_seconds": RESUME_DEADLINE_SECONDS
+    }
+    return get_job_queue().enqueue(
+        GENERATE_RESUME_JOB,
+        payload,
+        user_id=user_id,
+        idempotency_key=generation_key(user_id, jd_text, inputs, max_pages),
+        reuse_done=not force
+    )
@@ -0,0 +1,208 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from utils.local_store import connect_local_db
+
+# Cross-process cache invalidation. DatabaseManager publishes an event after
+# every write (scope plus the user it touched); each process applies its own
+# events immediately and receives everyone else's through a shared backend, so
+# per-process caches can use long TTLs without serving another worker's stale
+# data. Production runs with RESUME_AGENT_INVALIDATION_URL set to a Postgres
+# connection string (LISTEN/NOTIFY); otherwise processes on one host share a
+# local SQLite log, which is also what tests and single-host deployments use.
+
+PROFILE_SCOPE = "profile"   # user_profiles, work_experiences, projects, education, skills, certifications
+RESUMES_SCOPE = "resumes"   # generated_resumes
+ALL_SCOPES = "*"            # everything, after a backend may have missed events
+
+INVALIDATION_CHANNEL = "resume_agent_invalidation"
+INVALIDATION_POLL_SECONDS = 0.5
+# Local log entries older than this are pruned; a process that falls further behind flushes everything
+INVALIDATION_LOG_RETENTION_SECONDS = 600
+RECONNECT_BACKOFF_SECONDS = (1, 2, 5, 10, 30)
+
+class InvalidationEvent(NamedTuple):
+    scope: str
+    user_id: Optional[str]  # None: every user
+    origin: str
+    host: str
+
+class LocalLogBackend:
+    """Events appended to a SQLite table that every process on this host polls"""
+
+    def __init__(self, poll_seconds: float = INVALIDATION_POLL_SECONDS):
+        self.conn = connect_local_db("invalidations")
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS invalidations (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            # Only events published from now on concern this process
+            self._last_seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM invalidations").fetchone()[0]
+
+    def send(self, payload: str) -> None:
+        with self._lock:
+            self.conn.execute("INSERT INTO invalidations (payload, created_at) VALUES (?, ?)", (payload, time.time()))
+
+    def listen(self, on_payload: Callable[[str], None], on_gap: Callable[[], None]) -> None:
+        last_seq = self._last_seq
+        last_prune = 0.0
+        while True:
+            time.sleep(self.poll_seconds)
+            with self._lock:
+                if time.time() - last_prune > 60:
+                    last_prune = time.time()
+                    self.conn.execute("DELETE FROM invalidations WHERE created_at < ?", (time.time() - INVALIDATION_LOG_RETENTION_SECONDS,))
+                oldest = self.conn.execute("SELECT MIN(seq) FROM invalidations").fetchone()[0]
+                rows = self.conn.execute("SELECT seq, payload FROM invalidations WHERE seq > ? ORDER BY seq", (last_seq,)).fetchall()
+            if oldest is not None and oldest > last_seq + 1 and last_seq:
+                on_gap()  # entries this process never saw were pruned
+            for row in rows:
+                last_seq = row["seq"]
+                on_payload(row["payload"])
+
+class PostgresBackend:
+    """Postgres LISTEN/NOTIFY on INVALIDATION_CHANNEL, for processes on different hosts"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._send_conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        import psycopg  # only needed when a Postgres bus is configured
+        return psycopg.connect(self.url, autocommit=True)
+
+    def send(self, payload: str) -> None:
+        with self._lock:
+            try:
+                if self._send_conn is None or self._send_conn.closed:
+                    self._send_conn = self._connect()
+                self._send_conn.execute("SELECT pg_notify(%s, %s)", (INVALIDATION_CHANNEL, payload))
+            except Exception:
+                self._send_conn = None
+                raise
+
+    def listen(self, on_payload: Callable[[str], None], on_gap: Callable[[], None]) -> None:
+        attempt = 0
+        while True:
+            try:
+                with self._connect() as conn:
+                    conn.execute(f"LISTEN {INVALIDATION_CHANNEL}")
+                    if attempt:
+                        on_gap()  # notifications sent while disconnected are lost
+                    attempt = 0
+                    for notify in conn.notifies():
+                        on_payload(notify.payload)
+            except Exception:
+                pass
+            time.sleep(RECONNECT_BACKOFF_SECONDS[min(attempt, len(RECONNECT_BACKOFF_SECONDS) - 1)])
+            attempt += 1
+
+class InvalidationBus:
+    """Fans invalidation events out to this process's caches and, through a backend, to other processes.
+
+    Caches either subscribe a callback or key their entries on ``version()``,
+    which changes whenever an event for that scope and user arrives.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.host = socket.gethostname()
+        self.origin = f"{self.host}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._subscribers: Dict[str, Callable[[InvalidationEvent], None]] = {}
+        self._versions: Dict[Tuple[str, Optional[str]], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "received": 0, "gaps": 0, "errors": 0}
+        self.last_error: Optional[str] = None
+        threading.Thread(target=self._listen, name="invalidation-bus", daemon=True).start()
+
+    def subscribe(self, name: str, callback: Callable[[InvalidationEvent], None]) -> None:
+        """Call ``callback`` for every event; subscribing again under ``name`` replaces it"""
+        with self._lock:
+            self._subscribers[name] = callback
+
+    def version(self, scope: str, user_id: Optional[str]) -> int:
+        """Counter that moves whenever ``scope`` is invalidated for ``user_id`` (or for everyone)"""
+        user_id = str(user_id) if user_id is not None else None
+        with self._lock:
+            return self._versions[(scope, user_id)] + self._versions[(scope, None)] + self._versions[(ALL_SCOPES, None)]
+
+    def publish(self, scope: str, user_id: Optional[str]) -> None:
+        """Invalidate locally now, then tell the other processes"""
+        event = InvalidationEvent(scope, str(user_id) if user_id is not None else None, self.origin, self.host)
+        self._apply(event)
+        self.stats["published"] += 1
+        try:
+            self.backend.send(json.dumps(event._asdict()))
+        except Exception as e:
+            # Other processes fall back to their TTLs; the write itself already succeeded
+            self._error(e)
+
+    def _apply(self, event: InvalidationEvent) -> None:
+        with self._lock:
+            self._versions[(event.scope, event.user_id)] += 1
+            subscribers = list(self._subscribers.values())
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                self._error(e)
+
+    def _receive(self, payload: str) -> None:
+        try:
+            event = InvalidationEvent(**json.loads(payload))
+        except (ValueError, TypeError) as e:
+            self._error(e)
+            return
+        if event.origin != self.origin:
+            self.stats["received"] += 1
+            self._apply(event)
+
+    def _gap(self) -> None:
+        self.stats["gaps"] += 1
+        self._apply(InvalidationEvent(ALL_SCOPES, None, self.origin, self.host))
+
+    def _listen(self) -> None:
+        try:
+            self.backend.listen(self._receive, self._gap)
+        except Exception as e:
+            self._error(e)
+
+    def _error(self, error: Exception) -> None:
+        self.stats["errors"] += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+
+def event_matches(event: InvalidationEvent, scope: str, user_id: Any) -> bool:
+    """Whether ``event`` invalidates data of ``scope`` for ``user_id``"""
+    return event.scope in (scope, ALL_SCOPES) and (event.user_id is None or event.user_id == str(user_id))
+
+def invalidate_cache_on(cache, scope: str, name: str) -> None:
+    """Drop a TTLCache's entries keyed ``(scope, user_id, ...)`` when that user's scope is invalidated"""
+    def on_event(event: InvalidationEvent) -> None:
+        cache.invalidate_where(lambda key: isinstance(key, tuple) and len(key) >= 2
+                               and key[0] == scope and event_matches(event, scope, key[1]))
+    get_invalidation_bus().subscribe(name, on_event)
+
+@lru_cache(maxsize=None)
+def get_invalidation_bus() -> InvalidationBus:
+    """Process-wide bus on the configured backend"""
+    url = os.environ.get("RESUME_AGENT_INVALIDATION_URL", "").strip()
+    if url.startswith(("postgres://", "postgresql://")):
+        return InvalidationBus(PostgresBackend(url))
+    return InvalidationBus(LocalLogBackend())
+
+def publish_invalidation(scope: str, user_id: Optional[str]) -> None:
+    get_invalidation_bus().publish(scope, user_id)
@@ -0,0 +1,195 @@
+import asyncio
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from utils.ats_score import normalize_tokens, token_ngrams
+from utils.cache import TTLCache
+from utils.compression import content_hash
+from utils.variant_bank import SKILL_CLUSTERS
+
+# Ranks a batch of job postings against one profile without running the resume
+# workflow. Each JD becomes a weighted row of skill/keyword terms and each
+# profile item (role, project, skill list) a binary row over the same terms;
+# the fit scores for every JD then come out of a few sparse matrix products.
+
+# Postings pasted together are separated by a line of three or more dashes
+JD_SEPARATOR_RE = re.compile(r"^\s*-{3,}\s*$", re.M)
+# Terms after the first such heading count as nice-to-have
+PREFERRED_HEADING_RE = re.compile(r"\b(preferred|nice[ -]to[ -]have|bonus points?|desirable|pluses)\b", re.I)
+# Role-family keywords too common in posting boilerplate to count as skills
+GENERIC_TERMS = {"hiring", "ownership"}
+REQUIRED_WEIGHT = 1.0
+PREFERRED_WEIGHT = 0.5
+JD_ANALYSIS_TTL = 60 * 60 * 24
+JD_ANALYSIS_CONCURRENCY = 4
+
+# LLM analyses by normalized JD, so re-ranking the same postings is free
+_jd_analysis_cache = TTLCache(ttl=JD_ANALYSIS_TTL, max_entries=2000)
+
+def split_job_descriptions(text: str) -> List[str]:
+    """Individual postings from a pasted batch"""
+    return [part.strip() for part in JD_SEPARATOR_RE.split(text or "") if part.strip()]
+
+@lru_cache(maxsize=20000)
+def _normalized(term: str) -> str:
+    return " ".join(normalize_tokens(str(term)))
+
+def known_terms(inputs: Dict[str, Any]) -> List[str]:
+    """Terms recognized in a JD without the LLM: the profile's skills and technologies plus the role-family keywords"""
+    terms = [skill.get('skill_name') for skill in inputs.get('all_skills') or []]
+    for item in (inputs.get('all_experiences') or []) + (inputs.get('all_projects') or []):
+        terms += list(item.get('technologies') or [])
+    for keywords in SKILL_CLUSTERS.values():
+        terms += [keyword for keyword in keywords if keyword not in GENERIC_TERMS]
+    seen, vocabulary = set(), []
+    for term in terms:
+        normalized = _normalized(term or "")
+        if normalized and normalized not in seen:
+            seen.add(normalized)
+            vocabulary.append(str(term))
+    return vocabulary
+
+def local_jd_analysis(jd_text: str, vocabulary: List[str]) -> Dict[str, Any]:
+    """The parts of ``analyze_job_description`` that plain term matching can recover"""
+    heading = PREFERRED_HEADING_RE.search(jd_text)
+    required_text, preferred_text = (jd_text[:heading.start()], jd_text[heading.start():]) if heading else (jd_text, "")
+    required_grams, preferred_grams = token_ngrams(required_text), token_ngrams(preferred_text)
+    required, preferred = [], []
+    for term in vocabulary:
+        normalized = _normalized(term)
+        if required_grams[normalized]:
+            required.append(term)
+        elif preferred_grams[normalized]:
+            preferred.append(term)
+    first_line = next((line.strip() for line in jd_text.splitlines() if line.strip()), "")
+    return {
+        "job_title": first_line[:80] or "Untitled posting",
+        "company_name": "",
+        "required_skills": required,
+        "preferred_skills": preferred,
+        "keywords": []
+    }
+
+def _merge_analysis(llm: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+    merged = dict(local)
+    for key in ("job_title", "company_name"):
+        if llm.get(key):
+            merged[key] = llm[key]
+    for key in ("required_skills", "preferred_skills", "keywords"):
+        merged[key] = list(dict.fromkeys(list(llm.get(key) or []) + list(local.get(key) or [])))
+    return merged
+
+async def aanalyze_job_descriptions(jd_texts: List[str], inputs: Dict[str, Any], use_llm: bool = False) -> List[Dict[str, Any]]:
+    """Analysis per JD: local term matching, merged with ``aanalyze_job_description`` when ``use_llm``"""
+    vocabulary = known_terms(inputs)
+    local = [local_jd_analysis(text, vocabulary) for text in jd_texts]
+    if not use_llm:
+        return local
+
+    from utils.ai_agents import AIAgents
+    from utils.generation import normalize_job_description
+
+    agents = AIAgents()
+    slots = asyncio.Semaphore(JD_ANALYSIS_CONCURRENCY)
+
+    async def analyze(text: str) -> Dict[str, Any]:
+        async def compute():
+            async with slots:
+                return await agents.aanalyze_job_description(text)
+        return await _jd_analysis_cache.aget_or_compute(content_hash(normalize_job_description(text)), compute)
+
+    analyses = await asyncio.gather(*[analyze(text) for text in jd_texts])
+    return [_merge_analysis(llm, analysis) for llm, analysis in zip(analyses, local)]
+
+def profile_items(inputs: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(label, text) for every profile item a JD term can be matched in"""
+    items = []
+    for exp in inputs.get('all_experiences') or []:
+        text = "\n".join([str(exp.get('position') or ""), str(exp.get('description') or "")]
+                         + [str(a) for a in exp.get('achievements') or []] + [", ".join(map(str, exp.get('technologies') or []))])
+        items.append((f"{exp.get('position') or 'Role'} at {exp.get('company_name') or 'N/A'}", text))
+    for proj in inputs.get('all_projects') or []:
+        text = "\n".join([str(proj.get('title') or ""), str(proj.get('description') or "")]
+                         + [str(a) for a in proj.get('achievements') or []] + [", ".join(map(str, proj.get('technologies') or []))])
+        items.append((str(proj.get('title') or 'Project'), text))
+    items.append(("Skills", ", ".join(str(s.get('skill_name') or "") for s in inputs.get('all_skills') or [])))
+    return items
+
+def match_matrix(analyses: List[Dict[str, Any]], inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Sparse JDs x terms weights, profile items x terms presence, and the term labels"""
+    from scipy import sparse
+
+    columns: Dict[str, int] = {}
+    labels: List[str] = []
+    rows, cols, weights = [], [], []
+    for row, analysis in enumerate(analyses):
+        terms = {}
+        for weight, key in ((PREFERRED_WEIGHT, 'keywords'), (PREFERRED_WEIGHT, 'preferred_skills'), (REQUIRED_WEIGHT, 'required_skills')):
+            for term in analysis.get(key) or []:
+                normalized = _normalized(term)
+                if normalized:
+                    if normalized not in columns:
+                        columns[normalized] = len(labels)
+                        labels.append(str(term))
+                    terms[columns[normalized]] = weight  # required wins over preferred/keyword
+        rows += [row] * len(terms)
+        cols += list(terms)
+        weights += list(terms.values())
+    jds = sparse.csr_matrix((weights, (rows, cols)), shape=(len(analyses), len(labels)), dtype=np.float32)
+
+    items = profile_items(inputs)
+    item_rows, item_cols = [], []
+    for row, (_, text) in enumerate(items):
+        grams = token_ngrams(text)
+        hits = [column for normalized, column in columns.items() if grams[normalized]]
+        item_rows += [row] * len(hits)
+        item_cols += hits
+    profile = sparse.csr_matrix((np.ones(len(item_rows), dtype=np.float32), (item_rows, item_cols)), shape=(len(items), len(labels)))
+    return {"jds": jds, "profile": profile, "terms": labels, "items": [label for label, _ in items]}
+
+def score_matches(analyses: List[Dict[str, Any]], inputs: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """JDs ranked by fit with the profile, best first, with matched and missing terms.
+
+    ``fit`` is the weighted share of the JD's terms the profile covers (required
+    skills count double), ``required_coverage`` the share of required skills alone.
+    """
+    matrix = match_matrix(analyses, inputs)
+    jds, profile, terms = matrix["jds"], matrix["profile"], matrix["terms"]
+    have = np.asarray(profile.sum(axis=0)).ravel() > 0
+
+    total = np.asarray(jds.sum(axis=1)).ravel()
+    fit = np.divide(jds @ have.astype(np.float32), total, out=np.zeros_like(total), where=total > 0)
+    required = (jds >= REQUIRED_WEIGHT).astype(np.float32)
+    required_total = np.asarray(required.sum(axis=1)).ravel()
+    required_coverage = np.divide(required @ have.astype(np.float32), required_total,
+                                  out=np.zeros_like(required_total), where=required_total > 0)
+    # Which profile item covers the most of each JD's terms
+    item_overlap = (jds @ profile.T).toarray()
+    best_item = item_overlap.argmax(axis=1) if item_overlap.size else np.zeros(len(analyses), dtype=int)
+
+    ranked = []
+    for index in np.lexsort((-required_coverage, -fit)):
+        columns = jds.indices[jds.indptr[index]:jds.indptr[index + 1]]
+        row_weights = jds.data[jds.indptr[index]:jds.indptr[index + 1]]
+        order = np.argsort(-row_weights, kind="stable")
+        columns = columns[order]
+        analysis = analyses[index]
+        ranked.append({
+            "index": int(index),
+            "job_title": analysis.get('job_title') or "Untitled posting",
+            "company_name": analysis.get('company_name') or "",
+            "fit": round(float(fit[index]), 3),
+            "required_coverage": round(float(required_coverage[index]), 3),
+            "matched": [terms[c] for c in columns if have[c]],
+            "missing": [terms[c] for c in columns if not have[c]],
+            "best_match": matrix["items"][best_item[index]] if item_overlap.size and item_overlap[index].any() else None,
+        })
+    return ranked
+
+async def arank_job_descriptions(jd_texts: List[str], inputs: Dict[str, Any], use_llm: bool = False) -> List[Dict[str, Any]]:
+    """Analyze a batch of JDs and rank them against the profile"""
+    analyses = await aanalyze_job_descriptions(jd_texts, inputs, use_llm)
+    return score_matches(analyses, inputs)
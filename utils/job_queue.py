@@ -0,0 +1,305 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from utils.async_runtime import submit
+from utils.local_store import connect_local_db
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+# A running job whose lease expires (its process died) is picked up again by any worker;
+# the worker running a job renews its lease every JOB_HEARTBEAT_SECONDS
+JOB_LEASE_SECONDS = 300
+JOB_HEARTBEAT_SECONDS = 60
+JOB_MAX_ATTEMPTS = 3
+# A failed attempt is retried after this many seconds, doubling each time
+JOB_RETRY_BACKOFF_SECONDS = 5
+JOB_RETENTION_SECONDS = 60 * 60 * 24 * 7
+POLL_INTERVAL_SECONDS = 0.5
+
+WORKER_CONCURRENCY = int(os.environ.get("JOB_WORKER_CONCURRENCY", "8"))
+CPU_WORKERS = int(os.environ.get("JOB_CPU_WORKERS", "2"))
+
+# kind -> coroutine function taking (payload, job) and returning (result dict, optional file bytes)
+JobHandler = Callable[[Dict[str, Any], Dict[str, Any]], Awaitable[Any]]
+_handlers: Dict[str, JobHandler] = {}
+
+def register_handler(kind: str, handler: JobHandler) -> None:
+    """Register the coroutine that runs jobs of a given kind"""
+    _handlers[kind] = handler
+
+class JobQueue:
+    """Durable job queue in local SQLite, shared by every process on the host.
+
+    Jobs survive page reruns, reconnects and restarts; results (including any
+    rendered file) stay in the store so later reruns and sessions can read them.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    user_id TEXT,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    file BLOB,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    lease_expires_at REAL,
+                    idempotency_key TEXT,
+                    available_at REAL
+                )
+            """)
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+            if "idempotency_key" not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN idempotency_key TEXT")
+            if "available_at" not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN available_at REAL")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created_idx ON jobs (status, created_at)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_user_created_idx ON jobs (user_id, kind, created_at)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_idempotency_idx ON jobs (idempotency_key, created_at)")
+            # At most one queued job per key, whichever process enqueued it. A running job
+            # may have a queued successor (see ``join_running``), so it is not covered.
+            self.conn.execute("DROP INDEX IF EXISTS jobs_active_idempotency_idx")
+            self.conn.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS jobs_queued_idempotency_idx ON jobs (idempotency_key)
+                WHERE idempotency_key IS NOT NULL AND status = '{JOB_QUEUED}'
+            """)
+        self.new_job = threading.Event()
+
+    @staticmethod
+    def _to_dict(row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, kind: str, payload: Dict[str, Any], user_id: Optional[str] = None,
+                idempotency_key: Optional[str] = None, reuse_done: bool = True, join_running: bool = True) -> str:
+        """Add a job and return its ID.
+
+        With an ``idempotency_key``, a queued job with the same key is returned
+        instead of adding another (single-flight), as is a running one unless
+        ``join_running`` is False (its inputs may already be out of date) and a
+        finished one unless ``reuse_done`` is False. Failed jobs are never reused,
+        nor are finished ones whose result is marked ``"degraded": true``.
+        """
+        statuses = (JOB_QUEUED,) + ((JOB_RUNNING,) if join_running else ()) + ((JOB_DONE,) if reuse_done else ())
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so the lookup and insert are atomic across processes
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if idempotency_key:
+                    row = self.conn.execute(
+                        f"SELECT id FROM jobs WHERE idempotency_key = ? AND status IN ({', '.join('?' * len(statuses))}) "
+                        "AND NOT (status = ? AND COALESCE(json_extract(result, '$.degraded'), 0)) "
+                        "ORDER BY created_at DESC LIMIT 1",
+                        (idempotency_key, *statuses, JOB_DONE)
+                    ).fetchone()
+                    if row:
+                        self.conn.execute("COMMIT")
+                        return row["id"]
+                self.conn.execute(
+                    "INSERT INTO jobs (id, kind, user_id, status, payload, created_at, idempotency_key) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, user_id, JOB_QUEUED, json.dumps(payload, default=str), time.time(), idempotency_key)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        self.new_job.set()
+        return job_id
+
+    def get(self, job_id: str, include_file: bool = True) -> Optional[Dict[str, Any]]:
+        columns = "*" if include_file else "id, kind, user_id, status, payload, result, error, attempts, created_at, started_at, finished_at, lease_expires_at, idempotency_key, available_at"
+        with self._lock:
+            row = self.conn.execute(f"SELECT {columns} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row)
+
+    def latest_for_user(self, user_id: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Most recent job of a kind for a user, without its file"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT id FROM jobs WHERE user_id = ? AND kind = ? ORDER BY created_at DESC LIMIT 1",
+                (user_id, kind)
+            ).fetchone()
+        return self.get(row["id"], include_file=False) if row else None
+
+    def claim_next(self, kinds: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Atomically take the oldest runnable job of one of ``kinds``
+        (queued and past any retry backoff, or running with an expired lease)"""
+        kinds = list(kinds)
+        if not kinds:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                f"""
+                UPDATE jobs
+                SET status = ?, attempts = attempts + 1, started_at = ?, lease_expires_at = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE kind IN ({', '.join('?' * len(kinds))})
+                    AND ((status = ? AND COALESCE(available_at, 0) <= ?) OR (status = ? AND lease_expires_at < ?))
+                    ORDER BY created_at
+                    LIMIT 1
+                )
+                RETURNING *
+                """,
+                (JOB_RUNNING, now, now + JOB_LEASE_SECONDS, *kinds, JOB_QUEUED, now, JOB_RUNNING, now)
+            ).fetchone()
+        return self._to_dict(row)
+
+    def renew_lease(self, job_id: str, attempts: int) -> bool:
+        """Extend a running attempt's lease; False once another worker has taken the job over"""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time() + JOB_LEASE_SECONDS, job_id, JOB_RUNNING, attempts)
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job_id: str, attempts: int, result: Dict[str, Any], file: Optional[bytes] = None) -> bool:
+        """Record an attempt's result; False (nothing written) once another worker has taken the job over"""
+        with self._lock:
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, file = ?, error = NULL, finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND status = ? AND attempts = ?",
+                (JOB_DONE, json.dumps(result, default=str), file, time.time(), job_id, JOB_RUNNING, attempts)
+            )
+        return cursor.rowcount > 0
+
+    def fail(self, job_id: str, error: str, attempts: int) -> bool:
+        """Record a failure; the job is re-queued, with exponential backoff, until it runs out of attempts
+        or a newer job with its key is already queued. False (nothing written) once another worker has
+        taken the job over"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                successor = self.conn.execute(
+                    "SELECT 1 FROM jobs WHERE idempotency_key = (SELECT idempotency_key FROM jobs WHERE id = ?) AND status = ?",
+                    (job_id, JOB_QUEUED)
+                ).fetchone()
+                status = JOB_QUEUED if attempts < JOB_MAX_ATTEMPTS and not successor else JOB_FAILED
+                cursor = self.conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires_at = NULL, available_at = ? "
+                    "WHERE id = ? AND status = ? AND attempts = ?",
+                    (status, error, now if status == JOB_FAILED else None,
+                     now + JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1) if status == JOB_QUEUED else None,
+                     job_id, JOB_RUNNING, attempts)
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount > 0
+
+    def purge_finished(self, older_than: float = JOB_RETENTION_SECONDS) -> int:
+        """Delete finished jobs older than ``older_than`` seconds"""
+        with self._lock:
+            cursor = self.conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (JOB_DONE, JOB_FAILED, time.time() - older_than)
+            )
+        return cursor.rowcount
+
+class JobWorker:
+    """Runs queued jobs as tasks on the shared event loop.
+
+    Up to ``concurrency`` jobs are in flight at once; CPU-bound steps such as
+    PDF rendering go to a small thread pool via ``run_cpu``.
+    """
+
+    def __init__(self, queue: JobQueue, concurrency: int = WORKER_CONCURRENCY, cpu_workers: int = CPU_WORKERS):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.cpu_executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="job-cpu")
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()  # strong refs so running jobs are not garbage-collected
+
+    def start(self) -> None:
+        with self._start_lock:
+            if not self._started:
+                self._started = True
+                submit(self._run())
+
+    async def run_cpu(self, func, *args):
+        """Run a blocking, CPU-bound call off the event loop"""
+        return await asyncio.get_running_loop().run_in_executor(self.cpu_executor, func, *args)
+
+    async def _run(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        last_purge = 0.0
+        while True:
+            await slots.acquire()
+            # Only kinds this process can run: handlers register when their module is imported
+            job = await asyncio.to_thread(self.queue.claim_next, list(_handlers))
+            if job is None:
+                slots.release()
+                if time.time() - last_purge > 3600:
+                    last_purge = time.time()
+                    await asyncio.to_thread(self.queue.purge_finished)
+                # Wake early when this process enqueues; other processes are seen on the next poll
+                await asyncio.to_thread(self.queue.new_job.wait, POLL_INTERVAL_SECONDS)
+                self.queue.new_job.clear()
+                continue
+            task = asyncio.get_running_loop().create_task(self._execute(job, slots))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _heartbeat(self, job: Dict[str, Any]) -> None:
+        """Keep a long-running job's lease alive so no other worker re-claims it"""
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            if not await asyncio.to_thread(self.queue.renew_lease, job["id"], job["attempts"]):
+                return
+
+    async def _execute(self, job: Dict[str, Any], slots: asyncio.Semaphore) -> None:
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(job))
+        try:
+            handler = _handlers.get(job["kind"])
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job kind '{job['kind']}'")
+            result, file = await handler(job["payload"], job)
+            # A stale attempt (its lease expired and the job was claimed again) writes
+            # nothing: the attempt that holds the job now records the outcome
+            await asyncio.to_thread(self.queue.complete, job["id"], job["attempts"], result, file)
+        except Exception as e:
+            await asyncio.to_thread(self.queue.fail, job["id"], f"{type(e).__name__}: {e}", job["attempts"])
+        finally:
+            heartbeat.cancel()
+            slots.release()
+
+@lru_cache(maxsize=None)
+def get_job_queue() -> JobQueue:
+    """Process-wide job queue instance"""
+    return JobQueue(connect_local_db("jobs"))
+
+@lru_cache(maxsize=None)
+def get_job_worker() -> JobWorker:
+    """Process-wide worker, started on first use"""
+    worker = JobWorker(get_job_queue())
+    worker.start()
+    return worker
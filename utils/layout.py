@@ -0,0 +1,267 @@
+import copy
+from typing import Any, Dict, List, Optional, Tuple
+
+# Fast page-count estimate for the resume template in utils/resume_generator.py.
+# Text is wrapped with Helvetica AFM widths (Arial, Liberation Sans and Nimbus
+# Sans share them) and block heights follow the template's CSS, so choosing
+# what fits on N pages costs microseconds instead of a WeasyPrint render each.
+
+PT_PER_CM = 72 / 2.54
+A4_WIDTH_CM = 21.0
+A4_HEIGHT_CM = 29.7
+# The estimate must come in this far under the page budget, to absorb wrapping
+# differences and page-break effects so one confirming render is enough
+FIT_SAFETY_MARGIN = 0.04
+
+# Advance widths (1/1000 em) for printable ASCII 32..126
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584
+]
+_DEFAULT_WIDTH = 556
+
+# Spacing presets; level 0 matches ResumeGenerator.css_style, higher levels are tighter.
+# Sizes are in pt, gaps and margins in cm.
+SPACING_LEVELS = [
+    {"font_size": 11, "line_height": 1.4, "h1_size": 24, "h2_size": 14, "h2_margin_top": 1.0, "h2_margin_bottom": 0.4,
+     "section_gap": 0.6, "item_gap": 0.5, "contact_gap": 0.8, "skills_gap": 0.2, "page_margin": 1.5},
+    {"font_size": 10.5, "line_height": 1.3, "h1_size": 22, "h2_size": 13, "h2_margin_top": 0.6, "h2_margin_bottom": 0.25,
+     "section_gap": 0.4, "item_gap": 0.3, "contact_gap": 0.5, "skills_gap": 0.1, "page_margin": 1.3},
+    {"font_size": 10, "line_height": 1.25, "h1_size": 20, "h2_size": 12, "h2_margin_top": 0.4, "h2_margin_bottom": 0.2,
+     "section_gap": 0.3, "item_gap": 0.2, "contact_gap": 0.4, "skills_gap": 0.1, "page_margin": 1.1},
+]
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    """Width of a single line of text in pt"""
+    widths = _HELVETICA_BOLD if bold else _HELVETICA
+    total = 0
+    for ch in text:
+        code = ord(ch)
+        total += widths[code - 32] if 32 <= code <= 126 else _DEFAULT_WIDTH
+    return total * size / 1000
+
+def count_lines(runs: List[Tuple[str, bool]], width: float, size: float) -> int:
+    """Lines needed to greedily wrap ``runs`` of (text, bold) into ``width`` pt"""
+    words = [(word, bold) for text, bold in runs for word in str(text).split()]
+    if not words:
+        return 0
+    space = text_width(" ", size)
+    lines, line_width = 1, 0.0
+    for word, bold in words:
+        word_width = text_width(word, size, bold)
+        if line_width and line_width + space + word_width > width:
+            lines += 1
+            line_width = 0.0
+        if word_width > width:
+            # A word wider than the line breaks across several lines
+            extra, word_width = divmod(word_width, width)
+            lines += int(extra)
+        line_width = word_width if not line_width else line_width + space + word_width
+    return lines
+
+def spacing_css(level: int) -> str:
+    """CSS overrides that apply a tighter spacing level on top of the base template"""
+    if level <= 0:
+        return ""
+    s = SPACING_LEVELS[min(level, len(SPACING_LEVELS) - 1)]
+    # !important because the base template is passed to WeasyPrint after the document's own styles
+    rules = {
+        "@page": f"margin: {s['page_margin']}cm",
+        "body": f"font-size: {s['font_size']}pt; line-height: {s['line_height']}",
+        "h1": f"font-size: {s['h1_size']}pt",
+        "h2": f"font-size: {s['h2_size']}pt; margin-top: {s['h2_margin_top']}cm; margin-bottom: {s['h2_margin_bottom']}cm",
+        "h3": f"font-size: {s['font_size'] + 1}pt",
+        ".contact-info": f"font-size: {s['font_size'] - 1}pt; margin-bottom: {s['contact_gap']}cm",
+        ".section": f"margin-bottom: {s['section_gap']}cm",
+        ".job, .project, .education-item": f"margin-bottom: {s['item_gap']}cm",
+        ".date-location": f"font-size: {s['font_size'] - 1}pt",
+        ".skills-category": f"margin-bottom: {s['skills_gap']}cm",
+    }
+    return "\n".join(
+        f"{selector} {{ {'; '.join(d.strip() + ' !important' for d in declarations.split(';'))}; }}"
+        for selector, declarations in rules.items()
+    )
+
+def _year_range(item: Dict[str, Any], current_key: Optional[str] = None) -> str:
+    start = str(item.get('start_date') or 'N/A').split('-')[0]
+    end = 'Present' if current_key and item.get(current_key) else str(item.get('end_date') or 'Present').split('-')[0]
+    return f"{start} - {end}"
+
+def estimate_height(state: Dict[str, Any], level: int = 0) -> float:
+    """Estimated content height in pt of the resume for ``state`` at a spacing level"""
+    s = SPACING_LEVELS[min(level, len(SPACING_LEVELS) - 1)]
+    size, lh = s["font_size"], s["line_height"]
+    small = size - 1
+    width = (A4_WIDTH_CM - 2 * s["page_margin"]) * PT_PER_CM
+    bullet_width = width - 1.2 * size
+    line = size * lh
+    profile = state.get("user_profile", {}) or {}
+
+    def h2(previous_gap_cm: float) -> float:
+        # The heading's top margin collapses with the bottom margin of the block before it
+        return (max(previous_gap_cm, s["h2_margin_top"]) - previous_gap_cm) * PT_PER_CM \
+            + s["h2_size"] * lh + 3 + 1.5 + s["h2_margin_bottom"] * PT_PER_CM
+
+    def title_line(title: str, aside: str) -> float:
+        aside_width = text_width(aside, small) + 6 if aside else 0
+        return count_lines([(title, True)], width - aside_width, size + 1) * (size + 1) * lh
+
+    def bullets(items: List[Any]) -> float:
+        return sum(count_lines([(item, False)], bullet_width, size) for item in items) * line
+
+    def technologies(item: Dict[str, Any]) -> float:
+        if not item.get('technologies'):
+            return 0.0
+        return count_lines([("Technologies:", True), (", ".join(item['technologies']), False)], width, size) * line
+
+    # Header: name, contact and link lines
+    height = s["h1_size"] * lh
+    contact = " | ".join(filter(None, [profile.get('location', ''), profile.get('phone', ''), profile.get('email', '')]))
+    links = " | ".join(f"{label}: {profile[key]}" for label, key in
+                       (("LinkedIn", "linkedin_url"), ("GitHub", "github_url"), ("Portfolio", "portfolio_url")) if profile.get(key))
+    height += (max(1, count_lines([(contact, False)], width, small)) + count_lines([(links, False)], width, small)) * small * lh
+    gap = s["contact_gap"]
+    height += gap * PT_PER_CM
+
+    height += h2(gap) + count_lines([(state.get('tailored_summary', ''), False)], width, size) * line
+    gap = s["section_gap"]
+    height += gap * PT_PER_CM
+
+    experiences = state.get("tailored_experiences") or []
+    if experiences:
+        height += h2(gap)
+        for exp in experiences:
+            title = f"{exp.get('position', '')} at {exp.get('company_name', '')}"
+            height += title_line(title, f"{_year_range(exp, 'is_current')} | {exp.get('location', '')}")
+            height += bullets(exp.get('achievements', [])) + technologies(exp) + s["item_gap"] * PT_PER_CM
+        gap = s["item_gap"]
+
+    projects = state.get("tailored_projects") or []
+    if projects:
+        height += h2(gap)
+        for proj in projects:
+            height += title_line(proj.get('title', ''), "")
+            height += bullets(proj.get('achievements', [])) + technologies(proj) + s["item_gap"] * PT_PER_CM
+        gap = s["item_gap"]
+
+    skills = state.get("all_skills") or []
+    if skills:
+        height += h2(gap)
+        for category, names in _skills_by_category(skills).items():
+            height += count_lines([(f"{category}:", True), (", ".join(names), False)], width, size) * line
+            height += s["skills_gap"] * PT_PER_CM
+        gap = s["skills_gap"]
+
+    education = profile.get("education", []) or []
+    if education:
+        height += h2(gap)
+        for edu in education:
+            height += title_line(f"{edu.get('degree', '')} in {edu.get('field_of_study', '')}", _year_range(edu))
+            height += count_lines([(f"{edu.get('institution', '')}, {edu.get('location', '')}", False)], width, size) * line
+            height += s["item_gap"] * PT_PER_CM
+    return height
+
+def page_height(level: int = 0) -> float:
+    s = SPACING_LEVELS[min(level, len(SPACING_LEVELS) - 1)]
+    return (A4_HEIGHT_CM - 2 * s["page_margin"]) * PT_PER_CM
+
+def estimate_pages(state: Dict[str, Any], level: int = 0) -> float:
+    """Estimated page count, fractional (1.3 means a page and a third)"""
+    return estimate_height(state, level) / page_height(level)
+
+def _skills_by_category(skills: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    by_category: Dict[str, List[str]] = {}
+    for skill in skills:
+        by_category.setdefault((skill.get('category') or 'General').title(), []).append(skill.get('skill_name'))
+    return by_category
+
+# Reductions tried in order until the estimate fits: each entry sets one plan limit.
+# Spacing is tightened before content is cut, and the least relevant content goes first
+# (selected experiences and projects are already ordered by relevance).
+FIT_STEPS = [
+    ("spacing_level", 1),
+    ("project_bullets", 2),
+    ("experience_bullets", 4),
+    ("projects", 2),
+    ("skills_per_category", 10),
+    ("project_bullets", 1),
+    ("experience_bullets", 3),
+    ("projects", 1),
+    ("spacing_level", 2),
+    ("skills_per_category", 6),
+    ("experience_bullets", 2),
+    ("projects", 0),
+    ("experiences", 3),
+    ("experiences", 2),
+]
+FIT_STEP_LABELS = {
+    "spacing_level": "tighter spacing (level {})",
+    "project_bullets": "at most {} bullet(s) per project",
+    "experience_bullets": "at most {} bullet(s) per role",
+    "projects": "at most {} project(s)",
+    "skills_per_category": "at most {} skills per category",
+    "experiences": "at most {} role(s)",
+}
+
+def apply_fit_plan(state: Dict[str, Any], plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of ``state`` trimmed to the plan's limits"""
+    trimmed = dict(state)
+    experiences = copy.deepcopy((state.get("tailored_experiences") or [])[:plan.get("experiences")])
+    for exp in experiences:
+        exp['achievements'] = (exp.get('achievements') or [])[:plan.get("experience_bullets")]
+    projects = copy.deepcopy((state.get("tailored_projects") or [])[:plan.get("projects")])
+    for proj in projects:
+        proj['achievements'] = (proj.get('achievements') or [])[:plan.get("project_bullets")]
+    trimmed["tailored_experiences"] = experiences
+    trimmed["tailored_projects"] = projects
+
+    limit = plan.get("skills_per_category")
+    if limit is not None:
+        kept, per_category = [], {}
+        for skill in state.get("all_skills") or []:
+            category = (skill.get('category') or 'General').title()
+            per_category[category] = per_category.get(category, 0) + 1
+            if per_category[category] <= limit:
+                kept.append(skill)
+        trimmed["all_skills"] = kept
+    return trimmed
+
+def fit_to_pages(state: Dict[str, Any], max_pages: int, tighten: bool = True) -> Dict[str, Any]:
+    """Choose the lightest plan whose estimate fits in ``max_pages``.
+
+    Returns the plan (limits plus ``spacing_level``), the trimmed state, the
+    estimated page count and human-readable descriptions of what was cut.
+    """
+    budget = max_pages * (1 - FIT_SAFETY_MARGIN)
+    plan: Dict[str, Any] = {"spacing_level": 0}
+    changes: List[str] = []
+    trimmed = state
+    estimate = estimate_pages(state, 0)
+    for key, value in FIT_STEPS:
+        if estimate <= budget:
+            break
+        current = plan.get(key)
+        if key == "spacing_level":
+            # Spacing gets tighter as the level goes up; content limits as they go down
+            if not tighten or current >= value:
+                continue
+        elif current is not None and current <= value:
+            continue
+        plan[key] = value
+        trimmed = apply_fit_plan(state, plan)
+        previous, estimate = estimate, estimate_pages(trimmed, plan["spacing_level"])
+        if estimate < previous:  # limits that cut nothing are not worth reporting
+            changes.append(FIT_STEP_LABELS[key].format(value))
+    return {"plan": plan, "state": trimmed, "estimated_pages": estimate, "changes": changes}
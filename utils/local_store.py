@@ -0,0 +1,24 @@
+import os
+import sqlite3
+
+# Process-local state (search index, caches, queues) lives next to the app unless overridden
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".local_data")
+
+def get_local_data_dir() -> str:
+    """Directory for local SQLite stores, created on first use"""
+    path = os.environ.get("RESUME_AGENT_DATA_DIR", DEFAULT_DATA_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def connect_local_db(name: str) -> sqlite3.Connection:
+    """Open a local SQLite database shared by every thread and process on this host"""
+    conn = sqlite3.connect(
+        os.path.join(get_local_data_dir(), f"{name}.sqlite3"),
+        timeout=30,
+        check_same_thread=False,
+        isolation_level=None  # autocommit; callers group writes with explicit transactions
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
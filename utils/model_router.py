@@ -0,0 +1,245 @@
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import streamlit as st
+
+# Task types routed independently
+TASK_JD_ANALYSIS = "jd_analysis"
+TASK_SELECTION = "selection"
+TASK_SUMMARY = "summary"
+TASK_TAILORING = "tailoring"
+TASK_COMPANY_RESEARCH = "company_research"
+
+# Ordered model preferences per tier; the first healthy model wins
+DEFAULT_TIERS = {
+    "fast": ["llama3-8b-8192", "gemma-7b-it", "mixtral-8x7b-32768"],
+    "balanced": ["mixtral-8x7b-32768", "llama3-70b-8192", "llama3-8b-8192"],
+    "quality": ["llama3-70b-8192", "mixtral-8x7b-32768"]
+}
+DEFAULT_TASK_TIERS = {
+    TASK_JD_ANALYSIS: "balanced",
+    TASK_SELECTION: "fast",
+    TASK_SUMMARY: "quality",
+    TASK_TAILORING: "balanced",
+    TASK_COMPANY_RESEARCH: "fast"
+}
+# Tiers whose calls are short classification-style prompts: order purely by observed latency
+LATENCY_ORDERED_TIERS = {"fast"}
+
+WINDOW_SIZE = 50
+MIN_SAMPLES = 5
+MAX_ERROR_RATE = 0.5
+
+# Circuit breaker: open after this many consecutive failures, probe again after the cooldown
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+# Hedging: send a duplicate request once the first has run longer than this latency percentile
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_DELAY = 5.0  # used until a model has MIN_SAMPLES successful calls
+HEDGE_MIN_DELAY = 0.25
+
+class ModelStats:
+    """Rolling latency and error window for one model"""
+
+    def __init__(self, window: int = WINDOW_SIZE):
+        self.samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append((latency, ok))
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile over successful calls, or None without data"""
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(pct / 100 * (len(latencies) - 1))))
+        return latencies[index]
+
+    @property
+    def healthy(self) -> bool:
+        return len(self.samples) < MIN_SAMPLES or self.error_rate <= MAX_ERROR_RATE
+
+class CircuitBreaker:
+    """Per-model breaker: closed -> open after repeated failures -> half-open probe -> closed"""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.cooldown else "open"
+
+    def is_available(self) -> bool:
+        """Whether a call could go to this model now, without claiming anything"""
+        state = self.state
+        if state == "half_open":
+            # One probe at a time; a probe that never reported back frees the slot after a cooldown
+            return self.probe_started_at is None or time.monotonic() - self.probe_started_at >= self.cooldown
+        return state == "closed"
+
+    def allow(self) -> bool:
+        """Whether a call may go to this model now; claims the probe slot when half-open"""
+        if not self.is_available():
+            return False
+        if self.state == "half_open":
+            self.probe_started_at = time.monotonic()
+        return True
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            # A failed probe re-opens the breaker for another full cooldown
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+
+class ModelRouter:
+    """Chooses the model for each LLM task and fails over between models.
+
+    Each task maps to a tier, and each tier to an ordered list of models. Models
+    with a high rolling error rate drop to the back of the list; in
+    latency-ordered tiers the remaining models are sorted by median latency.
+    Models whose circuit breaker is open are skipped entirely, so when the
+    provider is unhealthy callers go straight to their fallbacks.
+    """
+
+    def __init__(self, tiers: Optional[Dict[str, List[str]]] = None, task_tiers: Optional[Dict[str, str]] = None,
+                 hedge_percentile: float = HEDGE_PERCENTILE, breaker_failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 breaker_cooldown: float = BREAKER_COOLDOWN_SECONDS):
+        self.tiers = {**DEFAULT_TIERS, **(tiers or {})}
+        self.task_tiers = {**DEFAULT_TASK_TIERS, **(task_tiers or {})}
+        self.hedge_percentile = hedge_percentile
+        self.breaker_failure_threshold = breaker_failure_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self._stats: Dict[str, ModelStats] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(self.breaker_failure_threshold, self.breaker_cooldown)
+        return self._breakers[model]
+
+    def stats(self, model: str) -> ModelStats:
+        with self._lock:
+            if model not in self._stats:
+                self._stats[model] = ModelStats()
+            return self._stats[model]
+
+    def record(self, model: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._stats.setdefault(model, ModelStats()).record(latency, ok)
+            if ok:
+                self._breaker(model).record_success()
+            else:
+                self._breaker(model).record_failure()
+
+    def claim(self, model: str) -> bool:
+        """Whether a call may go to ``model`` now; call right before sending it, as it takes the half-open probe"""
+        with self._lock:
+            return self._breaker(model).allow()
+
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait on a request before sending a duplicate"""
+        with self._lock:
+            stats = self._stats.get(model)
+            ok_samples = sum(1 for _, ok in stats.samples if ok) if stats else 0
+            delay = stats.latency_percentile(self.hedge_percentile) if ok_samples >= MIN_SAMPLES else None
+        return max(HEDGE_MIN_DELAY, delay if delay is not None else HEDGE_DEFAULT_DELAY)
+
+    def candidates(self, task: str) -> List[str]:
+        """Models to try for a task, best first; ``claim`` each one before calling it"""
+        tier = self.task_tiers.get(task, "balanced")
+        with self._lock:
+            models = [m for m in (self.tiers.get(tier) or self.tiers["balanced"]) if self._breaker(m).is_available()]
+            stats = {m: self._stats.get(m) for m in models}
+
+        def sort_key(item):
+            position, model = item
+            model_stats = stats[model]
+            healthy = model_stats is None or model_stats.healthy
+            if tier in LATENCY_ORDERED_TIERS:
+                median = model_stats.latency_percentile(50) if model_stats else None
+                # Untried models sort first so they get measured
+                return (not healthy, median if median is not None else 0.0, position)
+            return (not healthy, position)
+
+        return [model for _, model in sorted(enumerate(models), key=sort_key)]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current per-model health, for diagnostics"""
+        with self._lock:
+            return {
+                model: {
+                    "calls": len(stats.samples),
+                    "error_rate": stats.error_rate,
+                    "p50": stats.latency_percentile(50),
+                    "p95": stats.latency_percentile(95),
+                    "breaker": self._breaker(model).state
+                }
+                for model, stats in self._stats.items()
+            }
+
+def _routing_config() -> Dict[str, Any]:
+    try:
+        return dict(st.secrets.get("llm_routing", {}))
+    except Exception:
+        return {}
+
+def _configured_router() -> ModelRouter:
+    """A router configured from the optional [llm_routing] secrets table.
+
+    Example secrets.toml:
+
+        [llm_routing.tiers]
+        fast = ["llama3-8b-8192"]
+
+        [llm_routing.tasks]
+        summary = "balanced"
+
+        [llm_routing]
+        hedge_percentile = 90
+        breaker_failure_threshold = 3
+        breaker_cooldown = 30
+    """
+    config = _routing_config()
+    tiers = {k: list(v) for k, v in dict(config.get("tiers", {})).items()}
+    return ModelRouter(
+        tiers=tiers,
+        task_tiers=dict(config.get("tasks", {})),
+        hedge_percentile=float(config.get("hedge_percentile", HEDGE_PERCENTILE)),
+        breaker_failure_threshold=int(config.get("breaker_failure_threshold", BREAKER_FAILURE_THRESHOLD)),
+        breaker_cooldown=float(config.get("breaker_cooldown", BREAKER_COOLDOWN_SECONDS))
+    )
+
+@lru_cache(maxsize=None)
+def get_model_router() -> ModelRouter:
+    """Process-wide router for user requests"""
+    return _configured_router()
+
+@lru_cache(maxsize=None)
+def get_background_router() -> ModelRouter:
+    """Process-wide router for background jobs, with its own stats and breakers
+    so their failures never take a model away from user requests
+    """
+    return _configured_router()
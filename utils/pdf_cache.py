@@ -0,0 +1,49 @@
+import os
+import time
+import uuid
+from typing import Callable, Optional
+
+from utils.compression import content_hash
+from utils.local_store import get_local_data_dir
+
+# Rendered PDFs keyed by the hash of their markdown, so a resume is rendered at most once per host
+PDF_CACHE_RETENTION_SECONDS = 60 * 60 * 24 * 30
+
+def get_pdf_cache_dir() -> str:
+    path = os.path.join(get_local_data_dir(), "pdf_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _cache_path(markdown_content: str) -> str:
+    return os.path.join(get_pdf_cache_dir(), f"{content_hash(markdown_content)}.pdf")
+
+def cached_pdf_path(markdown_content: str) -> Optional[str]:
+    """Path of the cached PDF for this markdown, or None if it was never rendered here"""
+    path = _cache_path(markdown_content)
+    return path if os.path.exists(path) else None
+
+def store_pdf(markdown_content: str, pdf_bytes: bytes) -> str:
+    """Cache a rendered PDF; the write is atomic so readers never see a partial file"""
+    path = _cache_path(markdown_content)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pdf_bytes)
+    os.replace(tmp_path, path)
+    return path
+
+def render_cached_pdf(markdown_content: str, render: Callable[[str], bytes]) -> str:
+    """Path of the PDF for this markdown, rendering it with ``render`` on a cache miss"""
+    return cached_pdf_path(markdown_content) or store_pdf(markdown_content, render(markdown_content))
+
+def prune_pdf_cache(older_than: float = PDF_CACHE_RETENTION_SECONDS) -> int:
+    """Delete cached PDFs not written for ``older_than`` seconds"""
+    removed = 0
+    cutoff = time.time() - older_than
+    for entry in os.scandir(get_pdf_cache_dir()):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
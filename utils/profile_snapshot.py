@@ -0,0 +1,141 @@
+import hashlib
+import json
+import threading
+import weakref
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+# The resume workflow reads the user's profile through one immutable snapshot
+# per (user, profile version) instead of carrying list-of-dict copies through
+# every node. Concurrent generations for the same profile share the snapshot;
+# the workflow state only holds item IDs and the fields each step rewrote.
+
+_MISSING = object()
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    return value
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    return value
+
+class ProfileRecord:
+    """Immutable, slotted profile item with the read API of the row dict it came from"""
+    __slots__ = ("id",)
+    FIELDS: Tuple[str, ...] = ("id",)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = ("id",) + cls.__slots__
+
+    def __init__(self, item_id: str, row: Dict[str, Any]):
+        object.__setattr__(self, "id", item_id)
+        for field in self.FIELDS[1:]:
+            object.__setattr__(self, field, _freeze(row[field]) if field in row else _MISSING)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key) if key in self.FIELDS else _MISSING
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self, overlay: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+        """Plain dict for rendering, with ``overlay`` fields replacing the originals"""
+        row = {field: _thaw(getattr(self, field)) for field in self.FIELDS if getattr(self, field) is not _MISSING}
+        row.update(overlay or {})
+        return row
+
+class ExperienceRecord(ProfileRecord):
+    __slots__ = ("company_name", "position", "location", "start_date", "end_date", "is_current",
+                 "description", "achievements", "technologies")
+
+class ProjectRecord(ProfileRecord):
+    __slots__ = ("title", "description", "start_date", "end_date", "url", "achievements", "technologies")
+
+class SkillRecord(ProfileRecord):
+    __slots__ = ("skill_name", "category", "proficiency_level")
+
+def profile_version(inputs: Dict[str, Any]) -> str:
+    """Content hash of everything the workflow reads from the user's profile"""
+    canonical = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+def _records(record_class, rows: List[Dict[str, Any]]) -> Tuple[ProfileRecord, ...]:
+    # Rows without an ID (never the case for Supabase rows) are keyed by position
+    return tuple(record_class(str(row.get('id') or f"#{index}"), row) for index, row in enumerate(rows or []))
+
+class ProfileSnapshot:
+    """One user's profile at one version: header fields plus experiences, projects and skills"""
+    __slots__ = ("key", "user_id", "version", "profile", "experiences", "projects", "skills",
+                 "_experiences_by_id", "_projects_by_id", "__weakref__")
+
+    def __init__(self, user_id: str, inputs: Dict[str, Any], version: Optional[str] = None):
+        self.user_id = user_id
+        self.version = version or profile_version(inputs)
+        self.key = f"{user_id}:{self.version}"
+        self.profile = _freeze(inputs.get("user_profile") or {})
+        self.experiences = _records(ExperienceRecord, inputs.get("all_experiences"))
+        self.projects = _records(ProjectRecord, inputs.get("all_projects"))
+        self.skills = _records(SkillRecord, inputs.get("all_skills"))
+        self._experiences_by_id = {record.id: record for record in self.experiences}
+        self._projects_by_id = {record.id: record for record in self.projects}
+
+    def experience(self, item_id: str) -> ExperienceRecord:
+        return self._experiences_by_id[item_id]
+
+    def project(self, item_id: str) -> ProjectRecord:
+        return self._projects_by_id[item_id]
+
+    def resolve_experiences(self, ids: List[str], overlays: Optional[Mapping[str, Mapping[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """Experience dicts for ``ids``, in order, with each one's tailored fields applied"""
+        overlays = overlays or {}
+        return [self.experience(item_id).to_dict(overlays.get(item_id)) for item_id in ids]
+
+    def resolve_projects(self, ids: List[str], overlays: Optional[Mapping[str, Mapping[str, Any]]] = None) -> List[Dict[str, Any]]:
+        overlays = overlays or {}
+        return [self.project(item_id).to_dict(overlays.get(item_id)) for item_id in ids]
+
+    def profile_dict(self) -> Dict[str, Any]:
+        return _thaw(self.profile)
+
+    def skill_dicts(self) -> List[Dict[str, Any]]:
+        return [record.to_dict() for record in self.skills]
+
+# Live snapshots by key; an entry goes away once no running workflow holds it
+_snapshots: "weakref.WeakValueDictionary[str, ProfileSnapshot]" = weakref.WeakValueDictionary()
+_snapshots_lock = threading.Lock()
+
+def load_profile_snapshot(user_id: str, inputs: Dict[str, Any]) -> ProfileSnapshot:
+    """Shared snapshot for this user's profile data; keep a reference while it is in use"""
+    version = profile_version(inputs)
+    key = f"{user_id}:{version}"
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None:
+            snapshot = ProfileSnapshot(user_id, inputs, version)
+            _snapshots[key] = snapshot
+        return snapshot
+
+def get_profile_snapshot(key: str) -> ProfileSnapshot:
+    """The live snapshot a workflow state refers to by ``profile_key``"""
+    snapshot = _snapshots.get(key)
+    if snapshot is None:
+        raise KeyError(f"Profile snapshot {key} is no longer loaded")
+    return snapshot
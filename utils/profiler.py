@@ -0,0 +1,178 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+
+from utils.warmup import warmup_report
+
+# Developer mode: enable with ?profile=1 (sticky for the session, ?profile=0 turns it off)
+# or for everyone with RESUME_AGENT_PROFILER=1
+PROFILER_ENV_VAR = "RESUME_AGENT_PROFILER"
+SAMPLE_INTERVAL_SECONDS = 0.005
+PROFILE_HISTORY = 10
+TOP_N = 15
+MAX_PROFILE_SECONDS = 120
+
+CATEGORIES = ["import", "db", "llm", "render", "widget", "script"]
+# Path fragments that attribute a sample to a category, checked from the innermost frame out
+CATEGORY_RULES = [
+    ("llm", ("/groq/", "/langgraph/", "utils/ai_agents.py", "utils/model_router.py", "utils/generation.py")),
+    ("db", ("/supabase/", "/postgrest/", "/gotrue/", "/sqlite3/", "utils/database.py", "utils/search.py", "utils/job_queue.py")),
+    ("render", ("/weasyprint/", "/markdown2", "utils/resume_generator.py")),
+    ("widget", ("/streamlit/",)),
+]
+IMPORT_FRAME = "<frozen importlib._bootstrap"
+
+class RerunProfile:
+    """Samples collected for one script rerun.
+
+    A background thread reads the script thread's stack every few
+    milliseconds; only frames below the page module are kept, so Streamlit's
+    own script-runner frames never show up.
+    """
+
+    def __init__(self, page: str, thread_id: int, page_code):
+        self.page = page
+        self.thread_id = thread_id
+        self.page_code = page_code
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.samples = 0
+        self.category_seconds: Dict[str, float] = {category: 0.0 for category in CATEGORIES}
+        self.self_seconds: Counter = Counter()
+        self.total_seconds: Counter = Counter()
+        self.stacks: Counter = Counter()
+        self.finished = False
+
+    @staticmethod
+    def _label(code) -> str:
+        filename = code.co_filename
+        short = "/".join(filename.replace("\\", "/").split("/")[-2:])
+        return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+    @staticmethod
+    def _categorize(codes) -> str:
+        if any(code.co_filename.startswith(IMPORT_FRAME) for code in codes):
+            return "import"
+        for code in reversed(codes):
+            filename = code.co_filename.replace("\\", "/")
+            for category, fragments in CATEGORY_RULES:
+                if any(fragment in filename for fragment in fragments):
+                    return category
+        return "script"
+
+    def _record(self, frame, weight: float) -> bool:
+        """Add one stack sample; returns False once the page script is no longer running"""
+        codes = []
+        while frame is not None:
+            if frame.f_code is self.page_code:
+                break
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        if frame is None:
+            return False
+        codes.append(self.page_code)
+        codes.reverse()  # outermost (the page) first
+
+        self.samples += 1
+        self.category_seconds[self._categorize(codes)] += weight
+        labels = [self._label(code) for code in codes]
+        self.self_seconds[labels[-1]] += weight
+        for label in set(labels):
+            self.total_seconds[label] += weight
+        self.stacks[";".join(labels)] += weight
+        return True
+
+    def run(self, interval: float) -> None:
+        started = time.monotonic()
+        last = started
+        while time.monotonic() - started < MAX_PROFILE_SECONDS:
+            time.sleep(interval)
+            now = time.monotonic()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or not self._record(frame, now - last):
+                break
+            last = now
+        self.duration = last - started
+        self.finished = True
+
+    def hot_functions(self, n: int = TOP_N) -> List[Dict[str, Any]]:
+        return [
+            {
+                "function": label,
+                "self_ms": round(seconds * 1000, 1),
+                "total_ms": round(self.total_seconds[label] * 1000, 1)
+            }
+            for label, seconds in self.self_seconds.most_common(n)
+        ]
+
+    def folded_stacks(self) -> str:
+        """Collapsed stacks (milliseconds) for flamegraph.pl or speedscope"""
+        return "\n".join(f"{stack} {max(1, round(seconds * 1000))}" for stack, seconds in self.stacks.items())
+
+    def summary(self) -> Dict[str, Any]:
+        row = {
+            "page": self.page,
+            "started": time.strftime("%H:%M:%S", time.localtime(self.started_at)),
+            "total_ms": round(self.duration * 1000)
+        }
+        row.update({f"{category}_ms": round(seconds * 1000) for category, seconds in self.category_seconds.items()})
+        return row
+
+def profiler_enabled() -> bool:
+    """Whether developer profiling is on for this session"""
+    flag = st.query_params.get("profile")
+    if flag is not None:
+        st.session_state.profiler_enabled = flag not in ("0", "false", "off")
+    if "profiler_enabled" in st.session_state:
+        return st.session_state.profiler_enabled
+    return os.environ.get(PROFILER_ENV_VAR, "") not in ("", "0", "false")
+
+def start_rerun_profile(page: str) -> Optional[RerunProfile]:
+    """Start sampling the current rerun when developer mode is on.
+
+    Call it at the very top of a page, before its other imports, so import
+    time is captured. It issues no Streamlit commands, so it may run before
+    ``st.set_page_config``.
+    """
+    if not profiler_enabled():
+        return None
+    profile = RerunProfile(page, threading.get_ident(), sys._getframe(1).f_code)
+    if "profiler_history" not in st.session_state:
+        st.session_state.profiler_history = deque(maxlen=PROFILE_HISTORY)
+    st.session_state.profiler_history.append(profile)
+    threading.Thread(target=profile.run, args=(SAMPLE_INTERVAL_SECONDS,), name="rerun-profiler", daemon=True).start()
+    return profile
+
+def render_profiler_panel() -> None:
+    """Sidebar panel with the finished profiles of this session (latest first)"""
+    if not profiler_enabled():
+        return
+    profiles = [p for p in reversed(st.session_state.get("profiler_history", [])) if p.finished]
+    with st.sidebar.expander("⏱️ Rerun profiler", expanded=True):
+        warmup = warmup_report()
+        if warmup:
+            status = f"done in {warmup['total_ms']} ms" if warmup['done'] else "running"
+            st.caption(f"Background warm-up {status}")
+            st.json(warmup, expanded=False)
+        if not profiles:
+            st.caption("No finished reruns yet; interact with the page to collect one.")
+            return
+
+        st.caption(f"Last {len(profiles)} reruns (sampled every {SAMPLE_INTERVAL_SECONDS * 1000:.0f} ms)")
+        st.dataframe([p.summary() for p in profiles], hide_index=True, use_container_width=True)
+
+        labels = [f"{p.summary()['started']} · {p.page} · {p.summary()['total_ms']} ms" for p in profiles]
+        selected = profiles[st.selectbox("Inspect rerun", range(len(profiles)), format_func=lambda i: labels[i])]
+        st.bar_chart({category: [round(seconds * 1000)] for category, seconds in selected.category_seconds.items()})
+        st.dataframe(selected.hot_functions(), hide_index=True, use_container_width=True)
+        st.download_button(
+            "Download folded stacks",
+            data=selected.folded_stacks(),
+            file_name=f"profile_{int(selected.started_at)}.folded",
+            mime="text/plain"
+        )
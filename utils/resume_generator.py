@@ -1,7 +1,7 @@
-import markdown2
-from weasyprint import HTML, CSS
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
+
+from utils.layout import fit_to_pages, spacing_css
 
 class ResumeGenerator:
     def __init__(self):
@@ -93,6 +93,11 @@ class ResumeGenerator:
             color: #2c3e50;
         }
         """
+        # Browser preview only: a sheet of paper, since browsers ignore @page
+        self.preview_css = """
+        html { background: #e9ecef; }
+        body { background: white; max-width: 21cm; margin: 0 auto; padding: 1.5cm; box-sizing: border-box; }
+        """
 
     def _generate_markdown(self, state: Dict[str, Any]) -> str:
         """Constructs the resume content as a Markdown string."""
@@ -181,12 +186,65 @@ class ResumeGenerator:
 
         return md
 
+    def build_markdown(self, state: Dict[str, Any], spacing_level: int = 0) -> str:
+        """Resume Markdown for a state, with any tighter spacing embedded as a <style> block."""
+        markdown_content = self._generate_markdown(state)
+        css_override = spacing_css(spacing_level)
+        if css_override:
+            # Kept in the markdown so re-rendering it later reproduces the same layout
+            markdown_content = f"<style>\n{css_override}\n</style>\n\n" + markdown_content
+        return markdown_content
+
+    def render_html(self, markdown_content: str) -> str:
+        """Standalone HTML page for previewing the resume in a browser.
+
+        Same markup and stylesheet as the PDF, plus preview_css.
+        """
+        import markdown2
+        html_content = markdown2.markdown(markdown_content, extras=["tables"])
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<style>{self.css_style}\n{self.preview_css}</style></head>"
+            f"<body>{html_content}</body></html>"
+        )
+
+    def render_pdf(self, markdown_content: str) -> Tuple[bytes, int]:
+        """Renders resume Markdown to PDF bytes in one pass, returning the page count too."""
+        # WeasyPrint loads Pango and fontconfig on import, so only pay for it when rendering
+        import markdown2
+        from weasyprint import HTML, CSS
+        html_content = markdown2.markdown(markdown_content, extras=["tables"])
+        document = HTML(string=html_content).render(stylesheets=[CSS(string=self.css_style)])
+        return document.write_pdf(), len(document.pages)
+
+    def create_pdf_from_markdown(self, markdown_content: str) -> bytes:
+        """Renders previously generated resume Markdown to PDF bytes."""
+        return self.render_pdf(markdown_content)[0]
+
     def create_pdf(self, state: Dict[str, Any]) -> bytes:
         """Generates a PDF from the final state and returns its byte content."""
         markdown_content = self._generate_markdown(state)
-        html_content = markdown2.markdown(markdown_content, extras=["tables"])
-        
-        css = CSS(string=self.css_style)
-        pdf_bytes = HTML(string=html_content).write_pdf(stylesheets=[css])
+        pdf_bytes = self.create_pdf_from_markdown(markdown_content)
         
         return pdf_bytes, markdown_content
+
+    def create_fitted_markdown(self, state: Dict[str, Any], max_pages: int, tighten: bool = True) -> Tuple[str, Dict[str, Any]]:
+        """Resume Markdown trimmed to fit in ``max_pages``, chosen with the layout estimator (no render)."""
+        fit = fit_to_pages(state, max_pages, tighten=tighten)
+        fit_info = {
+            "max_pages": max_pages,
+            "plan": fit["plan"],
+            "changes": fit["changes"],
+            "estimated_pages": round(fit["estimated_pages"], 2)
+        }
+        return self.build_markdown(fit["state"], fit["plan"]["spacing_level"]), fit_info
+
+    def create_fitted_pdf(self, state: Dict[str, Any], max_pages: int, tighten: bool = True) -> Tuple[bytes, str, Dict[str, Any]]:
+        """Generates a PDF trimmed to fit in ``max_pages``, chosen with the layout estimator.
+
+        Only one WeasyPrint render happens; its page count is reported back so
+        an estimate that was off shows up instead of triggering more renders.
+        """
+        markdown_content, fit_info = self.create_fitted_markdown(state, max_pages, tighten)
+        pdf_bytes, fit_info["pages"] = self.render_pdf(markdown_content)
+        return pdf_bytes, markdown_content, fit_info
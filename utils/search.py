@@ -0,0 +1,165 @@
+import json
+import re
+import threading
+from functools import lru_cache
+from typing import List, Dict, Any, Iterable
+
+from utils.local_store import connect_local_db
+
+# bm25 weights, one per column of resume_fts in declaration order (unindexed columns and user_id get 0)
+COLUMN_WEIGHTS = (0.0, 0.0, 10.0, 8.0, 1.0, 4.0, 2.0, 0.0)
+SNIPPET_TOKENS = 16
+
+class ResumeSearchIndex:
+    """Full-text index over generated resumes backed by SQLite FTS5.
+
+    Rows are added incrementally as resumes are saved; a user's existing history
+    is backfilled once, the first time they search. ``user_id`` is an indexed
+    column (the last one, so snippets never come from it) and every search
+    matches it, so only that user's rows are ranked.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._lock = threading.Lock()
+        with self._lock:
+            columns = [row["name"] for row in self.conn.execute("PRAGMA table_info(resume_fts)")]
+            if columns and columns[-1] != "user_id":
+                # Built with user_id as an unindexed post-filter: rebuild, histories are backfilled again
+                self.conn.execute("DROP TABLE resume_fts")
+                self.conn.execute("DROP TABLE IF EXISTS indexed_users")
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS resume_fts USING fts5(
+                    resume_id UNINDEXED,
+                    created_at UNINDEXED,
+                    job_title,
+                    company_name,
+                    job_description,
+                    skills,
+                    tailored_summary,
+                    user_id,
+                    tokenize = 'porter unicode61'
+                )
+            """)
+            self.conn.execute("CREATE TABLE IF NOT EXISTS indexed_users (user_id TEXT PRIMARY KEY)")
+
+    @staticmethod
+    def _skills_text(jd_analysis: Any) -> str:
+        """Flatten the skill and keyword lists of a JD analysis into searchable text"""
+        if isinstance(jd_analysis, str):
+            try:
+                jd_analysis = json.loads(jd_analysis)
+            except json.JSONDecodeError:
+                return jd_analysis
+        if not isinstance(jd_analysis, dict):
+            return ""
+        terms = []
+        for key in ("required_skills", "preferred_skills", "keywords"):
+            values = jd_analysis.get(key) or []
+            if isinstance(values, list):
+                terms.extend(str(v) for v in values)
+        return ", ".join(terms)
+
+    def _row(self, resume: Dict[str, Any]) -> tuple:
+        return (
+            str(resume["id"]),
+            str(resume.get("created_at", "")),
+            resume.get("job_title") or "",
+            resume.get("company_name") or "",
+            resume.get("job_description") or "",
+            self._skills_text(resume.get("jd_analysis")),
+            resume.get("tailored_summary") or "",
+            str(resume.get("user_id", ""))
+        )
+
+    def add_resumes(self, resumes: Iterable[Dict[str, Any]]) -> None:
+        """Insert or replace resumes in the index"""
+        rows = [self._row(r) for r in resumes if r and r.get("id")]
+        if not rows:
+            return
+        with self._lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany("DELETE FROM resume_fts WHERE resume_id = ?", [(r[0],) for r in rows])
+                self.conn.executemany("INSERT INTO resume_fts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def remove_resume(self, resume_id: str) -> None:
+        """Drop a resume from the index"""
+        with self._lock:
+            self.conn.execute("DELETE FROM resume_fts WHERE resume_id = ?", (str(resume_id),))
+
+    def forget_user(self, user_id: str) -> None:
+        """Drop a user's rows so their history is backfilled again on the next search"""
+        with self._lock:
+            self.conn.execute(
+                "DELETE FROM resume_fts WHERE resume_fts MATCH ? AND user_id = ?", (self._user_filter(user_id), user_id)
+            )
+            self.conn.execute("DELETE FROM indexed_users WHERE user_id = ?", (user_id,))
+
+    def is_user_indexed(self, user_id: str) -> bool:
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM indexed_users WHERE user_id = ?", (user_id,)).fetchone()
+        return row is not None
+
+    def index_user(self, user_id: str, resumes: List[Dict[str, Any]]) -> None:
+        """Backfill a user's full history and mark them as indexed"""
+        self.add_resumes(resumes)
+        with self._lock:
+            self.conn.execute("INSERT OR IGNORE INTO indexed_users (user_id) VALUES (?)", (user_id,))
+
+    @staticmethod
+    def _user_filter(user_id: str) -> str:
+        """FTS5 query for the rows of one user: their whole id, from the start of the column"""
+        return 'user_id : ^"' + user_id.replace('"', '""') + '"'
+
+    @classmethod
+    def _match_expression(cls, user_id: str, query: str) -> str:
+        """Turn free text into an FTS5 query over one user's rows: every term must match outside
+        user_id, last term as a prefix
+        """
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return ""
+        quoted = [f'"{t}"' for t in terms]
+        quoted[-1] += "*"
+        return f"{cls._user_filter(user_id)} AND - user_id : ({' '.join(quoted)})"
+
+    def search(self, user_id: str, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Return the user's best-matching resumes with highlighted snippets"""
+        match = self._match_expression(user_id, query)
+        if not match:
+            return []
+        weights = ", ".join(str(w) for w in COLUMN_WEIGHTS)
+        # Ranking through the hidden rank column lets FTS5 stop after the top `limit` hits; the
+        # match only reaches the user's rows, the user_id comparison just keeps the filter exact
+        sql = f"""
+            SELECT resume_id, created_at, job_title, company_name,
+                   snippet(resume_fts, -1, '**', '**', '…', {SNIPPET_TOKENS}) AS snippet,
+                   rank
+            FROM resume_fts
+            WHERE resume_fts MATCH ? AND rank MATCH 'bm25({weights})' AND user_id = ?
+            ORDER BY rank
+            LIMIT ?
+        """
+        with self._lock:
+            rows = self.conn.execute(sql, (match, user_id, limit)).fetchall()
+        return [
+            {
+                "id": row["resume_id"],
+                "created_at": row["created_at"],
+                "job_title": row["job_title"],
+                "company_name": row["company_name"],
+                "snippet": row["snippet"],
+                "score": -row["rank"]  # bm25() is lower-is-better
+            }
+            for row in rows
+        ]
+
+@lru_cache(maxsize=None)
+def get_search_index() -> ResumeSearchIndex:
+    """Process-wide search index instance"""
+    return ResumeSearchIndex(connect_local_db("search"))
@@ -0,0 +1,204 @@
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Schemas are plain Python structures: a type (str, int, float, bool), a one-item
+# list describing the element schema, or a dict mapping field names to schemas.
+
+class SchemaError(ValueError):
+    """Raised when a value cannot be coerced to its declared schema"""
+
+def schema_template(schema: Any) -> Any:
+    """Example JSON value for a schema, used to show the model the expected shape"""
+    if isinstance(schema, dict):
+        return {key: schema_template(sub) for key, sub in schema.items()}
+    if isinstance(schema, list):
+        return [schema_template(schema[0])]
+    return {str: "string", int: 0, float: 0.0, bool: False}.get(schema, "string")
+
+def schema_instructions(schema: Any) -> str:
+    """Prompt text asking for a single JSON value with the schema's shape"""
+    return (
+        "Respond with ONLY a JSON object, no prose or code fences, with exactly this structure:\n"
+        f"{json.dumps(schema_template(schema))}"
+    )
+
+def coerce_to_schema(value: Any, schema: Any) -> Any:
+    """Coerce a parsed value to a schema.
+
+    Object fields that are missing or malformed are dropped so callers can fill
+    in their own defaults; list items that do not fit are skipped.
+    """
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            raise SchemaError(f"Expected object, got {type(value).__name__}")
+        result = {}
+        for key, sub_schema in schema.items():
+            if key in value:
+                try:
+                    result[key] = coerce_to_schema(value[key], sub_schema)
+                except SchemaError:
+                    pass
+        return result
+    if isinstance(schema, list):
+        if value is None:
+            return []
+        if not isinstance(value, list):
+            value = [value]
+        items = []
+        for item in value:
+            try:
+                items.append(coerce_to_schema(item, schema[0]))
+            except SchemaError:
+                pass
+        return items
+    if schema is str:
+        if isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        raise SchemaError(f"Expected string, got {type(value).__name__}")
+    if schema in (int, float):
+        if isinstance(value, bool):
+            raise SchemaError("Expected number, got boolean")
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise SchemaError(f"Expected number, got {value!r}")
+        if schema is int:
+            if not number.is_integer():
+                raise SchemaError(f"Expected integer, got {value!r}")
+            return int(number)
+        return number
+    if schema is bool:
+        if isinstance(value, bool):
+            return value
+        raise SchemaError(f"Expected boolean, got {type(value).__name__}")
+    return value
+
+class IncrementalJSONParser:
+    """Tolerant, incremental parser for JSON produced by an LLM.
+
+    Text before the first ``{`` or ``[`` (prose, code fences) is skipped; given a
+    ``schema``, only its top-level container (object or array) starts the value,
+    so a bracket in leading prose such as "[see below]" is skipped too. Each
+    ``feed`` scans only the new characters and returns the top-level object
+    fields that became complete, so callers can act on them while the rest of
+    the response is still streaming. ``snapshot`` repairs truncated output by
+    closing open strings and containers, backing off to the last complete
+    member when the tail cannot be salvaged.
+    """
+
+    def __init__(self, schema: Any = None):
+        self._openers = "{" if isinstance(schema, dict) else "[" if isinstance(schema, list) else "{["
+        self._parts: List[str] = []
+        self._length = 0
+        self._stack: List[str] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self.done = False
+        # Offsets where the text can be cut and still close cleanly, with the open containers at that point
+        self._cut_points: List[Tuple[int, Tuple[str, ...]]] = []
+        self._completed_members = 0
+        self._emitted_members = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume more text; return newly completed top-level (key, value) pairs"""
+        completed_before = self._completed_members
+        for ch in chunk:
+            if self.done:
+                break
+            if not self._started:
+                if ch in self._openers:
+                    self._started = True
+                    self._append(ch)
+                    self._stack.append(ch)
+                    self._cut_points.append((self._length, tuple(self._stack)))
+                continue
+
+            if self._in_string:
+                self._append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == "," and self._stack:
+                # Cut before the comma: everything up to here is a complete member
+                self._cut_points.append((self._length, tuple(self._stack)))
+                if len(self._stack) == 1:
+                    self._completed_members += 1
+            self._append(ch)
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._stack.append(ch)
+                self._cut_points.append((self._length, tuple(self._stack)))
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self.done = True
+
+        if self._completed_members == completed_before and not self.done:
+            return []
+        return self._new_members()
+
+    def _append(self, ch: str) -> None:
+        self._parts.append(ch)
+        self._length += 1
+
+    def _new_members(self) -> List[Tuple[str, Any]]:
+        value = self.snapshot()
+        if not isinstance(value, dict):
+            return []
+        keys = list(value)
+        ready = len(keys) if self.done else min(self._completed_members, len(keys))
+        members = [(key, value[key]) for key in keys[self._emitted_members:ready]]
+        self._emitted_members = max(self._emitted_members, ready)
+        return members
+
+    @staticmethod
+    def _closers(stack) -> str:
+        return "".join("}" if opener == "{" else "]" for opener in reversed(stack))
+
+    def snapshot(self) -> Optional[Any]:
+        """Best-effort value of everything fed so far, or None if nothing is usable"""
+        if not self._started:
+            return None
+        text = "".join(self._parts)
+        if self.done:
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                pass
+
+        # First try finishing the tail as-is: close an open string, drop a dangling separator
+        tail = text
+        if self._in_string:
+            tail = tail[:-1] if self._escape else tail
+            tail += '"'
+        tail = tail.rstrip()
+        while tail and tail[-1] in ",:":
+            tail = tail[:-1].rstrip()
+        try:
+            return json.loads(tail + self._closers(self._stack))
+        except json.JSONDecodeError:
+            pass
+
+        # Otherwise back off to the most recent point where a member ended
+        for offset, stack in reversed(self._cut_points):
+            try:
+                return json.loads(text[:offset] + self._closers(stack))
+            except json.JSONDecodeError:
+                continue
+        return None
+
+def parse_json_lenient(text: str, schema: Any = None) -> Optional[Any]:
+    """Parse a complete LLM response, repairing truncation; None if nothing is usable"""
+    parser = IncrementalJSONParser(schema)
+    parser.feed(text or "")
+    return parser.snapshot()
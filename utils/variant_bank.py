@@ -0,0 +1,229 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.ats_score import jd_keywords, keyword_hits, normalize_tokens, token_ngrams
+from utils.compression import content_hash
+from utils.job_queue import get_job_queue, get_job_worker, register_handler
+from utils.local_store import connect_local_db
+
+# Most JDs a user applies to fall into a few role families. Achievements are
+# rewritten toward each family ahead of time (in the background, whenever the
+# profile changes), so a generation can assemble stored variants instead of
+# waiting on the LLM; only families never seen before still need a live call.
+
+PRECOMPUTE_VARIANTS_JOB = "precompute_variants"
+# Role families a profile is precomputed for, picked by overlap with its skills
+VARIANT_CLUSTERS_PER_USER = int(os.environ.get("VARIANT_CLUSTERS_PER_USER", "3"))
+VARIANT_CONCURRENCY = 4
+
+SKILL_CLUSTERS: Dict[str, List[str]] = {
+    "backend": ["python", "java", "go", "node.js", "api", "microservices", "postgresql", "kafka", "redis",
+                "distributed systems", "rest", "grpc", "sql", "scalability"],
+    "frontend": ["javascript", "typescript", "react", "vue", "angular", "css", "html", "ui", "accessibility",
+                 "web performance", "design system"],
+    "data": ["sql", "spark", "airflow", "etl", "data pipeline", "data warehouse", "dbt", "kafka", "analytics",
+             "bigquery", "snowflake", "data modeling"],
+    "ml": ["machine learning", "pytorch", "tensorflow", "nlp", "llm", "deep learning", "scikit-learn", "mlops",
+           "computer vision", "model training", "feature engineering"],
+    "devops": ["kubernetes", "docker", "terraform", "aws", "gcp", "azure", "ci/cd", "observability", "linux",
+               "sre", "infrastructure as code", "monitoring"],
+    "mobile": ["ios", "android", "swift", "kotlin", "react native", "flutter", "mobile", "app store"],
+    "leadership": ["mentoring", "leadership", "stakeholder", "roadmap", "strategy", "hiring", "cross-functional",
+                   "agile", "ownership"],
+}
+
+def rank_clusters(texts: Iterable[str]) -> List[Tuple[str, int]]:
+    """Role families by how many of their keywords occur in ``texts``, best first (zero overlap dropped)"""
+    text = "\n".join(texts)
+    ranked = [(cluster, keyword_hits(text, keywords)) for cluster, keywords in SKILL_CLUSTERS.items()]
+    return sorted([item for item in ranked if item[1] > 0], key=lambda item: -item[1])
+
+def cluster_for_jd(jd_analysis: Dict[str, Any]) -> Optional[str]:
+    """The role family a JD belongs to, or None when none of them match"""
+    ranked = rank_clusters(jd_keywords(jd_analysis))
+    return ranked[0][0] if ranked else None
+
+def keywords_in(text: str, keywords: Iterable[str]) -> List[str]:
+    """The ``keywords`` that occur in ``text``"""
+    grams = token_ngrams(text)
+    return [keyword for keyword in keywords if grams[" ".join(normalize_tokens(keyword))] > 0]
+
+def item_text(item: Dict[str, Any]) -> str:
+    """Everything an item says about itself: title, description, achievements and technologies"""
+    parts = [str(item.get(key) or "") for key in ('position', 'title', 'description')]
+    parts += [str(a) for a in item.get('achievements') or []]
+    parts += [", ".join(map(str, item.get('technologies') or []))]
+    return "\n".join(parts)
+
+def item_hash(item: Any) -> str:
+    """Version of an item's achievements; editing them orphans the old variants"""
+    return content_hash(json.dumps(list(item.get('achievements') or [])))
+
+class VariantBank:
+    """Rewritten achievements per (profile item, role family), in local SQLite"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._lock = threading.Lock()
+        with self._lock:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS achievement_variants (
+                    user_id TEXT NOT NULL,
+                    item_kind TEXT NOT NULL,
+                    item_id TEXT NOT NULL,
+                    item_hash TEXT NOT NULL,
+                    cluster TEXT NOT NULL,
+                    achievements TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (item_kind, item_id, item_hash, cluster)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS achievement_variants_user_idx ON achievement_variants (user_id)")
+
+    def get(self, item_kind: str, item_id: str, version: str) -> Dict[str, List[str]]:
+        """Stored variants of one item version, by role family"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT cluster, achievements FROM achievement_variants WHERE item_kind = ? AND item_id = ? AND item_hash = ?",
+                (item_kind, item_id, version)
+            ).fetchall()
+        return {row["cluster"]: json.loads(row["achievements"]) for row in rows}
+
+    def put(self, user_id: str, item_kind: str, item_id: str, version: str, cluster: str, achievements: List[str]) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO achievement_variants VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (user_id, item_kind, item_id, version, cluster, json.dumps(achievements), time.time())
+            )
+
+    def prune_user(self, user_id: str, live: Iterable[Tuple[str, str, str]], before: Optional[float] = None) -> int:
+        """Drop the user's variants for items (or versions of them) no longer in the profile.
+
+        With ``before``, variants stored since then are kept: a refresh that read a
+        newer profile may have stored them.
+        """
+        keep = set(live)
+        before = before if before is not None else float("inf")
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT item_kind, item_id, item_hash FROM achievement_variants WHERE user_id = ? AND created_at < ?",
+                (user_id, before)
+            ).fetchall()
+            stale = {tuple(row) for row in rows} - keep
+            self.conn.executemany(
+                "DELETE FROM achievement_variants WHERE item_kind = ? AND item_id = ? AND item_hash = ? AND created_at < ?",
+                [(*version, before) for version in stale]
+            )
+        return len(stale)
+
+    def best_variant(self, item_kind: str, item: Any, jd_analysis: Dict[str, Any], cluster: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Overlay with the stored variant that best covers the JD's keywords.
+
+        None (a miss) when the JD's role family has not been precomputed for this
+        item; any stored family may win on keyword overlap, including the original.
+        """
+        if cluster is None:
+            return None
+        variants = self.get(item_kind, str(item.get('id')), item_hash(item))
+        if cluster not in variants:
+            return None
+        keywords = jd_keywords(jd_analysis)
+        best = max(variants.values(), key=lambda achievements: keyword_hits("\n".join(achievements), keywords))
+        if keyword_hits("\n".join(best), keywords) < keyword_hits("\n".join(item.get('achievements') or []), keywords):
+            return {}
+        return {'achievements': best}
+
+@lru_cache(maxsize=None)
+def get_variant_bank() -> VariantBank:
+    """Process-wide variant bank"""
+    return VariantBank(connect_local_db("variants"))
+
+def profile_clusters(inputs: Dict[str, Any]) -> List[str]:
+    """Role families worth precomputing for a profile, from its skills and technologies"""
+    texts = [str(skill.get('skill_name') or "") for skill in inputs.get('all_skills') or []]
+    for item in (inputs.get('all_experiences') or []) + (inputs.get('all_projects') or []):
+        texts.append(", ".join(map(str, item.get('technologies') or [])))
+        texts.append(str(item.get('position') or item.get('title') or ""))
+    return [cluster for cluster, _ in rank_clusters(texts)[:VARIANT_CLUSTERS_PER_USER]]
+
+async def run_variant_precompute(payload: Dict[str, Any], job: Dict[str, Any]) -> Tuple[Dict[str, Any], None]:
+    """Job handler: store variants for every item and role family that does not have one yet"""
+    from utils.ai_agents import AIAgents
+    from utils.database import DatabaseManager
+    from utils.model_router import get_background_router
+
+    user_id = payload["user_id"]
+    started = time.time()
+    inputs = await DatabaseManager().aload_generation_inputs(user_id)
+    clusters = list(dict.fromkeys((payload.get("clusters") or []) + profile_clusters(inputs)))
+    bank = get_variant_bank()
+    agents = AIAgents(router=get_background_router())
+    slots = asyncio.Semaphore(VARIANT_CONCURRENCY)
+    stored = 0
+
+    items = [("experience", item) for item in inputs.get('all_experiences') or []]
+    items += [("project", item) for item in inputs.get('all_projects') or []]
+
+    skills = ", ".join(str(skill.get('skill_name') or "") for skill in inputs.get('all_skills') or [])
+    rejected = 0
+
+    async def precompute(item_kind: str, item: Dict[str, Any], cluster: str) -> None:
+        nonlocal stored, rejected
+        # Only tailor toward what the item's technologies or the user's skills back up
+        technologies = ", ".join(map(str, item.get('technologies') or []))
+        focus_keywords = keywords_in(f"{technologies}\n{skills}", SKILL_CLUSTERS[cluster])
+        achievements = list(item['achievements'])
+        if focus_keywords:
+            focus = {"keywords": focus_keywords, "required_skills": focus_keywords}
+            async with slots:
+                if item_kind == "experience":
+                    overlay = await agents.atailor_experience_description(item, focus)
+                else:
+                    overlay = await agents.atailor_project_description(item, focus)
+            if not overlay.get('achievements'):
+                return
+            # A rewrite that claims family keywords the item never mentions is not kept
+            source = set(keywords_in(item_text(item), SKILL_CLUSTERS[cluster]))
+            if set(keywords_in("\n".join(overlay['achievements']), SKILL_CLUSTERS[cluster])) - source:
+                rejected += 1
+                return
+            achievements = overlay['achievements']
+        # With nothing to tailor toward, the original is this family's variant
+        await asyncio.to_thread(bank.put, user_id, item_kind, str(item['id']), item_hash(item), cluster, achievements)
+        stored += 1
+
+    tasks = []
+    for item_kind, item in items:
+        if not item.get('achievements'):
+            continue
+        existing = await asyncio.to_thread(bank.get, item_kind, str(item['id']), item_hash(item))
+        tasks += [precompute(item_kind, item, cluster) for cluster in clusters if cluster in SKILL_CLUSTERS and cluster not in existing]
+    await asyncio.gather(*tasks)
+    pruned = await asyncio.to_thread(bank.prune_user, user_id, [(kind, str(item['id']), item_hash(item)) for kind, item in items], started)
+    return {"clusters": clusters, "stored": stored, "rejected": rejected, "pruned": pruned}, None
+
+register_handler(PRECOMPUTE_VARIANTS_JOB, run_variant_precompute)
+
+def enqueue_variant_precompute(user_id: str, clusters: Optional[List[str]] = None) -> str:
+    """Queue a background variant refresh for a user's profile (or extra role families).
+
+    Joins a refresh that is still queued for the same families, which has not
+    read the profile yet. A running one may have read it before this change, so
+    another is queued behind it; the handler skips anything already stored, so
+    repeats are cheap.
+    """
+    get_job_worker()
+    clusters = sorted(clusters or [])
+    return get_job_queue().enqueue(
+        PRECOMPUTE_VARIANTS_JOB,
+        {"user_id": user_id, "clusters": clusters},
+        user_id=user_id,
+        idempotency_key=f"variants:{user_id}:{','.join(clusters)}",
+        reuse_done=False,
+        join_running=False
+    )
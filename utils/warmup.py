@@ -0,0 +1,87 @@
+import importlib
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+# Heavy dependencies every page defers until first use, in the order they are
+# usually needed. The warm-up imports them in the background once the first page
+# has painted, so the first real use finds them in sys.modules.
+WARM_MODULES = [
+    "supabase",
+    "postgrest",
+    "groq",
+    "langgraph.graph",
+    "markdown2",
+    "scipy.sparse",
+    "weasyprint",
+]
+
+class WarmUp:
+    """Background import of the deferred dependencies, with per-module timings"""
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        for name in WARM_MODULES:
+            self._timed(name, importlib.import_module, name)
+        # The first WeasyPrint render loads fontconfig and shapes the template's
+        # fonts; doing it now takes that cost off the first real PDF
+        self._timed("weasyprint fonts", _prime_weasyprint)
+        self.finished_at = time.perf_counter()
+
+    def _timed(self, label: str, func, *args) -> None:
+        start = time.perf_counter()
+        try:
+            func(*args)
+        except Exception as e:
+            self.errors[label] = f"{type(e).__name__}: {e}"
+        self.timings[label] = time.perf_counter() - start
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the warm-up is done; True if it finished"""
+        if self._thread:
+            self._thread.join(timeout)
+        return self.finished_at is not None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "done": self.finished_at is not None,
+            "total_ms": round((self.finished_at - self.started_at) * 1000) if self.finished_at else None,
+            "timings_ms": {label: round(seconds * 1000, 1) for label, seconds in self.timings.items()},
+            "errors": dict(self.errors),
+        }
+
+def _prime_weasyprint() -> None:
+    from utils.resume_generator import ResumeGenerator
+    ResumeGenerator().create_pdf_from_markdown("<h1>Warm-up</h1>\n<h2>Section</h2>\n<ul><li><strong>Bold</strong> item</li></ul>")
+
+def warmup_enabled() -> bool:
+    return os.environ.get("RESUME_AGENT_WARMUP", "1") != "0"
+
+@lru_cache(maxsize=None)
+def get_warmup() -> WarmUp:
+    """Process-wide warm-up; the first call starts it"""
+    warmup = WarmUp()
+    if warmup_enabled():
+        warmup.start()
+    return warmup
+
+def start_warmup() -> None:
+    """Call once the page's first elements are out: starts the warm-up on the first call per process"""
+    get_warmup()
+
+def warmup_report() -> Optional[Dict[str, Any]]:
+    """Timings of this process's warm-up, or None if it has not been started"""
+    return get_warmup().report() if get_warmup.cache_info().currsize else None